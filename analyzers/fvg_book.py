@@ -0,0 +1,103 @@
+from bisect import bisect_left, insort
+from typing import Dict, Iterator, List, Tuple
+from models.fair_value_gap import FairValueGap
+
+_Entry = Tuple[float, int, FairValueGap]  # (sort key, insertion sequence, gap)
+
+class FVGBook:
+    """
+    Price-indexed book of unmitigated FVGs, split by direction.
+
+    Each side keeps its gaps sorted by the edge that mitigates them, so a
+    price update removes every filled gap with one binary search and one
+    slice. A second index sorted by the opposite edge answers "which gaps
+    contain this price"; entries there are dropped lazily once their gap
+    has been mitigated.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self) -> None:
+        """Remove every gap from the book"""
+        self._seq = 0
+        self._live: Dict[int, FairValueGap] = {}  # Insertion order of unmitigated gaps
+
+        # Bullish gaps are mitigated at or below lower_price, bearish at or above upper_price
+        self._bullish_by_lower: List[_Entry] = []
+        self._bearish_by_upper: List[_Entry] = []
+
+        # Opposite edges for containment queries
+        self._bullish_by_upper: List[_Entry] = []
+        self._bearish_by_lower: List[_Entry] = []
+        self._stale = 0
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def __iter__(self) -> Iterator[FairValueGap]:
+        return iter(list(self._live.values()))
+
+    def gaps(self) -> List[FairValueGap]:
+        """Return all unmitigated FVGs in the order they were added"""
+        return list(self._live.values())
+
+    def add(self, fvg: FairValueGap) -> None:
+        """Track a new unmitigated FVG"""
+        seq = self._seq
+        self._seq += 1
+        self._live[seq] = fvg
+        if fvg.direction == 'bullish':
+            insort(self._bullish_by_lower, (fvg.lower_price, seq, fvg))
+            insort(self._bullish_by_upper, (fvg.upper_price, seq, fvg))
+        else:
+            insort(self._bearish_by_upper, (fvg.upper_price, seq, fvg))
+            insort(self._bearish_by_lower, (fvg.lower_price, seq, fvg))
+
+    def mitigate(self, price: float) -> List[FairValueGap]:
+        """Mark and remove every gap mitigated by price, returning them"""
+        # Bullish: lower_price >= price is a suffix of the lower-edge index
+        start = bisect_left(self._bullish_by_lower, (price,))
+        removed = self._bullish_by_lower[start:]
+        del self._bullish_by_lower[start:]
+
+        # Bearish: upper_price <= price is a prefix of the upper-edge index
+        end = bisect_left(self._bearish_by_upper, (price, self._seq))
+        removed += self._bearish_by_upper[:end]
+        del self._bearish_by_upper[:end]
+
+        mitigated = []
+        for _, seq, fvg in removed:
+            fvg.mitigated = True
+            del self._live[seq]
+            mitigated.append(fvg)
+
+        self._stale += len(mitigated)
+        if self._stale > len(self._live):
+            self._compact()
+        return mitigated
+
+    def containing(self, price: float) -> List[FairValueGap]:
+        """Return unmitigated gaps with lower_price <= price <= upper_price, in insertion order"""
+        live = self._live
+        seqs = []
+
+        # Bullish: upper_price >= price is a suffix of the upper-edge index
+        for _, seq, fvg in self._bullish_by_upper[bisect_left(self._bullish_by_upper, (price,)):]:
+            if seq in live and fvg.lower_price <= price:
+                seqs.append(seq)
+
+        # Bearish: lower_price <= price is a prefix of the lower-edge index
+        for _, seq, fvg in self._bearish_by_lower[:bisect_left(self._bearish_by_lower, (price, self._seq))]:
+            if seq in live and price <= fvg.upper_price:
+                seqs.append(seq)
+
+        seqs.sort()
+        return [live[seq] for seq in seqs]
+
+    def _compact(self) -> None:
+        """Drop containment-index entries whose gaps have been mitigated"""
+        live = self._live
+        self._bullish_by_upper = [entry for entry in self._bullish_by_upper if entry[1] in live]
+        self._bearish_by_lower = [entry for entry in self._bearish_by_lower if entry[1] in live]
+        self._stale = 0
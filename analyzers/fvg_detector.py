@@ -1,28 +1,200 @@
-from typing import List
+from collections import deque
+from copy import copy
+from typing import Dict, List
+import math
+import numpy as np
 import pandas as pd
 from models.fair_value_gap import FairValueGap
+from analyzers.fvg_book import FVGBook
 
 class FVGDetector:
-    def __init__(self, min_gap_size: float, volume_threshold: float):
+    def __init__(self, min_gap_size: float, volume_threshold: float, vectorized: bool = True,
+                 volume_window: int = 21):
         self.min_gap_size = min_gap_size
         self.volume_threshold = volume_threshold
-        self.active_fvgs: List[FairValueGap] = []  # Track active FVGs
+        self.vectorized = vectorized  # Use the NumPy scan instead of the bar-by-bar loop
+        self.volume_window = volume_window  # Bars in the streaming volume baseline
+        self.book = FVGBook()  # Track active FVGs, indexed by price
 
-    def update_fvg_status(self, price: float) -> None:
-        """Update mitigation status of all tracked FVGs"""
-        for fvg in self.active_fvgs:
-            if not fvg.mitigated and fvg.is_mitigated_by_price(price):
-                fvg.mitigated = True
+        # Streaming state for on_bar
+        self._bars = deque(maxlen=3)  # (timestamp, high, low, volume) of the last three bars
+        self._volumes = deque(maxlen=volume_window)
+
+    @property
+    def active_fvgs(self) -> List[FairValueGap]:
+        """Unmitigated FVGs in detection order"""
+        return self.book.gaps()
+
+    def reset(self) -> None:
+        """Clear tracked FVGs and streaming state"""
+        self.book.clear()
+        self._bars.clear()
+        self._volumes.clear()
+
+    def state(self) -> Dict:
+        """Copies of the tracked FVGs and streaming state, for a snapshot"""
+        return {'gaps': [copy(fvg) for fvg in self.book.gaps()], 'bars': list(self._bars), 'volumes': list(self._volumes)}
+
+    def load_state(self, state: Dict) -> None:
+        """Restore what state() returned"""
+        self.reset()
+        for fvg in state['gaps']:
+            self.book.add(fvg)
+        self._bars.extend(state['bars'])
+        self._volumes.extend(state['volumes'])
+
+    def replay_bar(self, timestamp, high: float, low: float, volume: float) -> None:
+        """Advance the streaming state by one bar without detecting gaps (journal replay)"""
+        high, low, volume = float(high), float(low), float(volume)
+        self._volumes.append(volume)
+        self._bars.append((timestamp, high, low, volume))
+
+    def update_fvg_status(self, price: float) -> List[FairValueGap]:
+        """Mark and drop every tracked FVG mitigated by price, returning them"""
+        return self.book.mitigate(price)
+
+    def on_bar(self, timestamp, open_: float, high: float, low: float,
+               close: float, volume: float) -> List[FairValueGap]:
+        """Process one closed bar and return only the FVGs it completes"""
+        # Update existing FVGs status; filled gaps leave the book
+        self.update_fvg_status(close)
+
+        high, low, volume = float(high), float(low), float(volume)
+        self._volumes.append(volume)
+        self._bars.append((timestamp, high, low, volume))
+        if len(self._bars) < 3:
+            return []
+
+        # Baseline over the trailing volume window, ending at the newest bar
+        volume_mean = math.fsum(self._volumes) / len(self._volumes)
+        (first_time, first_high, first_low, _), (_, _, _, middle_volume), _ = self._bars
+        volume_weight = middle_volume / volume_mean
+        if not volume_weight >= self.volume_threshold:
+            return []
+
+        new_fvgs = []
+        # Bullish FVG
+        if low > first_high and low - first_high >= self.min_gap_size:
+            new_fvgs.append(FairValueGap(
+                start_time=first_time,
+                end_time=timestamp,
+                upper_price=low,
+                lower_price=first_high,
+                volume_weight=volume_weight,
+                direction='bullish',
+                mitigated=False
+            ))
+
+        # Bearish FVG
+        if high < first_low and first_low - high >= self.min_gap_size:
+            new_fvgs.append(FairValueGap(
+                start_time=first_time,
+                end_time=timestamp,
+                upper_price=first_low,
+                lower_price=high,
+                volume_weight=volume_weight,
+                direction='bearish',
+                mitigated=False
+            ))
+
+        # A gap already filled by this close never becomes active
+        new_fvgs = [fvg for fvg in new_fvgs if not fvg.is_mitigated_by_price(close)]
+        for fvg in new_fvgs:
+            self.book.add(fvg)
+        return new_fvgs
 
     def find_fvg(self, df: pd.DataFrame) -> List[FairValueGap]:
         """Detect Fair Value Gaps in the price action"""
         # Update existing FVGs status
         current_price = df['Close'].iloc[-1]
         self.update_fvg_status(current_price)
-        
+
         # Find new FVGs
+        if self.vectorized:
+            new_fvgs = self._scan_vectorized(df, current_price)
+        else:
+            new_fvgs = self._scan_loop(df, current_price)
+
+        # Track new FVGs; ones already filled by the current price never enter the book
+        for fvg in new_fvgs:
+            if not fvg.mitigated:
+                self.book.add(fvg)
+
+        return self.book.gaps()  # Return only unmitigated FVGs
+
+    def _scan_vectorized(self, df: pd.DataFrame, current_price: float) -> List[FairValueGap]:
+        """Find new FVGs with shifted High/Low arrays and boolean masks"""
+        if len(df) < 3:
+            return []
+
+        high = df['High'].to_numpy(dtype=np.float64)
+        low = df['Low'].to_numpy(dtype=np.float64)
+        volume = df['Volume'].to_numpy(dtype=np.float64)
+        volume_mean = df['Volume'].mean()  # Baseline computed once for the whole window
+
+        # Candle i is the middle bar; compare bar i+1 against bar i-1
+        prev_high, prev_low = high[:-2], low[:-2]
+        next_high, next_low = high[2:], low[2:]
+        volume_weight = volume[1:-1] / volume_mean
+
+        bullish_gap = next_low - prev_high
+        bearish_gap = prev_low - next_high
+        bullish = (
+            (next_low > prev_high) &
+            (bullish_gap >= self.min_gap_size) &
+            (volume_weight >= self.volume_threshold)
+        )
+        bearish = (
+            (next_high < prev_low) &
+            (bearish_gap >= self.min_gap_size) &
+            (volume_weight >= self.volume_threshold)
+        )
+
+        # Preserve loop order: by middle bar, bullish before bearish
+        bullish_idx = np.flatnonzero(bullish)
+        bearish_idx = np.flatnonzero(bearish)
+        rows = np.concatenate([bullish_idx, bearish_idx])
+        is_bearish = np.concatenate([
+            np.zeros(len(bullish_idx), dtype=bool),
+            np.ones(len(bearish_idx), dtype=bool)
+        ])
+        order = np.lexsort((is_bearish, rows))
+
+        index = df.index
         new_fvgs = []
-        
+        for k in order:
+            j = rows[k]  # Offset of bar i-1; the middle bar is j+1
+            if is_bearish[k]:
+                fvg = FairValueGap(
+                    start_time=index[j],
+                    end_time=index[j+2],
+                    upper_price=prev_low[j],
+                    lower_price=next_high[j],
+                    volume_weight=volume_weight[j],
+                    direction='bearish',
+                    mitigated=False
+                )
+            else:
+                fvg = FairValueGap(
+                    start_time=index[j],
+                    end_time=index[j+2],
+                    upper_price=next_low[j],
+                    lower_price=prev_high[j],
+                    volume_weight=volume_weight[j],
+                    direction='bullish',
+                    mitigated=False
+                )
+            # Check if already mitigated by current price
+            if fvg.is_mitigated_by_price(current_price):
+                fvg.mitigated = True
+            new_fvgs.append(fvg)
+
+        return new_fvgs
+
+    def _scan_loop(self, df: pd.DataFrame, current_price: float) -> List[FairValueGap]:
+        """Find new FVGs by walking the frame bar by bar (reference implementation)"""
+        new_fvgs = []
+
         for i in range(1, len(df) - 1):
             # Bullish FVG
             if df['Low'].iloc[i+1] > df['High'].iloc[i-1]:
@@ -43,7 +215,7 @@ class FVGDetector:
                         if fvg.is_mitigated_by_price(current_price):
                             fvg.mitigated = True
                         new_fvgs.append(fvg)
-            
+
             # Bearish FVG
             if df['High'].iloc[i+1] < df['Low'].iloc[i-1]:
                 gap_size = df['Low'].iloc[i-1] - df['High'].iloc[i+1]
@@ -63,15 +235,5 @@ class FVGDetector:
                         if fvg.is_mitigated_by_price(current_price):
                             fvg.mitigated = True
                         new_fvgs.append(fvg)
-        
-        # Update active FVGs list with new ones
-        self.active_fvgs.extend(new_fvgs)
-        
-        # Remove mitigated FVGs older than the lookback period
-        cutoff_time = df.index[-1] - pd.Timedelta(days=7)  # Keep 7 days of history
-        self.active_fvgs = [
-            fvg for fvg in self.active_fvgs 
-            if not (fvg.mitigated and fvg.end_time < cutoff_time)
-        ]
-        
-        return [fvg for fvg in self.active_fvgs if not fvg.mitigated]  # Return only unmitigated FVGs
+
+        return new_fvgs
@@ -0,0 +1,82 @@
+from bisect import bisect_left, bisect_right, insort
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+class LevelIndex:
+    """
+    Support and resistance levels kept in sorted order.
+
+    Levels are added one swing point at a time and expire once they are
+    older than max_age bars or when more than max_levels of a kind are
+    held. Nearest-level lookups and break-of-structure checks are binary
+    searches over the sorted prices.
+    """
+
+    def __init__(self, max_age: Optional[int] = None, max_levels: Optional[int] = None):
+        self.max_age = max_age
+        self.max_levels = max_levels
+        self._sorted: Dict[str, List[Tuple[float, int]]] = {'support': [], 'resistance': []}
+        self._added: Dict[str, deque] = {'support': deque(), 'resistance': deque()}
+
+    @classmethod
+    def from_levels(cls, levels: Dict[str, List[float]]) -> 'LevelIndex':
+        """Build an index from find_support_resistance output"""
+        index = cls()
+        for kind in ('support', 'resistance'):
+            for bar, price in enumerate(levels[kind]):
+                index.add(kind, price, bar)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._sorted['support']) + len(self._sorted['resistance'])
+
+    def levels(self, kind: str) -> List[float]:
+        """Return the prices of one kind of level in ascending order"""
+        return [price for price, _ in self._sorted[kind]]
+
+    def clear(self) -> None:
+        """Remove all levels"""
+        for kind in ('support', 'resistance'):
+            self._sorted[kind].clear()
+            self._added[kind].clear()
+
+    def add(self, kind: str, price: float, bar: int) -> None:
+        """Add a 'support' or 'resistance' level found at bar number bar"""
+        entry = (float(price), bar)
+        insort(self._sorted[kind], entry)
+        self._added[kind].append(entry)
+        if self.max_levels is not None:
+            while len(self._added[kind]) > self.max_levels:
+                self._remove(kind, self._added[kind].popleft())
+
+    def expire(self, current_bar: int) -> None:
+        """Drop levels older than max_age bars"""
+        if self.max_age is None:
+            return
+        cutoff = current_bar - self.max_age
+        for kind in ('support', 'resistance'):
+            added = self._added[kind]
+            while added and added[0][1] < cutoff:
+                self._remove(kind, added.popleft())
+
+    def nearest_below(self, kind: str, price: float) -> Optional[float]:
+        """Highest level strictly below price"""
+        levels = self._sorted[kind]
+        i = bisect_left(levels, (price,))
+        return levels[i - 1][0] if i > 0 else None
+
+    def nearest_above(self, kind: str, price: float) -> Optional[float]:
+        """Lowest level strictly above price"""
+        levels = self._sorted[kind]
+        i = bisect_right(levels, (price, float('inf')))
+        return levels[i][0] if i < len(levels) else None
+
+    def is_break(self, price: float, direction: str) -> bool:
+        """Bullish: price is above a resistance level; bearish: price is below a support level"""
+        if direction == 'bullish':
+            return self.nearest_below('resistance', price) is not None
+        return self.nearest_above('support', price) is not None
+
+    def _remove(self, kind: str, entry: Tuple[float, int]) -> None:
+        levels = self._sorted[kind]
+        del levels[bisect_left(levels, entry)]
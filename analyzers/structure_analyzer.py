@@ -1,41 +1,120 @@
-from typing import Dict, List
+from collections import deque
+from typing import Dict, List, Union
+import numpy as np
 import pandas as pd
+from models.swing_levels import SwingLevels
+from analyzers.level_index import LevelIndex
 
 class StructureAnalyzer:
 
-    def __init__(self, lookback_period: int = 20):
+    def __init__(self, lookback_period: int = 20, swing_width: int = 2):
         self.lookback_period = lookback_period
+        self.swing_width = swing_width  # Bars on each side a swing point must exceed
+
+        # Streaming state for on_bar; a swing is confirmed swing_width bars after it forms
+        self._highs = deque(maxlen=2 * swing_width + 1)
+        self._lows = deque(maxlen=2 * swing_width + 1)
+        self._bar = -1
+        self.level_index = LevelIndex(max_age=lookback_period - swing_width)
+
+    def reset(self) -> None:
+        """Clear streaming state and tracked levels"""
+        self._highs.clear()
+        self._lows.clear()
+        self._bar = -1
+        self.level_index.clear()
+
+    def on_bar(self, high: float, low: float) -> LevelIndex:
+        """Add one closed bar, record newly confirmed swing points and expire old levels"""
+        self._bar += 1
+        self._highs.append(high)
+        self._lows.append(low)
+
+        width = self.swing_width
+        if len(self._highs) == 2 * width + 1:
+            swing_bar = self._bar - width
+            center_high = self._highs[width]
+            if all(center_high > h for k, h in enumerate(self._highs) if k != width):
+                self.level_index.add('resistance', center_high, swing_bar)
+            center_low = self._lows[width]
+            if all(center_low < l for k, l in enumerate(self._lows) if k != width):
+                self.level_index.add('support', center_low, swing_bar)
+
+        # Match a window of lookback_period + 1 bars ending at this one
+        self.level_index.expire(self._bar)
+        return self.level_index
+
+    def build_index(self, df: pd.DataFrame) -> LevelIndex:
+        """Detect swing levels across the frame and return them as a LevelIndex"""
+        return self.index_levels(df['High'].to_numpy(), df['Low'].to_numpy())
+
+    def index_levels(self, highs: np.ndarray, lows: np.ndarray) -> LevelIndex:
+        """Build a LevelIndex straight from High and Low arrays, e.g. ring buffer views"""
+        index = LevelIndex()
+        for kind, values, mask_fn in (('support', lows, self.swing_lows),
+                                      ('resistance', highs, self.swing_highs)):
+            for bar in np.flatnonzero(mask_fn(values)):
+                index.add(kind, values[bar], int(bar))
+        return index
 
     def find_support_resistance(self, df: pd.DataFrame) -> Dict[str, List[float]]:
         """Identify key support and resistance levels using swing highs/lows"""
-        levels = {'support': [], 'resistance': []}
-
-        for i in range(2, len(df) - 2):
-            # Check for swing high
-            if (
-                df['High'].iloc[i] > df['High'].iloc[i-1] and 
-                df['High'].iloc[i] > df['High'].iloc[i-2] and
-                df['High'].iloc[i] > df['High'].iloc[i+1] and
-                df['High'].iloc[i] > df['High'].iloc[i+2]
-            ):
-                levels['resistance'].append(df['High'].iloc[i])
-            
-            # Check for swing low
-            if (
-                df['Low'].iloc[i] < df['Low'].iloc[i-1] and 
-                df['Low'].iloc[i] < df['Low'].iloc[i-2] and
-                df['Low'].iloc[i] < df['Low'].iloc[i+1] and
-                df['Low'].iloc[i] < df['Low'].iloc[i+2]
-            ):
-                levels['support'].append(df['Low'].iloc[i])
+        highs = df['High'].to_numpy()
+        lows = df['Low'].to_numpy()
 
+        return {
+            'support': lows[self.swing_lows(lows)].tolist(),
+            'resistance': highs[self.swing_highs(highs)].tolist()
+        }
+
+    def find_levels(self, df: pd.DataFrame) -> Dict[str, SwingLevels]:
+        """Return support and resistance levels sorted by price, with their bar timestamps"""
+        levels = {}
+        for name, column, mask_fn in (('support', 'Low', self.swing_lows),
+                                      ('resistance', 'High', self.swing_highs)):
+            values = df[column].to_numpy()
+            rows = np.flatnonzero(mask_fn(values))
+            order = np.argsort(values[rows], kind='stable')
+            levels[name] = SwingLevels(
+                prices=values[rows][order].astype(np.float64),
+                times=df.index.to_numpy()[rows][order]
+            )
         return levels
+
+    def swing_highs(self, highs: np.ndarray) -> np.ndarray:
+        """Boolean mask of bars whose high exceeds swing_width bars on each side"""
+        return self._swing_mask(highs, np.greater)
+
+    def swing_lows(self, lows: np.ndarray) -> np.ndarray:
+        """Boolean mask of bars whose low is below swing_width bars on each side"""
+        return self._swing_mask(lows, np.less)
+
+    def _swing_mask(self, values: np.ndarray, compare) -> np.ndarray:
+        """Compare each bar against its shifted neighbours within swing_width"""
+        n = len(values)
+        width = self.swing_width
+        mask = np.zeros(n, dtype=bool)
+        if n < 2 * width + 1:
+            return mask
+
+        center = values[width:n - width]
+        core = np.ones(len(center), dtype=bool)
+        for offset in range(1, width + 1):
+            core &= compare(center, values[width - offset:n - width - offset])
+            core &= compare(center, values[width + offset:n - width + offset])
+
+        mask[width:n - width] = core
+        return mask
     
-    def is_break_of_structure(self, price: float, levels: Dict[str, List[float]], direction: str) -> bool:
+    def is_break_of_structure(self, price: float, levels: Union[Dict[str, List[float]], LevelIndex],
+                              direction: str) -> bool:
         """Determine if current price breaks structure"""
+        if not isinstance(levels, dict):
+            return levels.is_break(price, direction)
+
         if direction == 'bullish':
-            nearest_resistance = min((r for r in levels['resistance'] if r > price), default=None)
-            return nearest_resistance is not None and price > nearest_resistance
+            nearest_resistance = max((r for r in levels['resistance'] if r < price), default=None)
+            return nearest_resistance is not None
         else:
-            nearest_support = max((s for s in levels['support'] if s < price), default=None)
-            return nearest_support is not None and price < nearest_support
+            nearest_support = min((s for s in levels['support'] if s > price), default=None)
+            return nearest_support is not None
@@ -1,3 +1,8 @@
 from .backtester import Backtester
+from .metrics import PerformanceAccumulator
+from .monte_carlo import MonteCarlo, MonteCarloResult
+from .parameter_sweep import ParameterSweep
+from .walk_forward import WalkForward, WalkForwardResult
 
-__all__ = ['Backtester']
+__all__ = ['Backtester', 'MonteCarlo', 'MonteCarloResult', 'ParameterSweep', 'PerformanceAccumulator',
+           'WalkForward', 'WalkForwardResult']
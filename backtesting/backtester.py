@@ -1,43 +1,120 @@
 # fvg_trading_bot/backtesting/backtester.py
-from typing import List, Dict
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Optional, Tuple
 import pandas as pd
-import yfinance as yf
 from trading.trading_bot import TradingBot
+from data.sources import DataSource
+from backtesting.metrics import PerformanceAccumulator, mark_to_market
+from backtesting.vectorized_engine import VectorizedEngine
 from utils.logger import get_logger
-from visualization.performance_viz import PerformanceVisualizer
 
 logger = get_logger(__name__)
 
+# Per-process state, set once by _init_worker so the bot is pickled once per worker
+_worker_bot: Optional[TradingBot] = None
+_worker_source: Optional[DataSource] = None
+
+def _init_worker(trading_bot: TradingBot, data_source: DataSource) -> None:
+    global _worker_bot, _worker_source
+    _worker_bot = trading_bot
+    _worker_source = data_source
+
+def _run_symbol(symbol: str, start_date: str, end_date: str, initial_capital: float,
+                engine: str) -> Tuple[str, pd.DataFrame, Dict]:
+    """Backtest one symbol with its own Backtester (process pool worker)"""
+    backtester = Backtester(_worker_bot, _worker_source)
+    trades_df = backtester.run(symbol, start_date, end_date, initial_capital, engine=engine)
+    return symbol, trades_df, backtester.get_performance_metrics()
+
 class Backtester:
-    def __init__(self, trading_bot: TradingBot):
+    def __init__(self, trading_bot: TradingBot, data_source: Optional[DataSource] = None):
         self.trading_bot = trading_bot
+        self.data_source = data_source if data_source is not None else trading_bot.data_source
         self.trades: List[Dict] = []
-        
+        self.performance: Optional[PerformanceAccumulator] = None  # Metrics of the latest run
+
+    def reset(self) -> None:
+        """Forget the trades and metrics of earlier runs"""
+        self.trades = []
+        self.performance = None
+
     def run(self, symbol: str, start_date: str, end_date: str, 
-            initial_capital: float) -> pd.DataFrame:
-        """Run backtest for a single symbol"""
+            initial_capital: float, engine: str = 'event',
+            plot_dir: Optional[str] = None) -> pd.DataFrame:
+        """Run backtest for a single symbol
+
+        engine='event' streams bars through the bot's detector and analyzer;
+        engine='vectorized' precomputes all signals and produces the same trades.
+        Charts are only drawn, into plot_dir, when it is given.
+        """
         # Fetch historical data
-        ticker = yf.Ticker(symbol)
-        df = ticker.history(start=start_date, end=end_date, interval='5m')
+        df = self.fetch_history(symbol, start_date, end_date)
+        if engine not in ('event', 'vectorized'):
+            raise ValueError(f"Unknown backtest engine: {engine}")
+
+        # Each run has its own equity curve; self.trades still collects every run's trades
+        self.performance = PerformanceAccumulator(initial_capital)
+        self.performance.tz = pd.DatetimeIndex(df.index).tz
+
+        if engine == 'vectorized':
+            trades = VectorizedEngine(self.trading_bot).run(df, initial_capital)
+            equity, exposed = mark_to_market(df, trades, initial_capital)
+            self.performance.mark_many(pd.DatetimeIndex(df.index).as_unit('ns').asi8, equity, exposed)
+            self.performance.record_trades([trade['pnl'] for trade in trades])
+            self.trades.extend(trades)
+        else:
+            self.trades.extend(self._run_event(df, initial_capital))
+
+        trades_df = pd.DataFrame(self.trades)
+        
+        # Create visualizations on request; matplotlib is only imported here
+        if plot_dir is not None:
+            from visualization.performance_viz import PerformanceVisualizer
+            PerformanceVisualizer(trades_df, df, self.performance).save_all_plots(plot_dir)
         
+        return trades_df
+
+    def fetch_history(self, symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
+        """Fetch 5-minute bars for a symbol from the data source"""
+        return self.data_source.history(symbol, start=start_date, end=end_date, interval='5m')
+
+    def _run_event(self, df: pd.DataFrame, initial_capital: float) -> List[Dict]:
+        """Replay bars one at a time through the bot's streaming detector and analyzer
+
+        Closed trades and each bar's mark-to-market equity go into self.performance.
+        """
+        trades = []
+        performance = self.performance
         capital = initial_capital
         current_trade = None
-        
+
+        # Stream bars through the detector so each gap is found exactly once
+        fvg_detector = self.trading_bot.fvg_detector
+        fvg_detector.reset()
+        structure_analyzer = self.trading_bot.structure_analyzer
+        structure_analyzer.reset()
+        opens = df['Open'].to_numpy()
+        highs = df['High'].to_numpy()
+        lows = df['Low'].to_numpy()
+        closes = df['Close'].to_numpy()
+        volumes = df['Volume'].to_numpy()
+        timestamps = pd.DatetimeIndex(df.index).as_unit('ns').asi8
+
         for i in range(len(df)):
-            current_price = df['Close'].iloc[i]
-            
+            current_price = closes[i]
+            fvg_detector.on_bar(df.index[i], opens[i], highs[i], lows[i],
+                                current_price, volumes[i])
+            levels = structure_analyzer.on_bar(highs[i], lows[i])
+
             # Find FVGs
             if i >= 3:
-                test_df = df.iloc[max(0, i-20):i+1]
-                fvgs = self.trading_bot.fvg_detector.find_fvg(test_df)
-                levels = self.trading_bot.structure_analyzer.find_support_resistance(test_df)
-                
                 # Check for trade entry
                 if not current_trade:
+                    # Unmitigated FVGs whose zone contains the current price
+                    fvgs = fvg_detector.book.containing(current_price)
                     for fvg in fvgs:
-                        if (fvg.lower_price <= current_price <= fvg.upper_price and
-                            self.trading_bot.structure_analyzer.is_break_of_structure(
-                                current_price, levels, fvg.direction)):
+                        if structure_analyzer.is_break_of_structure(
+                                current_price, levels, fvg.direction):
                             
                             # Calculate trade parameters
                             if fvg.direction == 'bullish':
@@ -71,12 +148,13 @@ class Backtester:
                             pnl = (current_price - current_trade['entry_price']) * current_trade['size']
                             capital += pnl
                             
-                            self.trades.append({
+                            trades.append({
                                 **current_trade,
                                 'exit_price': current_price,
                                 'exit_time': df.index[i],
                                 'pnl': pnl
                             })
+                            performance.record_trade(pnl)
                             
                             current_trade = None
                     
@@ -87,48 +165,80 @@ class Backtester:
                             pnl = (current_trade['entry_price'] - current_price) * current_trade['size']
                             capital += pnl
                             
-                            self.trades.append({
+                            trades.append({
                                 **current_trade,
                                 'exit_price': current_price,
                                 'exit_time': df.index[i],
                                 'pnl': pnl
                             })
+                            performance.record_trade(pnl)
                             
                             current_trade = None
-        
-        trades_df = pd.DataFrame(self.trades)
-        
-        # Create visualizations
-        visualizer = PerformanceVisualizer(trades_df, df)
-        #visualizer.save_all_plots('trading_analysis')
-        
-        return trades_df
 
-    def get_performance_metrics(self) -> Dict:
-        """Calculate and return performance metrics from backtest results"""
-        df = pd.DataFrame(self.trades)
-        if len(df) == 0:
-            return {
-                'total_trades': 0,
-                'win_rate': 0,
-                'profit_factor': 0,
-                'average_win': 0,
-                'average_loss': 0,
-                'largest_win': 0,
-                'largest_loss': 0,
-                'total_pnl': 0
-            }
-
-        winning_trades = df[df['pnl'] > 0]
-        losing_trades = df[df['pnl'] < 0]
+            # Mark the open position at this bar's close
+            if current_trade is None:
+                performance.mark(timestamps[i], performance.realized_equity)
+            elif current_trade['direction'] == 'bullish':
+                performance.mark(timestamps[i], performance.realized_equity + (
+                    current_price - current_trade['entry_price']) * current_trade['size'], True)
+            else:
+                performance.mark(timestamps[i], performance.realized_equity + (
+                    current_trade['entry_price'] - current_price) * current_trade['size'], True)
+
+        return trades
+
+    def run_many(self, symbols: List[str], start_date: str, end_date: str,
+                 initial_capital: float, engine: str = 'event',
+                 max_workers: Optional[int] = None) -> Dict:
+        """Backtest several symbols in parallel, one process per task
+
+        Every symbol starts from initial_capital with its own copy of the
+        trading bot, so its trades and metrics do not include other symbols.
+        Returns per-symbol 'trades' and 'metrics' plus 'combined_trades' and
+        'combined_metrics' across all symbols. self.trades is left untouched.
+
+        Workers receive the bot's strategy_copy() once, when they start, so
+        the cost of a task does not grow with the bot's symbol list.
+        """
+        init_args = (self.trading_bot.strategy_copy(), self.data_source)
+        args = [(symbol, start_date, end_date, initial_capital, engine) for symbol in symbols]
+        if max_workers == 1:
+            _init_worker(*init_args)
+            results = [_run_symbol(*arg) for arg in args]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                     initargs=init_args) as executor:
+                results = list(executor.map(_run_symbol, *zip(*args)))
+
+        trades = {}
+        metrics = {}
+        for symbol, trades_df, symbol_metrics in results:
+            trades[symbol] = trades_df
+            metrics[symbol] = symbol_metrics
+            logger.info(f"Backtested {symbol}: {symbol_metrics['total_trades']} trades")
+
+        combined_trades = pd.concat(
+            [trades_df.assign(symbol=symbol) for symbol, trades_df in trades.items()],
+            ignore_index=True
+        ) if trades else pd.DataFrame()
 
         return {
-            'total_trades': len(df),
-            'win_rate': len(winning_trades) / len(df) if len(df) > 0 else 0,
-            'profit_factor': abs(winning_trades['pnl'].sum() / losing_trades['pnl'].sum()) if len(losing_trades) > 0 else float('inf'),
-            'average_win': winning_trades['pnl'].mean() if len(winning_trades) > 0 else 0,
-            'average_loss': abs(losing_trades['pnl'].mean()) if len(losing_trades) > 0 else 0,
-            'largest_win': winning_trades['pnl'].max() if len(winning_trades) > 0 else 0,
-            'largest_loss': abs(losing_trades['pnl'].min()) if len(losing_trades) > 0 else 0,
-            'total_pnl': df['pnl'].sum()
+            'trades': trades,
+            'metrics': metrics,
+            'combined_trades': combined_trades,
+            'combined_metrics': self.calculate_metrics(combined_trades)
         }
+
+    def get_performance_metrics(self) -> Dict:
+        """Performance metrics of the latest run; reads running totals, so it is cheap to poll mid-run"""
+        if self.performance is None:
+            return PerformanceAccumulator().summary()
+        return self.performance.summary()
+
+    @staticmethod
+    def calculate_metrics(df: pd.DataFrame) -> Dict:
+        """Calculate trade metrics from a trades DataFrame"""
+        performance = PerformanceAccumulator()
+        if len(df) > 0:
+            performance.record_trades(df['pnl'].to_numpy())
+        return performance.summary()
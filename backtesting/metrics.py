@@ -0,0 +1,263 @@
+# fvg_trading_bot/backtesting/metrics.py
+from typing import Dict
+import math
+import numpy as np
+import pandas as pd
+
+BARS_PER_YEAR = 252 * 78  # 5-minute bars in a year of regular US sessions
+
+class PerformanceAccumulator:
+    """
+    Running backtest statistics, updated as trades close and bars are marked.
+
+    record_trade() updates the trade statistics and the drawdown of realized
+    equity in O(1). mark() records the mark-to-market equity of one bar and
+    keeps running moments of the bar returns (Welford), so Sharpe and Sortino
+    ratios, exposure and the largest equity drawdown are current at every
+    bar. summary() only reads these scalars, so it can be polled freely while
+    a run is in progress. record_trades() and mark_many() fold whole arrays
+    in at once and give the same results.
+    """
+
+    def __init__(self, initial_capital: float = 0.0, bars_per_year: float = BARS_PER_YEAR,
+                 keep_curve: bool = True, capacity: int = 1024):
+        self.initial_capital = initial_capital
+        self.bars_per_year = bars_per_year  # Annualises the per-bar Sharpe and Sortino ratios
+        self.keep_curve = keep_curve  # Store every marked bar for equity_curve()
+
+        # Closed trades
+        self.total_trades = 0
+        self.winning_trades = 0
+        self.losing_trades = 0
+        self.gross_profit = 0.0
+        self.gross_loss = 0.0  # Sum of losing P&L, negative
+        self.largest_win = 0.0
+        self.largest_loss = 0.0  # Most negative P&L
+        self.realized_pnl = 0.0
+        self._realized_peak = initial_capital
+        self.max_drawdown = 0.0  # Of realized equity, trade by trade
+
+        # Marked bars
+        self.bars = 0
+        self.exposed_bars = 0
+        self.equity = initial_capital  # Latest mark-to-market equity
+        self.peak_equity = initial_capital
+        self.max_equity_drawdown = 0.0
+        self.max_equity_drawdown_pct = 0.0
+        self._returns = 0
+        self._mean_return = 0.0
+        self._return_m2 = 0.0  # Sum of squared deviations from the mean return
+        self._downside_sq = 0.0  # Sum of squared negative returns
+        self._timestamps = np.empty(capacity if keep_curve else 0, dtype=np.int64)
+        self._curve = np.empty(capacity if keep_curve else 0, dtype=np.float64)
+        self.tz = None
+
+    @property
+    def realized_equity(self) -> float:
+        return self.initial_capital + self.realized_pnl
+
+    def record_trade(self, pnl: float) -> None:
+        """Add one closed trade's P&L"""
+        self.total_trades += 1
+        if pnl > 0:
+            self.winning_trades += 1
+            self.gross_profit += pnl
+            self.largest_win = max(self.largest_win, pnl)
+        elif pnl < 0:
+            self.losing_trades += 1
+            self.gross_loss += pnl
+            self.largest_loss = min(self.largest_loss, pnl)
+        self.realized_pnl += pnl
+
+        equity = self.realized_equity
+        if equity > self._realized_peak:
+            self._realized_peak = equity
+        else:
+            self.max_drawdown = max(self.max_drawdown, self._realized_peak - equity)
+
+    def record_trades(self, pnl) -> None:
+        """Add many closed trades' P&L in order"""
+        pnl = np.asarray(pnl, dtype=np.float64)
+        if len(pnl) == 0:
+            return
+        wins = pnl[pnl > 0]
+        losses = pnl[pnl < 0]
+        self.total_trades += len(pnl)
+        self.winning_trades += len(wins)
+        self.losing_trades += len(losses)
+        self.gross_profit += float(wins.sum())
+        self.gross_loss += float(losses.sum())
+        if len(wins):
+            self.largest_win = max(self.largest_win, float(wins.max()))
+        if len(losses):
+            self.largest_loss = min(self.largest_loss, float(losses.min()))
+
+        equity = self.realized_equity + np.cumsum(pnl)
+        peaks = np.maximum.accumulate(np.maximum(equity, self._realized_peak))
+        self.max_drawdown = max(self.max_drawdown, float((peaks - equity).max()))
+        self._realized_peak = float(peaks[-1])
+        self.realized_pnl += float(pnl.sum())
+
+    def mark(self, timestamp: int, equity: float, exposed: bool = False) -> None:
+        """Record one bar's mark-to-market equity (timestamp in ns) and whether a position was open"""
+        if self.keep_curve:
+            self._reserve(1)
+            self._timestamps[self.bars] = timestamp
+            self._curve[self.bars] = equity
+        if self.bars > 0 and self.equity != 0:
+            self._add_return(equity / self.equity - 1.0)
+        self.bars += 1
+        if exposed:
+            self.exposed_bars += 1
+        self.equity = equity
+
+        if equity > self.peak_equity:
+            self.peak_equity = equity
+        else:
+            drawdown = self.peak_equity - equity
+            if drawdown > self.max_equity_drawdown:
+                self.max_equity_drawdown = drawdown
+            if self.peak_equity > 0:
+                self.max_equity_drawdown_pct = max(self.max_equity_drawdown_pct,
+                                                   drawdown / self.peak_equity)
+
+    def mark_many(self, timestamps: np.ndarray, equity: np.ndarray, exposed: np.ndarray) -> None:
+        """Record many consecutive bars at once"""
+        equity = np.asarray(equity, dtype=np.float64)
+        n = len(equity)
+        if n == 0:
+            return
+        previous = np.concatenate([[self.equity], equity[:-1]]) if self.bars > 0 else equity[:-1]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns = equity[len(equity) - len(previous):] / previous - 1.0
+        returns = returns[np.isfinite(returns)]
+        if len(returns):
+            # Merge the batch's moments into the running ones (Chan et al.)
+            count = self._returns + len(returns)
+            batch_mean = float(returns.mean())
+            delta = batch_mean - self._mean_return
+            self._return_m2 += (float(((returns - batch_mean) ** 2).sum()) +
+                                delta * delta * self._returns * len(returns) / count)
+            self._mean_return += delta * len(returns) / count
+            self._returns = count
+            self._downside_sq += float((np.minimum(returns, 0.0) ** 2).sum())
+
+        peaks = np.maximum.accumulate(np.maximum(equity, self.peak_equity))
+        drawdown = peaks - equity
+        self.max_equity_drawdown = max(self.max_equity_drawdown, float(drawdown.max()))
+        positive = peaks > 0
+        if positive.any():
+            self.max_equity_drawdown_pct = max(self.max_equity_drawdown_pct,
+                                               float((drawdown[positive] / peaks[positive]).max()))
+        self.peak_equity = float(peaks[-1])
+        self.exposed_bars += int(np.count_nonzero(exposed))
+        self.equity = float(equity[-1])
+
+        if self.keep_curve:
+            self._reserve(n)
+            self._timestamps[self.bars:self.bars + n] = timestamps
+            self._curve[self.bars:self.bars + n] = equity
+        self.bars += n
+
+    def sharpe_ratio(self) -> float:
+        """Annualised mean over standard deviation of per-bar returns"""
+        if self._returns < 2:
+            return 0.0
+        std = math.sqrt(self._return_m2 / (self._returns - 1))
+        return self._mean_return / std * math.sqrt(self.bars_per_year) if std > 0 else 0.0
+
+    def sortino_ratio(self) -> float:
+        """Annualised mean per-bar return over its downside deviation"""
+        if self._returns < 2:
+            return 0.0
+        downside = math.sqrt(self._downside_sq / self._returns)
+        return self._mean_return / downside * math.sqrt(self.bars_per_year) if downside > 0 else 0.0
+
+    def summary(self) -> Dict:
+        """Current metrics; bar metrics are included once a bar has been marked"""
+        if self.total_trades == 0:
+            metrics = {
+                'total_trades': 0,
+                'win_rate': 0,
+                'profit_factor': 0,
+                'average_win': 0,
+                'average_loss': 0,
+                'largest_win': 0,
+                'largest_loss': 0,
+                'total_pnl': 0,
+                'max_drawdown': 0
+            }
+        else:
+            metrics = {
+                'total_trades': self.total_trades,
+                'win_rate': self.winning_trades / self.total_trades,
+                'profit_factor': abs(self.gross_profit / self.gross_loss) if self.losing_trades else float('inf'),
+                'average_win': self.gross_profit / self.winning_trades if self.winning_trades else 0,
+                'average_loss': abs(self.gross_loss / self.losing_trades) if self.losing_trades else 0,
+                'largest_win': self.largest_win,
+                'largest_loss': abs(self.largest_loss),
+                'total_pnl': self.realized_pnl,
+                'max_drawdown': self.max_drawdown
+            }
+        if self.bars:
+            metrics.update({
+                'final_equity': self.equity,
+                'max_equity_drawdown': self.max_equity_drawdown,
+                'max_equity_drawdown_pct': self.max_equity_drawdown_pct,
+                'sharpe_ratio': self.sharpe_ratio(),
+                'sortino_ratio': self.sortino_ratio(),
+                'exposure': self.exposed_bars / self.bars
+            })
+        return metrics
+
+    def equity_curve(self) -> pd.Series:
+        """Marked equity per bar, indexed by bar time"""
+        index = pd.DatetimeIndex(self._timestamps[:self.bars].astype('datetime64[ns]'))
+        if self.tz is not None:
+            index = index.tz_localize('UTC').tz_convert(self.tz)
+        return pd.Series(self._curve[:self.bars].copy(), index=index, name='equity')
+
+    def drawdown_curve(self) -> pd.Series:
+        """Distance of the equity curve below its running peak (non-positive)"""
+        equity = self.equity_curve()
+        return (equity - equity.cummax()).rename('drawdown')
+
+    def _add_return(self, value: float) -> None:
+        self._returns += 1
+        delta = value - self._mean_return
+        self._mean_return += delta / self._returns
+        self._return_m2 += delta * (value - self._mean_return)
+        if value < 0:
+            self._downside_sq += value * value
+
+    def _reserve(self, count: int) -> None:
+        needed = self.bars + count
+        if needed <= len(self._curve):
+            return
+        capacity = max(needed, 2 * len(self._curve), 1)
+        for name in ('_timestamps', '_curve'):
+            grown = np.empty(capacity, dtype=getattr(self, name).dtype)
+            grown[:self.bars] = getattr(self, name)[:self.bars]
+            setattr(self, name, grown)
+
+def mark_to_market(df: pd.DataFrame, trades, start_equity: float):
+    """Per-bar equity and exposure of a trade list replayed on df's closes
+
+    Trades must come from df and not overlap. Open P&L is marked at each
+    close from the entry bar until the exit bar, where the P&L is realized.
+    """
+    close = df['Close'].to_numpy(dtype=np.float64)
+    realized = np.zeros(len(close))
+    open_pnl = np.zeros(len(close))
+    exposed = np.zeros(len(close), dtype=bool)
+    if len(trades):
+        trades = pd.DataFrame(trades)
+        entries = df.index.get_indexer(trades['entry_time'])
+        exits = df.index.get_indexer(trades['exit_time'])
+        sign = np.where(trades['direction'].to_numpy() == 'bullish', 1.0, -1.0)
+        for entry, exit_, direction, price, size, pnl in zip(
+                entries, exits, sign, trades['entry_price'], trades['size'], trades['pnl']):
+            open_pnl[entry:exit_] = direction * (close[entry:exit_] - price) * size
+            exposed[entry:exit_] = True
+            realized[exit_] += pnl
+    return start_equity + np.cumsum(realized) + open_pnl, exposed
@@ -0,0 +1,87 @@
+# fvg_trading_bot/backtesting/parameter_sweep.py
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from typing import Dict, List, Optional
+import os
+import pandas as pd
+from backtesting.backtester import Backtester
+from backtesting.vectorized_engine import SignalFeatures, VectorizedEngine
+from trading.trading_bot import TradingBot
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+SWEEP_PARAMETERS = ('min_gap_size', 'volume_threshold', 'risk_per_trade')
+
+# Per-process state, set once by _init_worker so features are pickled once per worker
+_worker_engine: Optional[VectorizedEngine] = None
+_worker_features: Dict[str, SignalFeatures] = {}
+_worker_capital = 0.0
+
+def _init_worker(engine: VectorizedEngine, features: Dict[str, SignalFeatures],
+                 initial_capital: float) -> None:
+    global _worker_engine, _worker_features, _worker_capital
+    _worker_engine = engine
+    _worker_features = features
+    _worker_capital = initial_capital
+
+def _evaluate(config: Dict[str, float]) -> Dict:
+    """Simulate one configuration on every symbol and summarise the combined trades"""
+    trades = []
+    for symbol, features in _worker_features.items():
+        symbol_trades = _worker_engine.simulate(features, _worker_capital, **config)
+        trades.extend({**trade, 'symbol': symbol} for trade in symbol_trades)
+    return {**config, **Backtester.calculate_metrics(pd.DataFrame(trades))}
+
+class ParameterSweep:
+    """
+    Grid search over detector thresholds and risk per trade.
+
+    Gap candidates and structure signals are computed once per symbol with
+    no size or volume filter; each configuration only applies array masks
+    and runs the vectorized engine's single simulation pass.
+    """
+
+    def __init__(self, trading_bot: TradingBot):
+        self.engine = VectorizedEngine(trading_bot)
+
+    def compute_features(self, data: Dict[str, pd.DataFrame]) -> Dict[str, SignalFeatures]:
+        """Precompute signal features for every symbol"""
+        return {symbol: self.engine.compute_features(df) for symbol, df in data.items()}
+
+    def run(self, data: Dict[str, pd.DataFrame], param_grid: Dict[str, List[float]],
+            initial_capital: float, max_workers: Optional[int] = None,
+            rank_by: str = 'total_pnl') -> pd.DataFrame:
+        """Evaluate every combination in param_grid and return them ranked by rank_by
+
+        Parameters missing from param_grid keep the trading bot's current value.
+        """
+        return self.run_features(self.compute_features(data), param_grid, initial_capital,
+                                 max_workers=max_workers, rank_by=rank_by)
+
+    def run_features(self, features: Dict[str, SignalFeatures], param_grid: Dict[str, List[float]],
+                     initial_capital: float, max_workers: Optional[int] = None,
+                     rank_by: str = 'total_pnl') -> pd.DataFrame:
+        """Evaluate param_grid on precomputed features"""
+        unknown = set(param_grid) - set(SWEEP_PARAMETERS)
+        if unknown:
+            raise ValueError(f"Unknown sweep parameters: {sorted(unknown)}")
+
+        names = list(param_grid)
+        configs = [dict(zip(names, values)) for values in product(*param_grid.values())]
+        logger.info(f"Sweeping {len(configs)} configurations over {len(features)} symbols")
+
+        init_args = (self.engine, features, initial_capital)
+        if max_workers == 1:
+            _init_worker(*init_args)
+            rows = [_evaluate(config) for config in configs]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                     initargs=init_args) as executor:
+                chunksize = max(1, len(configs) // (4 * (max_workers or os.cpu_count() or 1)))
+                rows = list(executor.map(_evaluate, configs, chunksize=chunksize))
+
+        results = pd.DataFrame(rows)
+        if len(results) == 0:
+            return results
+        return results.sort_values(rank_by, ascending=False, kind='stable').reset_index(drop=True)
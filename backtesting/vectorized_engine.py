@@ -0,0 +1,230 @@
+# fvg_trading_bot/backtesting/vectorized_engine.py
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+import math
+import numpy as np
+import pandas as pd
+from analyzers.fvg_book import FVGBook
+from models.fair_value_gap import FairValueGap
+from trading.trading_bot import TradingBot
+
+@dataclass
+class SignalFeatures:
+    """Columnar gap candidates and structure signals for one price series"""
+    index: pd.Index
+    close: np.ndarray
+    gap_bar: np.ndarray # Bar on which each candidate gap completes
+    gap_bearish: np.ndarray
+    gap_lower: np.ndarray
+    gap_upper: np.ndarray
+    gap_size: np.ndarray
+    gap_volume_weight: np.ndarray
+    bullish_bos: np.ndarray # Close is above an active resistance level
+    bearish_bos: np.ndarray # Close is below an active support level
+
+    def __len__(self) -> int:
+        return len(self.close)
+
+    def window(self, start: int, stop: int) -> 'SignalFeatures':
+        """Features of bars start..stop-1, keeping the look-back of the full series
+
+        Only gaps whose three bars all fall inside the window are kept.
+        """
+        keep = (self.gap_bar >= start + 2) & (self.gap_bar < stop)
+        return SignalFeatures(
+            index=self.index[start:stop],
+            close=self.close[start:stop],
+            gap_bar=self.gap_bar[keep] - start,
+            gap_bearish=self.gap_bearish[keep],
+            gap_lower=self.gap_lower[keep],
+            gap_upper=self.gap_upper[keep],
+            gap_size=self.gap_size[keep],
+            gap_volume_weight=self.gap_volume_weight[keep],
+            bullish_bos=self.bullish_bos[start:stop],
+            bearish_bos=self.bearish_bos[start:stop]
+        )
+
+class VectorizedEngine:
+    """
+    Backtest engine that precomputes every signal for the whole series.
+
+    Gap candidates, their volume weights and the break-of-structure flags
+    are computed once as arrays. simulate() then resolves entries and exits
+    in a single pass, reproducing Backtester's event engine trade for trade.
+    """
+
+    def __init__(self, trading_bot: TradingBot):
+        self.trading_bot = trading_bot
+
+    def run(self, df: pd.DataFrame, initial_capital: float) -> List[Dict]:
+        """Backtest one price series and return its closed trades"""
+        return self.simulate(self.compute_features(df), initial_capital)
+
+    def compute_features(self, df: pd.DataFrame) -> SignalFeatures:
+        """Detect all gap candidates and structure breaks, ignoring size and volume thresholds"""
+        fvg_detector = self.trading_bot.fvg_detector
+        high = df['High'].to_numpy(dtype=np.float64)
+        low = df['Low'].to_numpy(dtype=np.float64)
+        close = df['Close'].to_numpy(dtype=np.float64)
+        volume = df['Volume'].to_numpy(dtype=np.float64)
+
+        # Bar t completes a gap between bar t-2 and bar t
+        bars = np.arange(2, len(df))
+        first_high, first_low = high[:-2], low[:-2]
+        bullish = (low[2:] > first_high) & (close[2:] > first_high)
+        bearish = (high[2:] < first_low) & (close[2:] < first_low)
+
+        # Same bar order as the streaming detector: bullish before bearish
+        gap_bar = np.concatenate([bars[bullish], bars[bearish]])
+        gap_bearish = np.concatenate([np.zeros(bullish.sum(), dtype=bool), np.ones(bearish.sum(), dtype=bool)])
+        order = np.lexsort((gap_bearish, gap_bar))
+        gap_bar, gap_bearish = gap_bar[order], gap_bearish[order]
+
+        gap_lower = np.where(gap_bearish, high[gap_bar], high[gap_bar - 2])
+        gap_upper = np.where(gap_bearish, low[gap_bar - 2], low[gap_bar])
+
+        # Trailing volume baseline, summed exactly like FVGDetector.on_bar
+        window = fvg_detector.volume_window
+        gap_volume_weight = np.empty(len(gap_bar))
+        for k, t in enumerate(gap_bar.tolist()):
+            recent = volume[max(0, t - window + 1):t + 1].tolist()
+            gap_volume_weight[k] = volume[t - 1] / (math.fsum(recent) / len(recent))
+
+        bullish_bos, bearish_bos = self._structure_breaks(high, low, close)
+
+        return SignalFeatures(
+            index=df.index,
+            close=close,
+            gap_bar=gap_bar,
+            gap_bearish=gap_bearish,
+            gap_lower=gap_lower,
+            gap_upper=gap_upper,
+            gap_size=gap_upper - gap_lower,
+            gap_volume_weight=gap_volume_weight,
+            bullish_bos=bullish_bos,
+            bearish_bos=bearish_bos
+        )
+
+    def gap_mask(self, features: SignalFeatures, min_gap_size: float,
+                 volume_threshold: float) -> np.ndarray:
+        """Select the candidates that pass a size and volume configuration"""
+        return ((features.gap_size >= min_gap_size) &
+                (features.gap_volume_weight >= volume_threshold))
+
+    def simulate(self, features: SignalFeatures, initial_capital: float,
+                 min_gap_size: Optional[float] = None, volume_threshold: Optional[float] = None,
+                 risk_per_trade: Optional[float] = None) -> List[Dict]:
+        """Resolve entries and exits in one pass; thresholds default to the bot's settings"""
+        fvg_detector = self.trading_bot.fvg_detector
+        if min_gap_size is None:
+            min_gap_size = fvg_detector.min_gap_size
+        if volume_threshold is None:
+            volume_threshold = fvg_detector.volume_threshold
+        if risk_per_trade is None:
+            risk_per_trade = self.trading_bot.risk_per_trade
+
+        mask = self.gap_mask(features, min_gap_size, volume_threshold)
+        gap_bar = features.gap_bar[mask].tolist()
+        gap_bearish = features.gap_bearish[mask].tolist()
+        gap_lower = features.gap_lower[mask].tolist()
+        gap_upper = features.gap_upper[mask].tolist()
+        gap_volume_weight = features.gap_volume_weight[mask].tolist()
+        index = features.index
+        closes = features.close
+        bullish_bos = features.bullish_bos.tolist()
+        bearish_bos = features.bearish_bos.tolist()
+
+        book = FVGBook()
+        trades = []
+        capital = initial_capital
+        current_trade = None
+        next_gap = 0
+
+        for i in range(len(closes)):
+            current_price = closes[i]
+            book.mitigate(current_price)
+            while next_gap < len(gap_bar) and gap_bar[next_gap] == i:
+                k = next_gap
+                book.add(FairValueGap(
+                    start_time=index[i - 2],
+                    end_time=index[i],
+                    upper_price=gap_upper[k],
+                    lower_price=gap_lower[k],
+                    volume_weight=gap_volume_weight[k],
+                    direction='bearish' if gap_bearish[k] else 'bullish',
+                    mitigated=False
+                ))
+                next_gap += 1
+
+            if i < 3:
+                continue
+
+            if current_trade is None:
+                if not (bullish_bos[i] or bearish_bos[i]):
+                    continue
+
+                # Last gap in detection order wins, as in the event engine
+                entry_fvg = None
+                for fvg in book.containing(current_price):
+                    if bullish_bos[i] if fvg.direction == 'bullish' else bearish_bos[i]:
+                        entry_fvg = fvg
+                if entry_fvg is None:
+                    continue
+
+                entry_price = current_price
+                if entry_fvg.direction == 'bullish':
+                    stop_loss = entry_fvg.lower_price
+                    take_profit = entry_price + (entry_price - stop_loss) * 2
+                else:
+                    stop_loss = entry_fvg.upper_price
+                    take_profit = entry_price - (stop_loss - entry_price) * 2
+
+                risk_amount = capital * risk_per_trade
+                current_trade = {
+                    'entry_price': entry_price,
+                    'stop_loss': stop_loss,
+                    'take_profit': take_profit,
+                    'direction': entry_fvg.direction,
+                    'size': risk_amount / abs(entry_price - stop_loss),
+                    'entry_time': index[i],
+                    'volume_weight': entry_fvg.volume_weight
+                }
+
+            elif current_trade['direction'] == 'bullish':
+                if (current_price <= current_trade['stop_loss'] or
+                        current_price >= current_trade['take_profit']):
+                    pnl = (current_price - current_trade['entry_price']) * current_trade['size']
+                    capital += pnl
+                    trades.append({**current_trade, 'exit_price': current_price,
+                                   'exit_time': index[i], 'pnl': pnl})
+                    current_trade = None
+
+            else:  # bearish
+                if (current_price >= current_trade['stop_loss'] or
+                        current_price <= current_trade['take_profit']):
+                    pnl = (current_trade['entry_price'] - current_price) * current_trade['size']
+                    capital += pnl
+                    trades.append({**current_trade, 'exit_price': current_price,
+                                   'exit_time': index[i], 'pnl': pnl})
+                    current_trade = None
+
+        return trades
+
+    def _structure_breaks(self, high: np.ndarray, low: np.ndarray, close: np.ndarray):
+        """Flag bars whose close is beyond a swing level still held by StructureAnalyzer.on_bar"""
+        structure_analyzer = self.trading_bot.structure_analyzer
+        width = structure_analyzer.swing_width
+        max_age = structure_analyzer.level_index.max_age
+
+        # At bar i the active swings are bars i - max_age .. i - width
+        span = max_age - width + 1
+        if span <= 0:
+            no_break = np.zeros(len(close), dtype=bool)
+            return no_break, no_break.copy()
+
+        resistance = pd.Series(np.where(structure_analyzer.swing_highs(high), high, np.inf))
+        support = pd.Series(np.where(structure_analyzer.swing_lows(low), low, -np.inf))
+        lowest_resistance = resistance.rolling(span, min_periods=1).min().shift(width).to_numpy()
+        highest_support = support.rolling(span, min_periods=1).max().shift(width).to_numpy()
+
+        return close > lowest_resistance, close < highest_support
@@ -0,0 +1,160 @@
+# fvg_trading_bot/backtesting/walk_forward.py
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+import pandas as pd
+from backtesting.backtester import Backtester
+from backtesting.metrics import PerformanceAccumulator, mark_to_market
+from backtesting.parameter_sweep import ParameterSweep
+from backtesting.vectorized_engine import SignalFeatures
+from trading.trading_bot import TradingBot
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+Window = Tuple[pd.Timestamp, pd.Timestamp, pd.Timestamp]  # Train start, test start, test end (exclusive)
+
+# Per-process state, set once by _init_worker so features are pickled once per worker
+_worker_sweep: Optional[ParameterSweep] = None
+_worker_features: Dict[str, SignalFeatures] = {}
+_worker_grid: Dict[str, List[float]] = {}
+_worker_capital = 0.0
+_worker_rank_by = 'total_pnl'
+
+def _init_worker(sweep: ParameterSweep, features: Dict[str, SignalFeatures],
+                 param_grid: Dict[str, List[float]], initial_capital: float, rank_by: str) -> None:
+    global _worker_sweep, _worker_features, _worker_grid, _worker_capital, _worker_rank_by
+    _worker_sweep = sweep
+    _worker_features = features
+    _worker_grid = param_grid
+    _worker_capital = initial_capital
+    _worker_rank_by = rank_by
+
+def _slice(features: Dict[str, SignalFeatures], start: pd.Timestamp,
+           stop: pd.Timestamp) -> Dict[str, SignalFeatures]:
+    """Every symbol's features for bars in [start, stop)"""
+    return {symbol: symbol_features.window(*symbol_features.index.searchsorted([start, stop]))
+            for symbol, symbol_features in features.items()}
+
+def _run_window(window: Window) -> Tuple[Dict, List[Dict], pd.DataFrame]:
+    """Pick the best configuration on the train bars and trade it on the test bars"""
+    train_start, test_start, test_end = window
+    ranked = _worker_sweep.run_features(_slice(_worker_features, train_start, test_start), _worker_grid,
+                                        _worker_capital, max_workers=1, rank_by=_worker_rank_by)
+    params = {name: ranked.iloc[0][name] for name in _worker_grid}
+
+    trades, pnl, exposed = [], [], []
+    for symbol, features in _slice(_worker_features, test_start, test_end).items():
+        symbol_trades = _worker_sweep.engine.simulate(features, _worker_capital, **params)
+        trades.extend({**trade, 'symbol': symbol} for trade in symbol_trades)
+        symbol_pnl, symbol_exposed = mark_to_market(
+            pd.DataFrame({'Close': features.close}, index=features.index), symbol_trades, 0.0)
+        pnl.append(pd.Series(symbol_pnl, index=features.index))
+        exposed.append(pd.Series(symbol_exposed, index=features.index))
+
+    # Symbols without a bar at some time keep their last P&L
+    curve = pd.DataFrame({
+        'pnl': pd.concat(pnl, axis=1).ffill().fillna(0.0).sum(axis=1),
+        'exposed': pd.concat(exposed, axis=1).eq(True).any(axis=1)
+    }) if pnl else pd.DataFrame({'pnl': pd.Series(dtype=float), 'exposed': pd.Series(dtype=bool)})
+    metrics = Backtester.calculate_metrics(pd.DataFrame(trades))
+    row = {
+        'train_start': train_start,
+        'test_start': test_start,
+        'test_end': test_end,
+        **params,
+        f'train_{_worker_rank_by}': ranked.iloc[0][_worker_rank_by],
+        **{f'test_{name}': value for name, value in metrics.items()}
+    }
+    return row, trades, curve
+
+@dataclass
+class WalkForwardResult:
+    """Chosen parameters per window and the out-of-sample trades and equity"""
+    windows: pd.DataFrame  # One row per window: its bounds, parameters and train/test metrics
+    trades: pd.DataFrame  # Out-of-sample trades of every window, with their symbol
+    equity: pd.Series  # Out-of-sample mark-to-market equity, windows stitched end to end
+    metrics: Dict  # PerformanceAccumulator summary of the stitched trades and equity
+
+class WalkForward:
+    """
+    Rolling walk-forward optimization on the vectorized engine.
+
+    History is split into train windows of train_period followed by test
+    windows of test_period; windows advance by test_period, so the test
+    windows tile the history after the first train window. anchored=True
+    grows each train window from the start of the data instead of rolling
+    it. Each window sweeps param_grid on its train bars with ParameterSweep
+    and trades the best configuration on the following test bars.
+
+    Signal features are computed once over the whole history and sliced
+    per window, so overlapping train windows share them and every window
+    keeps the look-back of the bars before it. Windows are independent and
+    run in parallel. Each test window starts from initial_capital, and a
+    trade still open at the end of a test window is dropped.
+    """
+
+    def __init__(self, trading_bot: TradingBot, train_period: str, test_period: str,
+                 anchored: bool = False):
+        self.sweep = ParameterSweep(trading_bot)
+        self.train_period = pd.Timedelta(train_period)
+        self.test_period = pd.Timedelta(test_period)
+        self.anchored = anchored
+
+    def windows(self, first: pd.Timestamp, last: pd.Timestamp) -> List[Window]:
+        """Train and test bounds for bars from first to last; the last test window may run past last"""
+        windows = []
+        test_start = first + self.train_period
+        while test_start <= last:
+            train_start = first if self.anchored else test_start - self.train_period
+            windows.append((train_start, test_start, test_start + self.test_period))
+            test_start += self.test_period
+        return windows
+
+    def run(self, data: Dict[str, pd.DataFrame], param_grid: Dict[str, List[float]],
+            initial_capital: float, max_workers: Optional[int] = None,
+            rank_by: str = 'total_pnl') -> WalkForwardResult:
+        """Walk forward through data, optimizing param_grid by rank_by on every train window"""
+        return self.run_features(self.sweep.compute_features(data), param_grid, initial_capital,
+                                 max_workers=max_workers, rank_by=rank_by)
+
+    def run_features(self, features: Dict[str, SignalFeatures], param_grid: Dict[str, List[float]],
+                     initial_capital: float, max_workers: Optional[int] = None,
+                     rank_by: str = 'total_pnl') -> WalkForwardResult:
+        """Walk forward through precomputed features"""
+        windows = self.windows(min(symbol_features.index[0] for symbol_features in features.values()),
+                               max(symbol_features.index[-1] for symbol_features in features.values()))
+        if not windows:
+            raise ValueError(f"History is shorter than the train period {self.train_period}")
+        logger.info(f"Walking forward through {len(windows)} windows over {len(features)} symbols")
+
+        init_args = (self.sweep, features, param_grid, initial_capital, rank_by)
+        if max_workers == 1:
+            _init_worker(*init_args)
+            results = [_run_window(window) for window in windows]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                     initargs=init_args) as executor:
+                results = list(executor.map(_run_window, windows))
+
+        # Each window's P&L starts at zero; carry the previous windows' total forward
+        segments, offset = [], initial_capital
+        for _, _, curve in results:
+            segments.append(curve.assign(pnl=curve['pnl'] + offset))
+            if len(curve):
+                offset += curve['pnl'].iloc[-1]
+        curve = pd.concat(segments)
+        equity = curve['pnl'].rename('equity')
+        trades = pd.DataFrame([trade for _, window_trades, _ in results for trade in window_trades])
+
+        performance = PerformanceAccumulator(initial_capital, keep_curve=False)
+        if len(trades) > 0:
+            performance.record_trades(trades['pnl'].to_numpy())
+        performance.mark_many(equity.index.asi8, equity.to_numpy(), curve['exposed'].to_numpy(dtype=bool))
+
+        return WalkForwardResult(
+            windows=pd.DataFrame([row for row, _, _ in results]),
+            trades=trades,
+            equity=equity,
+            metrics=performance.summary()
+        )
@@ -0,0 +1 @@
+# fvg_trading_bot/benchmarks
@@ -0,0 +1,124 @@
+# fvg_trading_bot/benchmarks/cases.py
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Tuple
+import numpy as np
+import pandas as pd
+from analyzers.fvg_detector import FVGDetector
+from analyzers.structure_analyzer import StructureAnalyzer
+from backtesting.backtester import Backtester
+from backtesting.metrics import PerformanceAccumulator, mark_to_market
+from backtesting.monte_carlo import MonteCarlo
+from backtesting.vectorized_engine import VectorizedEngine
+from benchmarks.data import START, SyntheticSource, synthetic_bars
+from trading.trading_bot import TradingBot
+
+INITIAL_CAPITAL = 100000
+BARS_PER_SYMBOL = 1000
+MONTE_CARLO_TRADES = 5000
+
+@dataclass
+class BenchmarkCase:
+    """One timed hot path, run at each of its sizes"""
+    name: str
+    sizes: Tuple[int, ...]
+    setup: Callable[[int], Any]  # Builds the inputs for one size, untimed
+    run: Callable[[Any], Any]
+    bars: Callable[[int], int] = lambda size: size  # Bars processed at a size
+
+def _bot(source: SyntheticSource, symbols: List[str]) -> TradingBot:
+    return TradingBot(symbols, data_source=source)
+
+def _backtest_args(size: int) -> Dict:
+    source = SyntheticSource(size)
+    return {'backtester': Backtester(_bot(source, ['SYN']), source), 'end': str(source.end())}
+
+def _run_backtest(args: Dict, engine: str):
+    args['backtester'].reset()
+    return args['backtester'].run('SYN', str(START), args['end'], INITIAL_CAPITAL, engine=engine)
+
+def _metrics_args(size: int) -> Dict:
+    """A backtest's trade P&L and per-bar equity, to be fed through a fresh PerformanceAccumulator"""
+    source = SyntheticSource(size)
+    backtester = Backtester(_bot(source, ['SYN']), source)
+    df = backtester.fetch_history('SYN', str(START), str(source.end()))
+    trades = VectorizedEngine(backtester.trading_bot).run(df, INITIAL_CAPITAL)
+    equity, exposed = mark_to_market(df, trades, INITIAL_CAPITAL)
+    return {'pnl': np.array([trade['pnl'] for trade in trades]),
+            'timestamps': pd.DatetimeIndex(df.index).as_unit('ns').asi8, 'equity': equity, 'exposed': exposed}
+
+def _stream_metrics(args: Dict) -> Dict:
+    """One record_trade() per trade and one mark() per bar, as the event engine calls them"""
+    performance = PerformanceAccumulator(INITIAL_CAPITAL)
+    for pnl in args['pnl'].tolist():
+        performance.record_trade(pnl)
+    for timestamp, equity, exposed in zip(args['timestamps'].tolist(), args['equity'].tolist(),
+                                          args['exposed'].tolist()):
+        performance.mark(timestamp, equity, exposed)
+    return performance.summary()
+
+def _batch_metrics(args: Dict) -> Dict:
+    """record_trades() and mark_many() over whole arrays, as the vectorized engine calls them"""
+    performance = PerformanceAccumulator(INITIAL_CAPITAL)
+    performance.record_trades(args['pnl'])
+    performance.mark_many(args['timestamps'], args['equity'], args['exposed'])
+    return performance.summary()
+
+def _run_many_args(n_symbols: int) -> Dict:
+    source = SyntheticSource(BARS_PER_SYMBOL)
+    symbols = [f'SYM{k:04d}' for k in range(n_symbols)]
+    return {'backtester': Backtester(_bot(source, symbols), source), 'symbols': symbols,
+            'end': str(source.end())}
+
+def _monte_carlo_args(n_resamples: int) -> Dict:
+    pnl = np.random.default_rng(0).normal(20, 300, MONTE_CARLO_TRADES)
+    return {'monte_carlo': MonteCarlo(INITIAL_CAPITAL, seed=0), 'pnl': pnl, 'n_resamples': n_resamples}
+
+def default_cases(sizes: Tuple[int, ...] = (10_000, 100_000, 1_000_000),
+                  symbol_counts: Tuple[int, ...] = (10, 100, 1000),
+                  resample_counts: Tuple[int, ...] = (1000, 10_000, 100_000)) -> List[BenchmarkCase]:
+    """The hot paths tracked against benchmarks/baselines.json"""
+    return [
+        BenchmarkCase(
+            'find_fvg', sizes,
+            setup=synthetic_bars,
+            run=lambda df: FVGDetector(min_gap_size=0.01, volume_threshold=1.5).find_fvg(df)
+        ),
+        BenchmarkCase(
+            'find_support_resistance', sizes,
+            setup=synthetic_bars,
+            run=lambda df: StructureAnalyzer().find_support_resistance(df)
+        ),
+        BenchmarkCase(
+            'backtest_event', sizes,
+            setup=_backtest_args,
+            run=lambda args: _run_backtest(args, 'event')
+        ),
+        BenchmarkCase(
+            'backtest_vectorized', sizes,
+            setup=_backtest_args,
+            run=lambda args: _run_backtest(args, 'vectorized')
+        ),
+        BenchmarkCase(
+            'performance_metrics', sizes,
+            setup=_metrics_args,
+            run=_stream_metrics
+        ),
+        BenchmarkCase(
+            'performance_metrics_batch', sizes,
+            setup=_metrics_args,
+            run=_batch_metrics
+        ),
+        BenchmarkCase(
+            'run_many', symbol_counts,
+            setup=_run_many_args,
+            run=lambda args: args['backtester'].run_many(
+                args['symbols'], str(START), args['end'], INITIAL_CAPITAL),
+            bars=lambda n_symbols: n_symbols * BARS_PER_SYMBOL
+        ),
+        BenchmarkCase(
+            'monte_carlo', resample_counts,
+            setup=_monte_carlo_args,
+            run=lambda args: args['monte_carlo'].run(args['pnl'], args['n_resamples']),
+            bars=lambda n_resamples: n_resamples * MONTE_CARLO_TRADES  # Simulated trades
+        ),
+    ]
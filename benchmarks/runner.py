@@ -0,0 +1,162 @@
+# fvg_trading_bot/benchmarks/runner.py
+"""Time the bot's hot paths and compare them with stored baselines
+
+    python -m benchmarks.runner                  # full suite, compare with baselines.json
+    python -m benchmarks.runner --quick          # smallest sizes only
+    python -m benchmarks.runner --update-baseline
+
+Exits with status 1 when a result regresses past the tolerance.
+"""
+from pathlib import Path
+from typing import Dict, List, Optional
+import argparse
+import json
+import logging
+import math
+import platform
+import sys
+import time
+import tracemalloc
+from benchmarks.cases import BenchmarkCase, default_cases
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+BASELINE_PATH = Path(__file__).with_name('baselines.json')
+DEFAULT_TOLERANCE = 0.25  # Allowed relative drop in throughput / growth in peak memory
+MEMORY_SLACK_MB = 1.0  # Absolute memory slack so tiny cases do not fail on noise
+MIN_RUN_SECONDS = 0.05
+
+def measure(case: BenchmarkCase, size: int, repeat: int = 3, max_seconds: float = 10.0,
+            memory: bool = True) -> Dict[str, float]:
+    """Time case at size (best of repeat runs) and optionally record its peak traced memory
+
+    Fast cases are looped so each timed run lasts at least MIN_RUN_SECONDS.
+    Repeats stop early once max_seconds have been spent, after at least one run.
+    Memory is traced in a separate run since tracemalloc slows the code down.
+    Process pool workers are not traced.
+    """
+    inputs = case.setup(size)
+    run_start = time.perf_counter()
+    case.run(inputs)
+    first = time.perf_counter() - run_start
+    number = max(1, math.ceil(MIN_RUN_SECONDS / first)) if first > 0 else 1
+
+    timings = [] if number > 1 else [first]
+    started = time.perf_counter()
+    while len(timings) < repeat and (not timings or time.perf_counter() - started <= max_seconds):
+        run_start = time.perf_counter()
+        for _ in range(number):
+            case.run(inputs)
+        timings.append((time.perf_counter() - run_start) / number)
+
+    seconds = min(timings)
+    result = {
+        'bars': case.bars(size),
+        'seconds': seconds,
+        'bars_per_second': case.bars(size) / seconds
+    }
+    if memory:
+        tracemalloc.start()
+        try:
+            case.run(inputs)
+            result['peak_memory_mb'] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        finally:
+            tracemalloc.stop()
+    return result
+
+def run_benchmarks(cases: List[BenchmarkCase], repeat: int = 3, max_seconds: float = 10.0,
+                   memory: bool = True, only: Optional[List[str]] = None) -> Dict[str, Dict]:
+    """Measure every case at every size, keyed 'name[size]'"""
+    results = {}
+    for case in cases:
+        if only and case.name not in only:
+            continue
+        for size in case.sizes:
+            key = f'{case.name}[{size}]'
+            results[key] = measure(case, size, repeat=repeat, max_seconds=max_seconds, memory=memory)
+            logger.info(f"{key}: {format_result(results[key])}")
+    return results
+
+def compare(results: Dict[str, Dict], baselines: Dict[str, Dict],
+            tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+    """Return a description of every result that regressed past tolerance
+
+    Keys missing from either side are skipped.
+    """
+    regressions = []
+    for key, result in results.items():
+        baseline = baselines.get(key)
+        if baseline is None:
+            continue
+
+        floor = baseline['bars_per_second'] * (1 - tolerance)
+        if result['bars_per_second'] < floor:
+            regressions.append(f"{key}: {result['bars_per_second']:,.0f} bars/s is below "
+                               f"{floor:,.0f} (baseline {baseline['bars_per_second']:,.0f})")
+
+        if 'peak_memory_mb' in result and 'peak_memory_mb' in baseline:
+            ceiling = baseline['peak_memory_mb'] * (1 + tolerance) + MEMORY_SLACK_MB
+            if result['peak_memory_mb'] > ceiling:
+                regressions.append(f"{key}: peak memory {result['peak_memory_mb']:.1f} MB is above "
+                                   f"{ceiling:.1f} MB (baseline {baseline['peak_memory_mb']:.1f} MB)")
+    return regressions
+
+def format_result(result: Dict) -> str:
+    text = f"{result['bars_per_second']:,.0f} bars/s ({result['seconds']:.3f} s)"
+    if 'peak_memory_mb' in result:
+        text += f", peak {result['peak_memory_mb']:.1f} MB"
+    return text
+
+def load_baselines(path: Path = BASELINE_PATH) -> Dict[str, Dict]:
+    if not path.exists():
+        return {}
+    with open(path) as f:
+        return json.load(f)['results']
+
+def save_baselines(results: Dict[str, Dict], path: Path = BASELINE_PATH) -> None:
+    """Merge results into the baseline file, keeping entries that were not re-run"""
+    merged = {**load_baselines(path), **results}
+    with open(path, 'w') as f:
+        json.dump({'machine': platform.platform(), 'python': platform.python_version(),
+                   'results': dict(sorted(merged.items()))}, f, indent=2)
+        f.write('\n')
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--quick', action='store_true', help='run 10k bars, 10 symbols and 1000 resamples only')
+    parser.add_argument('--only', nargs='+', help='case names to run')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--max-seconds', type=float, default=10.0,
+                        help='stop repeating a case after this long')
+    parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc run')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument('--baseline', type=Path, default=BASELINE_PATH)
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='write the results to the baseline file instead of comparing')
+    parser.add_argument('--output', type=Path, help='also write the results as JSON here')
+    args = parser.parse_args(argv)
+    # Per-symbol backtest logging would swamp the report
+    logging.getLogger('backtesting.backtester').setLevel(logging.WARNING)
+
+    cases = default_cases(sizes=(10_000,), symbol_counts=(10,), resample_counts=(1000,)) if args.quick else default_cases()
+    results = run_benchmarks(cases, repeat=args.repeat, max_seconds=args.max_seconds,
+                             memory=not args.no_memory, only=args.only)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.update_baseline:
+        save_baselines(results, args.baseline)
+        logger.info(f"Wrote {len(results)} baselines to {args.baseline}")
+        return 0
+
+    regressions = compare(results, load_baselines(args.baseline), args.tolerance)
+    for regression in regressions:
+        logger.error(f"Regression: {regression}")
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,4 @@
+from .sources import DataSource, YFinanceSource, FileReplaySource
+from .cache import CachedDataSource
+
+__all__ = ['DataSource', 'YFinanceSource', 'FileReplaySource', 'CachedDataSource']
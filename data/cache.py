@@ -0,0 +1,109 @@
+# fvg_trading_bot/data/cache.py
+import json
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+import numpy as np
+import pandas as pd
+from data.sources import DataSource
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+class CachedDataSource(DataSource):
+    """
+    Read-through on-disk cache in front of another data source.
+
+    Each (symbol, interval, start, end) request is stored as one .npy file
+    per column plus the datetime64 index in UTC, so a cached range loads through
+    memory-mapped arrays without touching the network. Trailing-period
+    requests ('1d') move with the clock and are always passed through, as
+    are ranges that end in the future: their bars are still arriving.
+    Empty results (a failed download) are returned but never stored.
+    """
+
+    def __init__(self, source: DataSource, cache_dir: Union[str, Path]):
+        self.source = source
+        self.cache_dir = Path(cache_dir)
+
+    def history(self, symbol: str, start: Optional[str] = None, end: Optional[str] = None,
+                period: Optional[str] = None, interval: str = '5m') -> pd.DataFrame:
+        if period is not None or start is None or end is None:
+            return self.source.history(symbol, start=start, end=end, period=period, interval=interval)
+
+        path = self._entry_path(symbol, interval, start, end)
+        if (path / 'meta.json').exists():
+            return self._read(path)
+
+        df = self.source.history(symbol, start=start, end=end, interval=interval)
+        if self._cacheable(df, end):
+            self._write(path, df)
+            logger.info(f"Cached {len(df)} {interval} bars for {symbol} in {path}")
+        return df
+
+    def history_many(self, symbols: List[str], start: Optional[str] = None, end: Optional[str] = None,
+                     period: Optional[str] = None, interval: str = '5m') -> Dict[str, pd.DataFrame]:
+        if period is not None or start is None or end is None:
+            return self.source.history_many(symbols, start=start, end=end, period=period, interval=interval)
+
+        frames = {}
+        missing = []
+        for symbol in symbols:
+            path = self._entry_path(symbol, interval, start, end)
+            if (path / 'meta.json').exists():
+                frames[symbol] = self._read(path)
+            else:
+                missing.append(symbol)
+
+        # One bulk request for every symbol not cached yet
+        if missing:
+            fetched = self.source.history_many(missing, start=start, end=end, interval=interval)
+            for symbol, df in fetched.items():
+                if self._cacheable(df, end):
+                    self._write(self._entry_path(symbol, interval, start, end), df)
+                frames[symbol] = df
+        return frames
+
+    @staticmethod
+    def _cacheable(df: pd.DataFrame, end: str) -> bool:
+        """Whether df is complete: non-empty, and its range ended before now"""
+        if len(df) == 0:
+            return False
+        tz = pd.DatetimeIndex(df.index).tz or 'UTC'
+        end_time = pd.Timestamp(end)
+        if end_time.tz is None:
+            end_time = end_time.tz_localize(tz)
+        return end_time <= pd.Timestamp.now(tz=tz)
+
+    def _entry_path(self, symbol: str, interval: str, start: str, end: str) -> Path:
+        key = '_'.join(re.sub(r'[^A-Za-z0-9.=^-]', '-', str(part))
+                       for part in (symbol, interval, start, end))
+        return self.cache_dir / key
+
+    def _write(self, path: Path, df: pd.DataFrame) -> None:
+        path.mkdir(parents=True, exist_ok=True)
+        index = pd.DatetimeIndex(df.index)
+        tz = str(index.tz) if index.tz is not None else None
+        utc_index = index.tz_convert('UTC').tz_localize(None) if tz is not None else index
+        np.save(path / 'index.npy', utc_index.to_numpy())
+
+        columns = []
+        for i, column in enumerate(df.columns):
+            np.save(path / f'{i}.npy', df[column].to_numpy())
+            columns.append(column)
+
+        # Written last so a partially written entry is never read back
+        with open(path / 'meta.json', 'w') as f:
+            json.dump({'columns': columns, 'tz': tz, 'index_name': df.index.name}, f)
+
+    def _read(self, path: Path) -> pd.DataFrame:
+        with open(path / 'meta.json') as f:
+            meta = json.load(f)
+
+        index = pd.DatetimeIndex(np.load(path / 'index.npy', mmap_mode='r'), name=meta['index_name'])
+        if meta['tz']:
+            index = index.tz_localize('UTC').tz_convert(meta['tz'])
+
+        data = {column: np.load(path / f'{i}.npy', mmap_mode='r')
+                for i, column in enumerate(meta['columns'])}
+        return pd.DataFrame(data, index=index, columns=meta['columns'])
@@ -0,0 +1,124 @@
+# fvg_trading_bot/data/sources.py
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+import re
+import pandas as pd
+
+# yfinance trailing periods ('5d', '3mo', '1y'), plus hours and minutes for intraday replays
+PERIOD_UNITS = {
+    'm': lambda n: pd.Timedelta(minutes=n),
+    'h': lambda n: pd.Timedelta(hours=n),
+    'd': lambda n: pd.Timedelta(days=n),
+    'wk': lambda n: pd.DateOffset(weeks=n),
+    'mo': lambda n: pd.DateOffset(months=n),
+    'y': lambda n: pd.DateOffset(years=n)
+}
+
+def period_start(period: str, last: pd.Timestamp) -> Optional[pd.Timestamp]:
+    """Earliest time a trailing period ending at last covers (exclusive); None for 'max'"""
+    if period == 'max':
+        return None
+    if period == 'ytd':
+        # Just before January 1st, so the first bar of the year is included
+        return last.normalize().replace(month=1, day=1) - pd.Timedelta(1, 'ns')
+    match = re.fullmatch(r'(\d+)(m|h|d|wk|mo|y)', period)
+    if match is None:
+        raise ValueError(f"Unknown period: {period!r}")
+    return last - PERIOD_UNITS[match.group(2)](int(match.group(1)))
+
+class DataSource(ABC):
+    """Base class for OHLCV providers"""
+
+    @abstractmethod
+    def history(self, symbol: str, start: Optional[str] = None, end: Optional[str] = None,
+                period: Optional[str] = None, interval: str = '5m') -> pd.DataFrame:
+        """Return bars indexed by timestamp with Open, High, Low, Close and Volume columns
+
+        Either start/end (end exclusive) or a trailing period such as '1d' is given.
+        """
+
+    def history_many(self, symbols: List[str], start: Optional[str] = None, end: Optional[str] = None,
+                     period: Optional[str] = None, interval: str = '5m') -> Dict[str, pd.DataFrame]:
+        """Return bars for several symbols; providers with bulk endpoints override this"""
+        return {
+            symbol: self.history(symbol, start=start, end=end, period=period, interval=interval)
+            for symbol in symbols
+        }
+
+def _yfinance():
+    """Import yfinance on first download; it is slow to import and backtests never need it"""
+    import yfinance
+    return yfinance
+
+class YFinanceSource(DataSource):
+    """Download bars from Yahoo Finance"""
+
+    def history(self, symbol: str, start: Optional[str] = None, end: Optional[str] = None,
+                period: Optional[str] = None, interval: str = '5m') -> pd.DataFrame:
+        ticker = _yfinance().Ticker(symbol)
+        if period is not None:
+            return ticker.history(period=period, interval=interval)
+        return ticker.history(start=start, end=end, interval=interval)
+
+    def history_many(self, symbols: List[str], start: Optional[str] = None, end: Optional[str] = None,
+                     period: Optional[str] = None, interval: str = '5m') -> Dict[str, pd.DataFrame]:
+        """Download all symbols in one bulk request"""
+        yf = _yfinance()
+        if period is not None:
+            df = yf.download(symbols, period=period, interval=interval, group_by='ticker',
+                             auto_adjust=True, progress=False, threads=True)
+        else:
+            df = yf.download(symbols, start=start, end=end, interval=interval, group_by='ticker',
+                             auto_adjust=True, progress=False, threads=True)
+
+        frames = {}
+        for symbol in symbols:
+            if isinstance(df.columns, pd.MultiIndex):
+                if symbol not in df.columns.get_level_values(0):
+                    continue
+                symbol_df = df[symbol]
+            else:
+                symbol_df = df
+            # Bulk downloads align every symbol on one index; drop rows a symbol did not trade
+            frames[symbol] = symbol_df.dropna(how='all')
+        return frames
+
+class FileReplaySource(DataSource):
+    """Replay bars from {symbol}.csv or {symbol}.parquet files in a directory"""
+
+    def __init__(self, directory: Union[str, Path]):
+        self.directory = Path(directory)
+
+    def history(self, symbol: str, start: Optional[str] = None, end: Optional[str] = None,
+                period: Optional[str] = None, interval: str = '5m') -> pd.DataFrame:
+        df = self._load(symbol)
+        if period is not None:
+            start_after = period_start(period, df.index[-1]) if len(df) > 0 else None
+            return df if start_after is None else df[df.index > start_after]
+
+        mask = pd.Series(True, index=df.index)
+        if start is not None:
+            mask &= df.index >= self._timestamp(start, df.index)
+        if end is not None:
+            mask &= df.index < self._timestamp(end, df.index)
+        return df[mask.to_numpy()]
+
+    def _load(self, symbol: str) -> pd.DataFrame:
+        parquet_path = self.directory / f'{symbol}.parquet'
+        if parquet_path.exists():
+            return pd.read_parquet(parquet_path)
+
+        csv_path = self.directory / f'{symbol}.csv'
+        if not csv_path.exists():
+            raise FileNotFoundError(f"No replay data for {symbol} in {self.directory}")
+        df = pd.read_csv(csv_path, index_col=0)
+        df.index = pd.to_datetime(df.index)
+        return df
+
+    @staticmethod
+    def _timestamp(value: str, index: pd.DatetimeIndex) -> pd.Timestamp:
+        timestamp = pd.Timestamp(value)
+        if index.tz is not None and timestamp.tz is None:
+            timestamp = timestamp.tz_localize(index.tz)
+        return timestamp
@@ -32,19 +32,19 @@ async def main():
     logger.info("Starting backtest...")
     backtester = Backtester(bot)
     
+    end_date = datetime.now()
+    start_date = end_date - timedelta(days=30)
+
+    # Each symbol is backtested in its own process with its own capital
+    results = backtester.run_many(
+        symbols=symbols,
+        start_date=start_date.strftime('%Y-%m-%d'),
+        end_date=end_date.strftime('%Y-%m-%d'),
+        initial_capital=initial_capital
+    )
+
     for symbol in symbols:
-        logger.info(f"Backtesting {symbol}...")
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=30)
-        
-        results = backtester.run(
-            symbol=symbol,
-            start_date=start_date.strftime('%Y-%m-%d'),
-            end_date=end_date.strftime('%Y-%m-%d'),
-            initial_capital=initial_capital
-        )
-        
-        metrics = backtester.get_performance_metrics()
+        metrics = results['metrics'][symbol]
         
         logger.info(f"\nBacktest Results for {symbol}:")
         logger.info(f"Total Trades: {metrics['total_trades']}")
@@ -56,6 +56,8 @@ async def main():
         logger.info(f"Largest Loss: ${metrics['largest_loss']:.2f}")
         logger.info(f"Total PnL: ${metrics['total_pnl']:.2f}\n")
 
+    logger.info(f"Combined PnL: ${results['combined_metrics']['total_pnl']:.2f}")
+
     # Start live trading
     logger.info("Starting live trading...")
     await bot.run(initial_capital)
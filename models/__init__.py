@@ -1,4 +1,9 @@
-from .fair_value_gap import FairValueGap
-from .trade import Trade
+from .direction import Direction
+from .fair_value_gap import FairValueGap, SlottedFairValueGap
+from .trade import Trade, SlottedTrade
+from .swing_levels import SwingLevels
+from .fvg_store import FVGStore
+from .trade_store import TradeStore
 
-__all__ = ['FairValueGap', 'Trade']
+__all__ = ['Direction', 'FairValueGap', 'SlottedFairValueGap', 'Trade', 'SlottedTrade',
+           'SwingLevels', 'FVGStore', 'TradeStore']
@@ -0,0 +1,134 @@
+from typing import Dict, List, Optional, Tuple, Union
+import numpy as np
+import pandas as pd
+
+NAT = pd.NaT.value  # int64 sentinel for a missing timestamp
+
+class ColumnStore:
+    """
+    Growable struct-of-arrays table.
+
+    Subclasses declare COLUMNS as (name, dtype) pairs. Rows live in one
+    preallocated NumPy array per column that doubles when full, timestamps
+    are int64 nanoseconds (UTC when tz is set) and symbols are stored as
+    int32 codes into self.symbols.
+    """
+    COLUMNS: Tuple[Tuple[str, type], ...] = ()
+
+    def __init__(self, capacity: int = 1024):
+        self._size = 0
+        self._columns = {name: np.empty(max(capacity, 1), dtype=dtype) for name, dtype in self.COLUMNS}
+        self.symbols: List[str] = []
+        self._symbol_codes: Dict[str, int] = {}
+        self.tz = None
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the stored rows"""
+        return sum(column[:self._size].nbytes for column in self._columns.values())
+
+    def column(self, name: str) -> np.ndarray:
+        """Zero-copy view of one column"""
+        return self._columns[name][:self._size]
+
+    def symbol_code(self, symbol: str) -> int:
+        """Return the int32 code for symbol, registering it on first use"""
+        code = self._symbol_codes.get(symbol)
+        if code is None:
+            code = self._symbol_codes[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+        return code
+
+    def filter(self, mask: np.ndarray):
+        """Copy the rows selected by a boolean mask or index array into a new store"""
+        mask = np.asarray(mask)
+        indices = np.flatnonzero(mask) if mask.dtype == bool else mask
+        subset = type(self)(capacity=len(indices))
+        for name, column in self._columns.items():
+            subset._columns[name][:len(indices)] = column[:self._size][indices]
+        subset._size = len(indices)
+        subset.symbols = list(self.symbols)
+        subset._symbol_codes = dict(self._symbol_codes)
+        subset.tz = self.tz
+        return subset
+
+    def to_frame(self) -> pd.DataFrame:
+        """Copy the store into a DataFrame with timestamps, labels and symbol names restored"""
+        data = {}
+        for name, dtype in self.COLUMNS:
+            values = self.column(name)
+            if name == 'symbol':
+                values = np.asarray(self.symbols, dtype=object)[values] if self.symbols else values.astype(object)
+            elif name == 'direction':
+                values = np.where(values > 0, 'bullish', 'bearish')
+            elif dtype is np.int64:
+                values = self._to_datetimes(values)
+            else:
+                values = values.copy()
+            data[name] = values
+        return pd.DataFrame(data)
+
+    def _append_rows(self, count: int, **values) -> slice:
+        """Write count rows of column values and return the slice they occupy"""
+        self._reserve(count)
+        rows = slice(self._size, self._size + count)
+        for name, value in values.items():
+            self._columns[name][rows] = value
+        self._size += count
+        return rows
+
+    def _reserve(self, extra: int) -> None:
+        capacity = len(next(iter(self._columns.values())))
+        needed = self._size + extra
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name, column in self._columns.items():
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            self._columns[name] = grown
+
+    def _symbol_prices(self, price: Union[float, Dict[str, float]],
+                       symbol: Optional[str]) -> Union[float, np.ndarray]:
+        """Broadcast a price, or a {symbol: price} mapping, against the stored rows
+
+        Rows whose symbol has no price get NaN, which fails every comparison.
+        """
+        if isinstance(price, dict):
+            by_code = np.full(len(self.symbols), np.nan)
+            for name, value in price.items():
+                code = self._symbol_codes.get(name)
+                if code is not None:
+                    by_code[code] = value
+            return by_code[self.column('symbol')]
+        if symbol is None:
+            return price
+        code = self._symbol_codes.get(symbol, -1)
+        return np.where(self.column('symbol') == code, price, np.nan)
+
+    def _to_ns(self, timestamp) -> int:
+        if timestamp is None:
+            return NAT
+        timestamp = pd.Timestamp(timestamp)
+        if timestamp is pd.NaT:
+            return NAT
+        if timestamp.tz is not None and self.tz is None:
+            self.tz = timestamp.tz
+        return timestamp.value
+
+    def _from_ns(self, value: int) -> Optional[pd.Timestamp]:
+        if value == NAT:
+            return None
+        if self.tz is None:
+            return pd.Timestamp(value)
+        return pd.Timestamp(value, tz='UTC').tz_convert(self.tz)
+
+    def _to_datetimes(self, values: np.ndarray) -> pd.DatetimeIndex:
+        index = pd.DatetimeIndex(values.astype('datetime64[ns]'))
+        if self.tz is not None:
+            index = index.tz_localize('UTC').tz_convert(self.tz)
+        return index
@@ -0,0 +1,19 @@
+from enum import IntEnum
+
+class Direction(IntEnum):
+    """Small-int trade and gap direction used by the columnar stores"""
+    BULLISH = 1
+    BEARISH = -1
+
+    @classmethod
+    def parse(cls, direction: str) -> 'Direction':
+        """Convert 'bullish' / 'bearish' into a Direction; anything else raises ValueError"""
+        if direction == 'bullish':
+            return cls.BULLISH
+        if direction == 'bearish':
+            return cls.BEARISH
+        raise ValueError(f"Unknown direction: {direction!r}")
+
+    @property
+    def label(self) -> str:
+        return 'bullish' if self is Direction.BULLISH else 'bearish'
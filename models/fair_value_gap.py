@@ -1,5 +1,6 @@
 from dataclasses import dataclass
 from datetime import datetime
+from .slots import slotted
 
 @dataclass
 class FairValueGap:
@@ -21,3 +22,6 @@ class FairValueGap:
             return price <= self.lower_price
         else:
             return price >= self.upper_price
+
+# Same fields and methods without a per-instance __dict__
+SlottedFairValueGap = slotted(FairValueGap, 'SlottedFairValueGap')
@@ -0,0 +1,126 @@
+from typing import Dict, Iterable, Iterator, Optional, Union
+import numpy as np
+from .columnar import ColumnStore
+from .direction import Direction
+from .fair_value_gap import FairValueGap, SlottedFairValueGap
+
+class FVGStore(ColumnStore):
+    """
+    Columnar storage for fair value gaps.
+
+    Each gap costs 46 bytes across the arrays instead of a dataclass with a
+    __dict__ and two datetime objects. Mitigation and containment queries
+    run as array comparisons over every row at once; store[i] builds a
+    SlottedFairValueGap when a single object is needed.
+    """
+    COLUMNS = (
+        ('start_time', np.int64),
+        ('end_time', np.int64),
+        ('upper_price', np.float64),
+        ('lower_price', np.float64),
+        ('volume_weight', np.float64),
+        ('direction', np.int8),
+        ('mitigated', np.bool_),
+        ('symbol', np.int32),
+    )
+
+    @classmethod
+    def from_gaps(cls, gaps: Iterable[FairValueGap], symbol: str = '') -> 'FVGStore':
+        """Build a store from existing FairValueGap objects"""
+        store = cls()
+        store.extend(gaps, symbol)
+        return store
+
+    def append(self, fvg: FairValueGap, symbol: str = '') -> int:
+        """Add one gap and return its row"""
+        rows = self._append_rows(
+            1,
+            start_time=self._to_ns(fvg.start_time),
+            end_time=self._to_ns(fvg.end_time),
+            upper_price=fvg.upper_price,
+            lower_price=fvg.lower_price,
+            volume_weight=fvg.volume_weight,
+            direction=Direction.parse(fvg.direction),
+            mitigated=fvg.mitigated,
+            symbol=self.symbol_code(symbol)
+        )
+        return rows.start
+
+    def extend(self, gaps: Iterable[FairValueGap], symbol: str = '') -> None:
+        """Add several gaps for one symbol"""
+        for fvg in gaps:
+            self.append(fvg, symbol)
+
+    def extend_arrays(self, start_time: np.ndarray, end_time: np.ndarray, upper_price: np.ndarray,
+                      lower_price: np.ndarray, volume_weight: np.ndarray, bearish: np.ndarray,
+                      symbol: str = '') -> slice:
+        """Add unmitigated gaps from columns; timestamps are int64 nanoseconds"""
+        count = len(start_time)
+        return self._append_rows(
+            count,
+            start_time=start_time,
+            end_time=end_time,
+            upper_price=upper_price,
+            lower_price=lower_price,
+            volume_weight=volume_weight,
+            direction=np.where(bearish, Direction.BEARISH, Direction.BULLISH),
+            mitigated=False,
+            symbol=self.symbol_code(symbol)
+        )
+
+    def __getitem__(self, row: int) -> SlottedFairValueGap:
+        """Record view of one row, copied into a slotted FairValueGap"""
+        if not -self._size <= row < self._size:
+            raise IndexError(row)
+        row %= self._size
+        columns = self._columns
+        return SlottedFairValueGap(
+            start_time=self._from_ns(int(columns['start_time'][row])),
+            end_time=self._from_ns(int(columns['end_time'][row])),
+            upper_price=float(columns['upper_price'][row]),
+            lower_price=float(columns['lower_price'][row]),
+            volume_weight=float(columns['volume_weight'][row]),
+            direction=Direction(int(columns['direction'][row])).label,
+            mitigated=bool(columns['mitigated'][row])
+        )
+
+    def __iter__(self) -> Iterator[SlottedFairValueGap]:
+        return (self[row] for row in range(self._size))
+
+    def active_mask(self, symbol: Optional[str] = None) -> np.ndarray:
+        """Rows that are still unmitigated, optionally for one symbol"""
+        mask = ~self.column('mitigated')
+        if symbol is not None:
+            mask &= self.column('symbol') == self._symbol_codes.get(symbol, -1)
+        return mask
+
+    def unmitigated(self, symbol: Optional[str] = None) -> 'FVGStore':
+        """Copy of the gaps that are still open"""
+        return self.filter(self.active_mask(symbol))
+
+    def mitigation_mask(self, price: Union[float, Dict[str, float]],
+                        symbol: Optional[str] = None) -> np.ndarray:
+        """Unmitigated rows that price would fill, matching FairValueGap.is_mitigated_by_price"""
+        price = self._symbol_prices(price, symbol)
+        bullish = self.column('direction') == Direction.BULLISH
+        filled = np.where(bullish, price <= self.column('lower_price'),
+                          price >= self.column('upper_price'))
+        return filled & ~self.column('mitigated')
+
+    def mitigate(self, price: Union[float, Dict[str, float]],
+                 symbol: Optional[str] = None) -> np.ndarray:
+        """Mark gaps filled by price and return their rows
+
+        price is either one price, applied to symbol's gaps (or every gap
+        when symbol is None), or a {symbol: price} mapping.
+        """
+        rows = np.flatnonzero(self.mitigation_mask(price, symbol))
+        self._columns['mitigated'][rows] = True
+        return rows
+
+    def containing(self, price: Union[float, Dict[str, float]],
+                   symbol: Optional[str] = None) -> np.ndarray:
+        """Rows of unmitigated gaps with lower_price <= price <= upper_price"""
+        price = self._symbol_prices(price, symbol)
+        inside = (self.column('lower_price') <= price) & (price <= self.column('upper_price'))
+        return np.flatnonzero(inside & ~self.column('mitigated'))
@@ -0,0 +1,15 @@
+from dataclasses import fields
+
+def slotted(cls: type, name: str) -> type:
+    """Return a copy of dataclass cls that stores its fields in __slots__
+
+    Equivalent to dataclass(slots=True), which needs Python 3.10.
+    """
+    field_names = tuple(f.name for f in fields(cls))
+    namespace = {
+        key: value for key, value in cls.__dict__.items()
+        if key not in field_names and key not in ('__dict__', '__weakref__')
+    }
+    namespace['__slots__'] = field_names
+    namespace['__qualname__'] = name
+    return type(cls)(name, cls.__bases__, namespace)
@@ -0,0 +1,10 @@
+from dataclasses import dataclass
+import numpy as np
+
+@dataclass
+class SwingLevels:
+    prices: np.ndarray # Swing prices sorted ascending
+    times: np.ndarray # Bar timestamp of each swing, aligned with prices
+
+    def __len__(self) -> int:
+        return len(self.prices)
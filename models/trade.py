@@ -1,5 +1,7 @@
 from dataclasses import dataclass
 from datetime import datetime
+from typing import Optional
+from .slots import slotted
 
 @dataclass
 class Trade:
@@ -10,4 +12,7 @@ class Trade:
     size: float
     symbol: str
     entry_time: datetime
-    close_time: datetime
+    close_time: Optional[datetime] = None
+
+# Same fields without a per-instance __dict__
+SlottedTrade = slotted(Trade, 'SlottedTrade')
@@ -0,0 +1,129 @@
+from typing import Dict, Iterable, Iterator, Optional, Union
+import numpy as np
+from .columnar import ColumnStore
+from .direction import Direction
+from .trade import SlottedTrade, Trade
+
+class TradeStore(ColumnStore):
+    """
+    Columnar storage for open and closed trades.
+
+    Open trades have a NaT close_time and NaN exit_price and pnl. Exit
+    checks and closes are vectorized over all open rows; store[i] builds a
+    SlottedTrade when a single object is needed.
+    """
+    COLUMNS = (
+        ('entry_price', np.float64),
+        ('stop_loss', np.float64),
+        ('take_profit', np.float64),
+        ('direction', np.int8),
+        ('size', np.float64),
+        ('symbol', np.int32),
+        ('entry_time', np.int64),
+        ('close_time', np.int64),
+        ('exit_price', np.float64),
+        ('pnl', np.float64),
+    )
+
+    @classmethod
+    def from_trades(cls, trades: Iterable[Trade]) -> 'TradeStore':
+        """Build a store from existing Trade objects"""
+        store = cls()
+        for trade in trades:
+            store.append(trade)
+        return store
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict], symbol: str = '') -> 'TradeStore':
+        """Build a store from backtest trade dicts (entry/exit prices and times, pnl)"""
+        store = cls()
+        for record in records:
+            store._append_rows(
+                1,
+                entry_price=record['entry_price'],
+                stop_loss=record['stop_loss'],
+                take_profit=record['take_profit'],
+                direction=Direction.parse(record['direction']),
+                size=record['size'],
+                symbol=store.symbol_code(record.get('symbol', symbol)),
+                entry_time=store._to_ns(record['entry_time']),
+                close_time=store._to_ns(record.get('exit_time')),
+                exit_price=record.get('exit_price', np.nan),
+                pnl=record.get('pnl', np.nan)
+            )
+        return store
+
+    def append(self, trade: Trade) -> int:
+        """Add one trade and return its row"""
+        rows = self._append_rows(
+            1,
+            entry_price=trade.entry_price,
+            stop_loss=trade.stop_loss,
+            take_profit=trade.take_profit,
+            direction=Direction.parse(trade.direction),
+            size=trade.size,
+            symbol=self.symbol_code(trade.symbol),
+            entry_time=self._to_ns(trade.entry_time),
+            close_time=self._to_ns(trade.close_time),
+            exit_price=np.nan,
+            pnl=np.nan
+        )
+        return rows.start
+
+    def __getitem__(self, row: int) -> SlottedTrade:
+        """Record view of one row, copied into a slotted Trade"""
+        if not -self._size <= row < self._size:
+            raise IndexError(row)
+        row %= self._size
+        columns = self._columns
+        return SlottedTrade(
+            entry_price=float(columns['entry_price'][row]),
+            stop_loss=float(columns['stop_loss'][row]),
+            take_profit=float(columns['take_profit'][row]),
+            direction=Direction(int(columns['direction'][row])).label,
+            size=float(columns['size'][row]),
+            symbol=self.symbols[columns['symbol'][row]],
+            entry_time=self._from_ns(int(columns['entry_time'][row])),
+            close_time=self._from_ns(int(columns['close_time'][row]))
+        )
+
+    def __iter__(self) -> Iterator[SlottedTrade]:
+        return (self[row] for row in range(self._size))
+
+    def open_mask(self, symbol: Optional[str] = None) -> np.ndarray:
+        """Rows of trades that have not been closed"""
+        mask = np.isnan(self.column('exit_price'))
+        if symbol is not None:
+            mask &= self.column('symbol') == self._symbol_codes.get(symbol, -1)
+        return mask
+
+    def exit_mask(self, price: Union[float, Dict[str, float]],
+                  symbol: Optional[str] = None) -> np.ndarray:
+        """Open trades whose stop loss or take profit is hit at price"""
+        price = self._symbol_prices(price, symbol)
+        stop_loss, take_profit = self.column('stop_loss'), self.column('take_profit')
+        bullish = self.column('direction') == Direction.BULLISH
+        hit = np.where(bullish,
+                       (price <= stop_loss) | (price >= take_profit),
+                       (price >= stop_loss) | (price <= take_profit))
+        return hit & self.open_mask()
+
+    def close(self, rows: np.ndarray, price: Union[float, np.ndarray], timestamp) -> np.ndarray:
+        """Close rows at price and timestamp, returning their pnl"""
+        rows = np.asarray(rows)
+        exit_price = np.broadcast_to(np.asarray(price, dtype=np.float64), rows.shape)
+        pnl = ((exit_price - self._columns['entry_price'][rows]) *
+               self._columns['size'][rows] * self._columns['direction'][rows])
+        self._columns['exit_price'][rows] = exit_price
+        self._columns['close_time'][rows] = self._to_ns(timestamp)
+        self._columns['pnl'][rows] = pnl
+        return pnl
+
+    def close_hits(self, price: Union[float, Dict[str, float]], timestamp,
+                   symbol: Optional[str] = None) -> np.ndarray:
+        """Close every open trade whose exit level price reaches and return their rows"""
+        rows = np.flatnonzero(self.exit_mask(price, symbol))
+        if len(rows):
+            prices = self._symbol_prices(price, symbol)
+            self.close(rows, prices[rows] if isinstance(prices, np.ndarray) else prices, timestamp)
+        return rows
@@ -2,6 +2,7 @@ import pytest
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+from ..data.sources import FileReplaySource
 
 @pytest.fixture
 def sample_price_data():
@@ -32,3 +33,27 @@ def sample_fvg_data():
         'Volume': [1000000] * 5
     }
     return pd.DataFrame(data, index=dates)
+
+@pytest.fixture
+def random_walk_data():
+    """Create a seeded random-walk price series long enough to produce trades"""
+    rng = np.random.default_rng(42)
+    periods = 3000
+    dates = pd.date_range(start='2024-01-01', periods=periods, freq='5min')
+    close = 100 + np.cumsum(rng.normal(0, 0.3, periods))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    df = pd.DataFrame({
+        'Open': open_,
+        'High': np.maximum(open_, close) + rng.random(periods) * 0.2,
+        'Low': np.minimum(open_, close) - rng.random(periods) * 0.2,
+        'Close': close,
+        'Volume': rng.integers(1000, 5000, periods)
+    }, index=dates)
+    return df
+
+@pytest.fixture
+def replay_source(random_walk_data, tmp_path):
+    """Serve random_walk_data for AAPL and MSFT from CSV files, without network access"""
+    for symbol in ('AAPL', 'MSFT'):
+        random_walk_data.to_csv(tmp_path / f'{symbol}.csv')
+    return FileReplaySource(tmp_path)
@@ -1,5 +1,10 @@
+import numpy as np
+import pandas as pd
 from ..analyzers.structure_analyzer import StructureAnalyzer
 from ..analyzers.fvg_detector import FVGDetector
+from ..analyzers.fvg_book import FVGBook
+from ..analyzers.level_index import LevelIndex
+from ..models.fair_value_gap import FairValueGap
 
 def test_structure_analyzer(sample_price_data):
     analyzer = StructureAnalyzer(lookback_period=10)
@@ -33,4 +38,110 @@ def test_fvg_detector(sample_fvg_data):
         assert isinstance(fvg.upper_price, float)
         assert isinstance(fvg.lower_price, float)
         assert fvg.direction in ['bullish', 'bearish']
-        assert fvg.volume_weight >= 0.5
\ No newline at end of file
+        assert fvg.volume_weight >= 0.5
+
+
+def test_fvg_detector_vectorized_matches_loop(sample_price_data):
+    vectorized = FVGDetector(min_gap_size=0.1, volume_threshold=0.9)
+    loop = FVGDetector(min_gap_size=0.1, volume_threshold=0.9, vectorized=False)
+
+    assert vectorized.find_fvg(sample_price_data) == loop.find_fvg(sample_price_data)
+    assert vectorized.active_fvgs == loop.active_fvgs
+
+
+def test_fvg_detector_on_bar_emits_each_gap_once(sample_fvg_data):
+    detector = FVGDetector(min_gap_size=0.5, volume_threshold=0.5)
+
+    emitted = []
+    for row in sample_fvg_data.itertuples():
+        emitted.extend(detector.on_bar(row.Index, row.Open, row.High, row.Low, row.Close, row.Volume))
+
+    batch = FVGDetector(min_gap_size=0.5, volume_threshold=0.5).find_fvg(sample_fvg_data)
+    assert emitted == batch
+    assert detector.active_fvgs == emitted
+
+    # Trading back into the gap's lower edge mitigates and drops it
+    detector.on_bar(sample_fvg_data.index[-1] + pd.Timedelta(minutes=5), 103, 103.5, 100, 100.5, 1000000)
+    assert detector.active_fvgs == []
+
+
+def test_fvg_book_matches_linear_scan():
+    rng = np.random.default_rng(7)
+    book = FVGBook()
+    gaps = []
+    for i in range(200):
+        lower = float(rng.uniform(90, 110))
+        fvg = FairValueGap(
+            start_time=i, end_time=i + 2,
+            upper_price=lower + float(rng.uniform(0.1, 3)), lower_price=lower,
+            volume_weight=1.0, direction='bullish' if i % 2 else 'bearish'
+        )
+        book.add(fvg)
+        gaps.append(fvg)
+
+    for price in rng.uniform(88, 112, 50):
+        expected = [fvg for fvg in gaps if not fvg.mitigated and fvg.is_price_in_gap(price)]
+        assert book.containing(price) == expected
+
+        filled = [fvg for fvg in gaps if not fvg.mitigated and fvg.is_mitigated_by_price(price)]
+        assert sorted(map(id, book.mitigate(price))) == sorted(map(id, filled))
+        assert book.gaps() == [fvg for fvg in gaps if not fvg.mitigated]
+
+
+def test_structure_analyzer_matches_reference_loop(sample_price_data):
+    highs = sample_price_data['High'].tolist()
+    lows = sample_price_data['Low'].tolist()
+    width = 3
+    expected = {'support': [], 'resistance': []}
+    for i in range(width, len(highs) - width):
+        neighbours = [i + k for k in range(-width, width + 1) if k != 0]
+        if all(highs[i] > highs[j] for j in neighbours):
+            expected['resistance'].append(highs[i])
+        if all(lows[i] < lows[j] for j in neighbours):
+            expected['support'].append(lows[i])
+
+    analyzer = StructureAnalyzer(swing_width=width)
+    assert analyzer.find_support_resistance(sample_price_data) == expected
+
+
+def test_structure_analyzer_levels_sorted_with_timestamps(sample_price_data):
+    analyzer = StructureAnalyzer()
+    levels = analyzer.find_levels(sample_price_data)
+
+    for name, column in (('support', 'Low'), ('resistance', 'High')):
+        swing = levels[name]
+        assert np.all(np.diff(swing.prices) >= 0)
+        assert np.array_equal(sample_price_data.loc[swing.times, column].to_numpy(), swing.prices)
+        assert sorted(analyzer.find_support_resistance(sample_price_data)[name]) == swing.prices.tolist()
+
+
+def test_structure_analyzer_on_bar_matches_rolling_window(sample_price_data):
+    analyzer = StructureAnalyzer(lookback_period=20)
+    for i, row in enumerate(sample_price_data.itertuples()):
+        index = analyzer.on_bar(row.High, row.Low)
+        window = sample_price_data.iloc[max(0, i - 20):i + 1]
+        expected = analyzer.find_support_resistance(window)
+        assert index.levels('support') == sorted(expected['support'])
+        assert index.levels('resistance') == sorted(expected['resistance'])
+
+
+def test_level_index_break_checks():
+    index = LevelIndex.from_levels({'support': [95.0, 97.0], 'resistance': [103.0, 105.0]})
+    analyzer = StructureAnalyzer()
+
+    assert index.nearest_below('resistance', 104.0) == 103.0
+    assert index.nearest_above('support', 96.0) == 97.0
+    assert analyzer.is_break_of_structure(103.5, index, 'bullish')
+    assert not analyzer.is_break_of_structure(102.0, index, 'bullish')
+    assert analyzer.is_break_of_structure(96.0, index, 'bearish')
+    assert not analyzer.is_break_of_structure(98.0, index, 'bearish')
+
+
+def test_level_index_expiry():
+    index = LevelIndex(max_age=5, max_levels=2)
+    for bar, price in enumerate([100.0, 101.0, 102.0]):
+        index.add('resistance', price, bar)
+    assert index.levels('resistance') == [101.0, 102.0]
+
+    index.expire(7)
+    assert index.levels('resistance') == [102.0]
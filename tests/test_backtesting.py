@@ -1,6 +1,15 @@
 from ..backtesting.backtester import Backtester
+from ..backtesting.metrics import PerformanceAccumulator
+from ..backtesting.monte_carlo import MonteCarlo
+from ..backtesting.parameter_sweep import ParameterSweep
+from ..backtesting.walk_forward import WalkForward
 from ..trading.trading_bot import TradingBot
+from itertools import product
+import pickle
+import numpy as np
 import pandas as pd
+import pytest
+from ..data.sources import FileReplaySource
 
 def test_backtester_initialization(sample_price_data):
     bot = TradingBot(
@@ -13,12 +22,14 @@ def test_backtester_initialization(sample_price_data):
     assert backtester.trading_bot == bot
     assert len(backtester.trades) == 0
 
-def test_backtest_results(sample_price_data):
+def test_backtest_results(sample_price_data, tmp_path):
+    sample_price_data.to_csv(tmp_path / 'AAPL.csv')
     bot = TradingBot(
         symbols=['AAPL'],
         min_gap_size=0.5,
         volume_threshold=1.5,
-        risk_per_trade=0.02
+        risk_per_trade=0.02,
+        data_source=FileReplaySource(tmp_path)
     )
     backtester = Backtester(bot)
     
@@ -26,11 +37,225 @@ def test_backtest_results(sample_price_data):
         symbol='AAPL',
         start_date='2024-01-01',
         end_date='2024-01-02',
-        initial_capital=100000
+        initial_capital=100000,
+        plot_dir=str(tmp_path)
     )
+    assert (tmp_path / 'equity_curve.png').exists()
     
     assert isinstance(results, pd.DataFrame)
     if len(results) > 0:
         assert 'entry_price' in results.columns
         assert 'exit_price' in results.columns
         assert 'pnl' in results.columns
+
+def test_vectorized_engine_matches_event_engine(replay_source):
+    results = {}
+    for engine in ('event', 'vectorized'):
+        bot = TradingBot(symbols=['AAPL'], min_gap_size=0.05, volume_threshold=1.0,
+                     data_source=replay_source)
+        results[engine] = Backtester(bot).run(
+            symbol='AAPL',
+            start_date='2024-01-01',
+            end_date='2024-01-11',
+            initial_capital=100000,
+            engine=engine
+        )
+
+    assert len(results['event']) > 0
+    pd.testing.assert_frame_equal(results['event'], results['vectorized'])
+
+def test_run_many_isolates_symbols(replay_source):
+    bot = TradingBot(symbols=['AAPL', 'MSFT'], min_gap_size=0.05, volume_threshold=1.0,
+                     data_source=replay_source)
+    backtester = Backtester(bot)
+    results = backtester.run_many(
+        symbols=['AAPL', 'MSFT'],
+        start_date='2024-01-01',
+        end_date='2024-01-11',
+        initial_capital=100000,
+        max_workers=2
+    )
+
+    single = Backtester(bot).run('AAPL', '2024-01-01', '2024-01-11', 100000)
+    for symbol in ('AAPL', 'MSFT'):
+        pd.testing.assert_frame_equal(results['trades'][symbol], single)
+        assert results['metrics'][symbol]['total_trades'] == len(single)
+
+    assert len(backtester.trades) == 0
+    assert len(results['combined_trades']) == 2 * len(single)
+    assert set(results['combined_trades']['symbol']) == {'AAPL', 'MSFT'}
+    assert results['combined_metrics']['total_trades'] == 2 * len(single)
+
+def test_run_many_sends_workers_a_bot_without_symbol_state():
+    small = TradingBot(symbols=['SYM0'], min_gap_size=0.05, volume_threshold=1.0)
+    large = TradingBot(symbols=[f'SYM{k}' for k in range(1000)], min_gap_size=0.05, volume_threshold=1.0)
+    copy = large.strategy_copy()
+    assert copy.symbols == [] and copy.symbol_detectors == {}
+    assert copy.fvg_detector.min_gap_size == 0.05
+    assert large.symbol_detectors and len(large.symbols) == 1000
+    assert len(pickle.dumps(copy)) == len(pickle.dumps(small.strategy_copy()))
+
+def test_consecutive_runs_keep_separate_performance(replay_source):
+    bot = TradingBot(symbols=['AAPL', 'MSFT'], min_gap_size=0.05, volume_threshold=1.0,
+                     data_source=replay_source)
+    for engine in ('event', 'vectorized'):
+        backtester = Backtester(bot)
+        first = backtester.run('AAPL', '2024-01-01', '2024-01-11', 100000, engine=engine)
+        second = backtester.run('MSFT', '2024-01-01', '2024-01-11', 50000, engine=engine)
+
+        alone = Backtester(bot)
+        alone.run('MSFT', '2024-01-01', '2024-01-11', 50000, engine=engine)
+        curve = backtester.performance.equity_curve()
+        assert curve.index.is_unique and curve.index.is_monotonic_increasing
+        pd.testing.assert_series_equal(curve, alone.performance.equity_curve())
+        assert backtester.get_performance_metrics() == pytest.approx(alone.get_performance_metrics())
+        assert len(second) == len(first) + len(alone.trades)
+
+def test_parameter_sweep_matches_individual_backtests(replay_source):
+    bot = TradingBot(symbols=['AAPL'], min_gap_size=0.05, volume_threshold=1.0,
+                     data_source=replay_source)
+    param_grid = {
+        'min_gap_size': [0.05, 0.2],
+        'volume_threshold': [0.8, 1.2],
+        'risk_per_trade': [0.01, 0.02]
+    }
+    data = {'AAPL': Backtester(bot).fetch_history('AAPL', '2024-01-01', '2024-01-11')}
+    results = ParameterSweep(bot).run(data, param_grid,
+                                      initial_capital=100000, max_workers=2)
+
+    assert len(results) == 8
+    assert results['total_pnl'].is_monotonic_decreasing
+
+    best = results.iloc[0]
+    tuned = TradingBot(symbols=['AAPL'], min_gap_size=best['min_gap_size'],
+                       volume_threshold=best['volume_threshold'],
+                       risk_per_trade=best['risk_per_trade'], data_source=replay_source)
+    backtester = Backtester(tuned)
+    backtester.run('AAPL', '2024-01-01', '2024-01-11', 100000)
+    metrics = backtester.get_performance_metrics()
+    assert best['total_trades'] == metrics['total_trades']
+    assert best['total_pnl'] == pytest.approx(metrics['total_pnl'])
+
+def test_performance_accumulator_streaming_matches_batch():
+    rng = np.random.default_rng(3)
+    pnl = rng.normal(10, 100, 200)
+    equity = 100000 + np.cumsum(rng.normal(0, 50, 1000))
+    timestamps = pd.date_range('2024-01-01', periods=1000, freq='5min').asi8
+    exposed = rng.random(1000) < 0.4
+
+    streaming = PerformanceAccumulator(100000)
+    for value in pnl:
+        streaming.record_trade(value)
+    for timestamp, value, flag in zip(timestamps, equity, exposed):
+        streaming.mark(timestamp, value, flag)
+
+    batch = PerformanceAccumulator(100000)
+    batch.record_trades(pnl[:50])
+    batch.record_trades(pnl[50:])
+    batch.mark_many(timestamps[:300], equity[:300], exposed[:300])
+    batch.mark_many(timestamps[300:], equity[300:], exposed[300:])
+
+    assert batch.summary() == pytest.approx(streaming.summary())
+    pd.testing.assert_series_equal(batch.equity_curve(), streaming.equity_curve())
+
+    returns = streaming.equity_curve().pct_change().dropna()
+    summary = streaming.summary()
+    assert summary['sharpe_ratio'] == pytest.approx(returns.mean() / returns.std() * np.sqrt(252 * 78))
+    assert summary['max_equity_drawdown'] == pytest.approx(-streaming.drawdown_curve().min())
+    assert summary['exposure'] == pytest.approx(exposed.mean())
+    realized = 100000 + np.cumsum(pnl)
+    assert summary['max_drawdown'] == pytest.approx(
+        (np.maximum.accumulate(np.maximum(realized, 100000)) - realized).max())
+
+def test_performance_metrics_agree_across_engines(replay_source):
+    metrics = {}
+    for engine in ('event', 'vectorized'):
+        bot = TradingBot(symbols=['AAPL'], min_gap_size=0.05, volume_threshold=1.0,
+                         data_source=replay_source)
+        backtester = Backtester(bot)
+        trades = backtester.run('AAPL', '2024-01-01', '2024-01-11', 100000, engine=engine)
+        metrics[engine] = backtester.get_performance_metrics()
+        assert {key: metrics[engine][key] for key in Backtester.calculate_metrics(trades)} == \
+            pytest.approx(Backtester.calculate_metrics(trades))
+
+    assert metrics['event'] == pytest.approx(metrics['vectorized'])
+    assert metrics['event']['final_equity'] == pytest.approx(100000 + metrics['event']['total_pnl'])
+    assert 0 < metrics['event']['exposure'] < 1
+
+def test_walk_forward_picks_parameters_on_train_windows(replay_source):
+    bot = TradingBot(symbols=['AAPL'], min_gap_size=0.05, volume_threshold=1.0,
+                     data_source=replay_source)
+    param_grid = {'min_gap_size': [0.05, 0.2], 'volume_threshold': [0.8, 1.2]}
+    data = {symbol: Backtester(bot).fetch_history(symbol, '2024-01-01', '2024-01-11')
+            for symbol in ('AAPL', 'MSFT')}
+    walk_forward = WalkForward(bot, train_period='3D', test_period='2D')
+    result = walk_forward.run(data, param_grid, initial_capital=100000, max_workers=2)
+
+    windows = result.windows
+    assert len(windows) == 4
+    assert (windows['test_start'].iloc[1:].to_numpy() == windows['test_end'].iloc[:-1].to_numpy()).all()
+    assert result.equity.index[0] == windows['test_start'].iloc[0]
+    assert result.equity.index[-1] == data['AAPL'].index[-1]
+
+    # Each window's choice is the best of a sweep over its train bars alone
+    sweep = ParameterSweep(bot)
+    features = sweep.compute_features(data)
+    for _, window in windows.iterrows():
+        train = {symbol: symbol_features.window(*symbol_features.index.searchsorted(
+                     [window['train_start'], window['test_start']]))
+                 for symbol, symbol_features in features.items()}
+        best = sweep.run_features(train, param_grid, 100000, max_workers=1).iloc[0]
+        assert (window['min_gap_size'], window['volume_threshold']) == \
+            (best['min_gap_size'], best['volume_threshold'])
+        assert window['train_total_pnl'] == pytest.approx(best['total_pnl'])
+
+    assert len(result.trades) == windows['test_total_trades'].sum() > 0
+    assert (result.trades['entry_time'] >= windows['test_start'].iloc[0]).all()
+    assert result.equity.iloc[-1] == pytest.approx(100000 + result.trades['pnl'].sum())
+    assert result.metrics['final_equity'] == pytest.approx(result.equity.iloc[-1])
+
+def test_monte_carlo_bootstrap_matches_enumerated_sequences():
+    pnl = np.array([300.0, -200.0, -450.0])
+    initial_capital, ruin_level = 1000.0, 0.3
+
+    # Every sequence of four trades, with its equity path measured directly
+    outcomes = {}
+    for sequence in product(pnl, repeat=4):
+        equity = initial_capital + np.cumsum(sequence)
+        peak = np.maximum.accumulate(np.maximum(equity, initial_capital))
+        outcomes[sequence] = (equity[-1], (peak - equity).max(), ((peak - equity) / peak).max(),
+                              equity.min() <= ruin_level * initial_capital)
+    exact = np.array(list(outcomes.values()))
+
+    monte_carlo = MonteCarlo(initial_capital, ruin_level=ruin_level, batch_size=1000, seed=7)
+    result = monte_carlo.run(pd.DataFrame({'pnl': pnl}), n_resamples=20000, n_trades=4, max_workers=3)
+    simulated = np.column_stack([result.final_equity, result.max_drawdown,
+                                 result.max_drawdown_pct, result.ruined])
+    matches = np.isclose(simulated[:, None, :], exact[None, :, :], rtol=1e-6).all(axis=2)
+    assert matches.any(axis=1).all()
+
+    # Sequences are equally likely, so the averages converge to the exact ones
+    assert result.final_equity.mean() == pytest.approx(exact[:, 0].mean(), rel=0.01)
+    assert result.risk_of_ruin == pytest.approx(exact[:, 3].mean(), abs=0.01)
+    low, high = result.confidence_interval('max_drawdown', 0.9)
+    assert low <= np.median(result.max_drawdown) <= high
+
+    serial = MonteCarlo(initial_capital, ruin_level=ruin_level, batch_size=1000, seed=7).run(
+        pnl, n_resamples=20000, n_trades=4, max_workers=1)
+    np.testing.assert_array_equal(serial.max_drawdown, result.max_drawdown)
+
+def test_monte_carlo_rejects_non_positive_capital():
+    for capital in (0, -1000):
+        with pytest.raises(ValueError):
+            MonteCarlo(capital)
+
+def test_monte_carlo_shuffle_keeps_final_equity():
+    pnl = np.random.default_rng(5).normal(15, 200, 300)
+    for compound in (False, True):
+        result = MonteCarlo(100000, method='shuffle', compound=compound, seed=1).run(pnl, n_resamples=500)
+        summary = result.summary()
+        assert result.final_equity == pytest.approx(100000 + pnl.sum(), rel=1e-12)
+        assert result.observed_final_equity == pytest.approx(100000 + pnl.sum())
+        assert 0 < summary['observed_drawdown_exceeded'] < 1
+        assert 0 < summary['max_drawdown_pct_median'] < 1
+        assert summary['risk_of_ruin'] == 0
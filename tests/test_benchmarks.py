@@ -0,0 +1,39 @@
+from ..benchmarks.cases import default_cases
+from ..benchmarks.data import SyntheticSource
+from ..benchmarks.runner import compare, load_baselines, run_benchmarks, save_baselines
+
+def test_synthetic_source_is_deterministic():
+    source = SyntheticSource(500, seed=1)
+    df = source.history('AAPL')
+    assert len(df) == 500
+    assert df.equals(SyntheticSource(500, seed=1).history('AAPL'))
+    assert not df.equals(source.history('MSFT'))
+    assert len(source.history('AAPL', start=str(df.index[100]), end=str(df.index[200]))) == 100
+
+def test_run_benchmarks_reports_throughput_and_memory():
+    cases = default_cases(sizes=(300,), symbol_counts=(2,))
+    results = run_benchmarks(cases, repeat=1, only=['find_fvg', 'backtest_event', 'run_many'])
+    assert set(results) == {'find_fvg[300]', 'backtest_event[300]', 'run_many[2]'}
+    assert results['run_many[2]']['bars'] == 2000
+    for result in results.values():
+        assert result['bars_per_second'] > 0
+        assert result['peak_memory_mb'] >= 0
+
+def test_compare_flags_regressions(tmp_path):
+    baselines = {
+        'find_fvg[10000]': {'bars_per_second': 1000.0, 'peak_memory_mb': 10.0},
+        'run_many[10]': {'bars_per_second': 1000.0, 'peak_memory_mb': 10.0}
+    }
+    results = {
+        'find_fvg[10000]': {'bars_per_second': 800.0, 'peak_memory_mb': 12.0},
+        'run_many[10]': {'bars_per_second': 700.0, 'peak_memory_mb': 20.0},
+        'new_case[10]': {'bars_per_second': 1.0}
+    }
+    regressions = compare(results, baselines, tolerance=0.25)
+    assert len(regressions) == 2
+    assert all(regression.startswith('run_many[10]') for regression in regressions)
+
+    path = tmp_path / 'baselines.json'
+    save_baselines(baselines, path)
+    save_baselines({'new_case[10]': results['new_case[10]']}, path)
+    assert set(load_baselines(path)) == set(baselines) | {'new_case[10]'}
@@ -0,0 +1,79 @@
+from ..data.sources import DataSource, FileReplaySource
+from ..data.cache import CachedDataSource
+import pandas as pd
+import pytest
+
+class CountingSource(DataSource):
+    def __init__(self, df):
+        self.df = df
+        self.calls = 0
+
+    def history(self, symbol, start=None, end=None, period=None, interval='5m'):
+        self.calls += 1
+        return self.df
+
+def test_file_replay_source_filters_range(sample_price_data, tmp_path):
+    sample_price_data.to_csv(tmp_path / 'AAPL.csv')
+    source = FileReplaySource(tmp_path)
+
+    df = source.history('AAPL', start='2024-01-01 01:00', end='2024-01-01 02:00')
+    assert len(df) == 12
+    assert df.index[0] == pd.Timestamp('2024-01-01 01:00')
+    assert list(df.columns) == list(sample_price_data.columns)
+
+    latest = source.history('AAPL', period='1h')
+    assert latest.index[-1] == sample_price_data.index[-1]
+    assert len(latest) == 12
+
+def test_cached_data_source_reads_through(sample_price_data, tmp_path):
+    df = sample_price_data.tz_localize('America/New_York')
+    source = CountingSource(df)
+    cache = CachedDataSource(source, tmp_path / 'cache')
+
+    first = cache.history('AAPL', start='2024-01-01', end='2024-01-02')
+    second = cache.history('AAPL', start='2024-01-01', end='2024-01-02')
+
+    assert source.calls == 1
+    pd.testing.assert_frame_equal(second, first, check_freq=False)
+
+    # Trailing periods are never cached
+    cache.history('AAPL', period='1d')
+    cache.history('AAPL', period='1d')
+    assert source.calls == 3
+
+def test_file_replay_source_parses_yfinance_periods(random_walk_data, tmp_path):
+    random_walk_data.to_csv(tmp_path / 'AAPL.csv')
+    source = FileReplaySource(tmp_path)
+    last = random_walk_data.index[-1]
+
+    assert source.history('AAPL', period='1d').index[0] == last - pd.Timedelta(days=1) + pd.Timedelta(minutes=5)
+    assert len(source.history('AAPL', period='1mo')) == len(random_walk_data)
+    assert len(source.history('AAPL', period='ytd')) == len(random_walk_data)
+    assert len(source.history('AAPL', period='max')) == len(random_walk_data)
+    with pytest.raises(ValueError, match='Unknown period'):
+        source.history('AAPL', period='1 month')
+
+def test_data_source_requires_history():
+    class BulkOnly(DataSource):
+        def history_many(self, symbols, start=None, end=None, period=None, interval='5m'):
+            return {}
+
+    with pytest.raises(TypeError):
+        BulkOnly()
+
+def test_cached_data_source_skips_open_and_empty_ranges(sample_price_data, tmp_path):
+    source = CountingSource(sample_price_data)
+    cache = CachedDataSource(source, tmp_path / 'cache')
+
+    # A range that has not ended yet is still filling in
+    cache.history('AAPL', start='2024-01-01', end='2999-01-01')
+    cache.history('AAPL', start='2024-01-01', end='2999-01-01')
+    assert source.calls == 2
+
+    # A failed download is not remembered
+    source.df = sample_price_data.iloc[:0]
+    assert len(cache.history('AAPL', start='2024-01-01', end='2024-01-02')) == 0
+    source.df = sample_price_data
+    assert len(cache.history('AAPL', start='2024-01-01', end='2024-01-02')) == len(sample_price_data)
+    assert len(cache.history_many(['AAPL'], start='2024-01-01', end='2024-01-02')['AAPL']) == len(sample_price_data)
+    assert source.calls == 4
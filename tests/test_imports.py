@@ -0,0 +1,33 @@
+from pathlib import Path
+import subprocess
+import sys
+import pytest
+
+PACKAGE_ROOT = Path(__file__).resolve().parents[1]
+
+# Entry points that backtests, sweeps, workers and the live bot import
+ENTRY_POINTS = ('backtesting.backtester', 'backtesting.parameter_sweep', 'backtesting.walk_forward',
+                'trading.trading_bot')
+
+# Only loaded on demand: plotting and the Yahoo Finance client
+HEAVY_MODULES = ('matplotlib', 'seaborn', 'yfinance', 'scipy')
+
+# Cold import of one entry point, dominated by pandas and NumPy (about 0.5 s)
+IMPORT_BUDGET_SECONDS = 1.5
+
+def _import(module: str):
+    """Import module in a fresh interpreter; returns (cumulative seconds, heavy modules loaded)"""
+    code = (f"import {module}, sys; "
+            f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=PACKAGE_ROOT,
+                            capture_output=True, text=True, check=True)
+    cumulative = [int(line.split('|')[1]) for line in result.stderr.splitlines()
+                  if line.startswith('import time:') and line.split('|')[2].strip() == module]
+    loaded = [name for name in result.stdout.strip().split(',') if name]
+    return cumulative[-1] / 1e6, loaded
+
+@pytest.mark.parametrize('module', ENTRY_POINTS)
+def test_entry_points_skip_heavy_dependencies(module):
+    seconds, loaded = _import(module)
+    assert loaded == []
+    assert seconds < IMPORT_BUDGET_SECONDS
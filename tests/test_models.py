@@ -1,6 +1,12 @@
-from ..models.fair_value_gap import FairValueGap
-from ..models.trade import Trade
+from ..models.fair_value_gap import FairValueGap, SlottedFairValueGap
+from ..models.trade import Trade, SlottedTrade
+from ..models.fvg_store import FVGStore
+from ..models.trade_store import TradeStore
+from ..models.direction import Direction
 from datetime import datetime
+import numpy as np
+import pandas as pd
+import pytest
 
 def test_fair_value_gap_creation():
     fvg = FairValueGap(
@@ -42,3 +48,95 @@ def test_trade_creation():
     assert trade.direction == 'bullish'
     assert trade.size == 100
     assert trade.symbol == 'AAPL'
+
+def _random_gaps(count, seed=0):
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp('2024-01-01', tz='America/New_York')
+    gaps = []
+    for k in range(count):
+        lower = 100 + rng.normal() * 5
+        gaps.append(FairValueGap(
+            start_time=start + pd.Timedelta(minutes=5 * k),
+            end_time=start + pd.Timedelta(minutes=5 * k + 10),
+            upper_price=lower + rng.uniform(0.1, 3.0),
+            lower_price=lower,
+            volume_weight=rng.uniform(1, 3),
+            direction='bullish' if rng.random() < 0.5 else 'bearish'
+        ))
+    return gaps
+
+def test_slotted_variants_match_dataclasses():
+    fvg = SlottedFairValueGap(
+        start_time=datetime(2024, 1, 1),
+        end_time=datetime(2024, 1, 1, 0, 5),
+        upper_price=105.0,
+        lower_price=100.0,
+        volume_weight=1.5,
+        direction='bullish'
+    )
+    assert not hasattr(fvg, '__dict__')
+    assert fvg.mitigated == False
+    assert fvg.is_price_in_gap(102.5) and fvg.is_mitigated_by_price(99.0)
+
+    trade = SlottedTrade(100.0, 98.0, 104.0, 'bullish', 100, 'AAPL', datetime(2024, 1, 1))
+    assert not hasattr(trade, '__dict__')
+    assert trade.close_time is None
+
+def test_fvg_store_matches_object_semantics():
+    gaps = _random_gaps(500)
+    store = FVGStore.from_gaps(gaps, symbol='AAPL')
+    assert len(store) == 500
+    assert store[7] == SlottedFairValueGap(**vars(gaps[7]))
+
+    for price in (95.0, 100.0, 104.0):
+        inside = [k for k, fvg in enumerate(gaps) if not fvg.mitigated and fvg.is_price_in_gap(price)]
+        assert store.containing(price).tolist() == inside
+
+        filled = [k for k, fvg in enumerate(gaps) if not fvg.mitigated and fvg.is_mitigated_by_price(price)]
+        for k in filled:
+            gaps[k].mitigated = True
+        assert store.mitigate(price, symbol='AAPL').tolist() == filled
+
+    open_gaps = store.unmitigated()
+    assert len(open_gaps) == sum(not fvg.mitigated for fvg in gaps)
+    assert store.mitigate(100.0, symbol='MSFT').size == 0
+
+def test_fvg_store_per_symbol_prices_and_memory():
+    store = FVGStore()
+    for k, symbol in enumerate(('AAPL', 'MSFT')):
+        for fvg in _random_gaps(100, seed=k):
+            store.append(fvg, symbol)
+
+    rows = store.mitigate({'AAPL': 100.0})
+    assert rows.size > 0 and (store.column('symbol')[rows] == store.symbol_code('AAPL')).all()
+
+    frame = store.to_frame()
+    assert set(frame['symbol']) == {'AAPL', 'MSFT'}
+    assert str(frame['start_time'].dt.tz) == 'America/New_York'
+
+    n = 1_000_000
+    big = FVGStore(capacity=16)
+    ns = np.arange(n, dtype=np.int64)
+    big.extend_arrays(ns, ns, np.ones(n), np.zeros(n), np.ones(n), ns % 2 == 0, symbol='SPY')
+    assert len(big) == n
+    assert big.nbytes < 50 * 1024 * 1024
+
+def test_trade_store_closes_hits():
+    store = TradeStore()
+    store.append(Trade(100.0, 98.0, 104.0, 'bullish', 10, 'AAPL', datetime(2024, 1, 1)))
+    store.append(Trade(50.0, 51.0, 48.0, 'bearish', 20, 'MSFT', datetime(2024, 1, 1)))
+
+    assert store.close_hits({'AAPL': 103.0, 'MSFT': 49.0}, datetime(2024, 1, 2)).size == 0
+    rows = store.close_hits({'AAPL': 105.0, 'MSFT': 52.0}, datetime(2024, 1, 2))
+    assert rows.tolist() == [0, 1]
+    assert store.column('pnl').tolist() == [50.0, -40.0]
+    assert not store.open_mask().any()
+    assert store[1].close_time == pd.Timestamp(2024, 1, 2)
+    assert store[1].direction == 'bearish'
+
+def test_direction_parse_rejects_unknown_labels():
+    assert Direction.parse('bullish') is Direction.BULLISH
+    assert Direction.parse('bearish') is Direction.BEARISH
+    for label in ('Bullish', 'bulish', None, ''):
+        with pytest.raises(ValueError, match='Unknown direction'):
+            Direction.parse(label)
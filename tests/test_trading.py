@@ -1,5 +1,16 @@
+import threading
+import time
+import pandas as pd
 import pytest
 from ..trading.trading_bot import TradingBot
+from ..trading.scheduler import BarScheduler
+from ..trading.pipeline import TradingPipeline
+from ..models.fair_value_gap import FairValueGap
+import asyncio
+from ..models.trade import Trade
+from ..data.sources import DataSource
+from ..utils.journal import StateJournal
+from ..utils.synthetic import SyntheticMarketGenerator
 
 @pytest.mark.asyncio
 async def test_trading_bot_initialization():
@@ -29,3 +40,338 @@ async def test_position_size_calculation():
     
     expected_size = (100000.0 * 0.02) / 2.0  # 2.0 is the risk per share
     assert abs(position_size - expected_size) < 0.01
+
+class BulkSource(DataSource):
+    """Test source that only implements the bulk request"""
+    def history(self, symbol, start=None, end=None, period=None, interval='5m'):
+        return self.history_many([symbol], start=start, end=end, period=period, interval=interval)[symbol]
+
+class SlowBulkSource(BulkSource):
+    """Blocking bulk source that fails the first request and records how many requests overlap"""
+    def __init__(self, df, delay):
+        self.df = df
+        self.delay = delay
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def history_many(self, symbols, start=None, end=None, period=None, interval='5m'):
+        with self._lock:
+            self.requests.append(list(symbols))
+            if len(self.requests) == 1:
+                raise ConnectionError("rate limited")
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.delay)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+        return {symbol: self.df for symbol in symbols}
+
+@pytest.mark.asyncio
+async def test_fetch_batch_runs_off_event_loop(sample_price_data):
+    symbols = [f'SYM{i}' for i in range(8)]
+    source = SlowBulkSource(sample_price_data, delay=0.2)
+    bot = TradingBot(symbols=symbols, data_source=source, batch_size=2,
+                     max_concurrent_requests=4, retry_backoff=0.01)
+
+    frames = await bot.fetch_batch(symbols)
+
+    assert set(frames) == set(symbols)
+    assert len(source.requests) == 5  # Four batches plus one retry
+    # Batches overlap in worker threads instead of running one after another
+    assert 1 < source.max_in_flight <= 4
+
+@pytest.mark.asyncio
+async def test_process_symbol_tracks_fvgs(sample_fvg_data):
+    bot = TradingBot(symbols=['AAPL'], min_gap_size=0.5, volume_threshold=0.5)
+    extra_bar = sample_fvg_data.iloc[[-1]].copy()
+    extra_bar.index = extra_bar.index + pd.Timedelta(minutes=5)
+    bars = bot.merge_bars('AAPL', pd.concat([sample_fvg_data, extra_bar]))
+    bot.process_symbol('AAPL', bars, 100000.0)
+
+    assert len(bot.pending_fvgs['AAPL']) == 2
+
+def test_merge_bars_feeds_higher_timeframes(sample_price_data):
+    bot = TradingBot(symbols=['AAPL'], timeframes=('15m', '1h'))
+    bot.merge_bars('AAPL', sample_price_data.iloc[:10])
+    bot.merge_bars('AAPL', sample_price_data.iloc[9:])  # Refetch from the forming bar
+
+    expected = sample_price_data.resample('1h').agg({'Open': 'first', 'High': 'max', 'Low': 'min',
+                                                      'Close': 'last', 'Volume': 'sum'})
+    pd.testing.assert_frame_equal(bot.timeframe_frame('AAPL', '1h'), expected,
+                                  check_freq=False, check_index_type=False)
+
+@pytest.mark.asyncio
+async def test_live_stages_are_timed(sample_price_data):
+    utc_bars = sample_price_data.tz_localize('UTC')
+    bot = TradingBot(symbols=['AAPL', 'MSFT'], data_source=SlowBulkSource(utc_bars, delay=0.01),
+                     retry_backoff=0.01)
+    frames = await bot.fetch_batch(['AAPL', 'MSFT'])
+    for symbol, bars in frames.items():
+        bot.process_symbol(symbol, bars, 100000.0)
+
+    for stage in ('fetch', 'structure', 'detection', 'decision'):
+        assert bot.metrics.value('stage_seconds', symbol='AAPL', stage=stage).count == 1
+    assert bot.metrics.value('stage_seconds', symbol='MSFT', stage='fetch').sum >= 0.01
+    lag = bot.metrics.value('bar_lag_seconds', symbol='MSFT')
+    assert lag == pytest.approx(time.time() - utc_bars.index[-1].timestamp(), abs=60)
+    assert bot.metrics.value('fetch_retries_total') == 1
+
+    # Naive bars carry no zone to measure their lag from
+    naive = TradingBot(symbols=['AAPL'])
+    naive.process_symbol('AAPL', naive.merge_bars('AAPL', sample_price_data), 100000.0)
+    assert naive.metrics.value('bar_lag_seconds', symbol='AAPL') is None
+    assert 'stage_seconds_bucket{stage="decision",symbol="AAPL",le="+Inf"} 1' in bot.metrics.to_prometheus()
+
+class GrowingSource(BulkSource):
+    """Serves the bars in self.feed that are at or after the requested start"""
+    def __init__(self, feed):
+        self.feed = feed
+        self.requests = []
+
+    def history_many(self, symbols, start=None, end=None, period=None, interval='5m'):
+        self.requests.append({'start': start, 'period': period})
+        df = self.feed if start is None else self.feed[self.feed.index >= start]
+        return {symbol: df for symbol in symbols}
+
+@pytest.mark.asyncio
+async def test_fetch_batch_requests_only_new_bars(sample_price_data):
+    source = GrowingSource(sample_price_data.iloc[:50])
+    bot = TradingBot(symbols=['AAPL'], data_source=source, history_bars=40)
+
+    window = (await bot.fetch_batch(['AAPL']))['AAPL']
+    assert source.requests[-1] == {'start': None, 'period': '1d'}
+    assert window.timestamp(-1) == sample_price_data.index[49]
+    assert len(window) == 40
+
+    # The forming bar closes at a new price and ten more bars arrive
+    feed = sample_price_data.iloc[:60].copy()
+    feed.iloc[49, feed.columns.get_loc('Close')] += 1.0
+    source.feed = feed
+    window = (await bot.fetch_batch(['AAPL']))['AAPL']
+
+    assert source.requests[-1] == {'start': sample_price_data.index[49], 'period': None}
+    assert len(window) == 40
+    pd.testing.assert_frame_equal(window.to_frame(), feed.iloc[-40:], check_freq=False, check_index_type=False)
+
+class FakeClock:
+    """Wall clock that only moves when slept on or advanced"""
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.now += seconds
+
+class TimedSource(BulkSource):
+    """Bulk source that records when each request arrives; request k takes costs[k] seconds"""
+    def __init__(self, df, clock, costs=()):
+        self.df = df
+        self.clock = clock
+        self.costs = list(costs)
+        self.requests = []
+
+    def history_many(self, symbols, start=None, end=None, period=None, interval='5m'):
+        self.requests.append((self.clock.now, list(symbols)))
+        if len(self.requests) <= len(self.costs):
+            self.clock.now += self.costs[len(self.requests) - 1]
+        return {symbol: self.df for symbol in symbols}
+
+@pytest.mark.asyncio
+async def test_scheduler_runs_on_bar_closes_open_trades_first(sample_price_data):
+    clock = FakeClock(1000.0)
+    source = TimedSource(sample_price_data, clock)
+    bot = TradingBot(symbols=['AAPL', 'MSFT', 'GOOGL'], data_source=source)
+    bot.active_trades['MSFT'] = Trade(100.0, 1.0, 1e9, 'bullish', 1, 'MSFT', sample_price_data.index[0])
+    scheduler = BarScheduler(bot, bar_interval=300, settle_delay=2, jitter=1, clock=clock,
+                             sleep=clock.sleep, seed=0)
+    await scheduler.run(100000.0, max_cycles=2)
+
+    (first_time, first), (second_time, second) = source.requests[:2]
+    assert first == ['MSFT'] and second == ['AAPL', 'GOOGL']
+    assert 1202 <= first_time <= 1203 and second_time == first_time
+    assert 1502 <= source.requests[2][0] <= 1503
+    assert scheduler.skipped_cycles == 0
+    assert bot.metrics.value('decision_latency_seconds', group='open_trades').count == 2
+
+@pytest.mark.asyncio
+async def test_scheduler_skips_overrun_cycles(sample_price_data):
+    clock = FakeClock(1000.0)
+    source = TimedSource(sample_price_data, clock, costs=[700])
+    bot = TradingBot(symbols=['AAPL'], data_source=source)
+    scheduler = BarScheduler(bot, bar_interval=300, settle_delay=2, jitter=1, clock=clock,
+                             sleep=clock.sleep, seed=0)
+    await scheduler.run(100000.0, max_cycles=2)
+
+    # The 1500 and 1800 closes pass while the 1200 pass is still fetching
+    assert scheduler.skipped_cycles == 2
+    assert bot.metrics.value('scheduler_skipped_cycles_total') == 2
+    assert 2102 <= source.requests[1][0] <= 2103
+
+def test_scheduler_due_symbols_follow_their_intervals():
+    bot = TradingBot(symbols=['AAPL', 'SLOW'])
+    scheduler = BarScheduler(bot, bar_interval=300, symbol_intervals={'SLOW': 900})
+    assert scheduler.due_symbols(1500) == ['AAPL']
+    assert scheduler.due_symbols(1800) == ['AAPL', 'SLOW']
+    assert scheduler.next_boundary(1800) == 2100
+
+@pytest.mark.asyncio
+async def test_pipeline_exit_checks_do_not_wait_for_analysis(sample_price_data):
+    bot = TradingBot(symbols=['AAPL', 'MSFT'])
+    analysing = []
+
+    def slow_find_entries(symbol, bars):
+        analysing.append(symbol)
+        time.sleep(0.3)
+        return []
+    bot.find_entries = slow_find_entries
+
+    price = sample_price_data['Close'].iloc[-1]
+    bot.active_trades['MSFT'] = Trade(price + 1, price + 0.5, price + 5, 'bullish', 1, 'MSFT',
+                                      sample_price_data.index[0])
+    pipeline = TradingPipeline(bot, 100000.0, analysis_workers=1)
+    await pipeline.start()
+    try:
+        await pipeline.ingest('AAPL', bot.merge_bars('AAPL', sample_price_data))
+        await pipeline.ingest('MSFT', bot.merge_bars('MSFT', sample_price_data))
+        await asyncio.sleep(0.05)
+        assert analysing == ['AAPL']  # AAPL is still being analysed...
+        assert 'MSFT' not in bot.active_trades  # ...but MSFT's stop loss has already been handled
+        await pipeline.join()
+    finally:
+        await pipeline.stop()
+    assert analysing == ['AAPL', 'MSFT']
+
+@pytest.mark.asyncio
+async def test_pipeline_drops_superseded_bars_and_stale_signals(sample_price_data):
+    bot = TradingBot(symbols=['AAPL'])
+    analysed = []
+    fvg = FairValueGap(sample_price_data.index[0], sample_price_data.index[2], 200.0, 1.0, 2.0, 'bullish')
+
+    def slow_find_entries(symbol, bars):
+        analysed.append(len(bars))
+        time.sleep(0.1)
+        return [fvg]
+    bot.find_entries = slow_find_entries
+
+    pipeline = TradingPipeline(bot, 100000.0, analysis_workers=1)
+    await pipeline.start()
+    try:
+        for n in (50, 60, 70):
+            await pipeline.ingest('AAPL', bot.merge_bars('AAPL', sample_price_data.iloc[:n]))
+            await asyncio.sleep(0.01)
+        await pipeline.join()
+    finally:
+        await pipeline.stop()
+
+    # The 60-bar window was replaced while queued; the 50-bar signal was stale once 70 arrived
+    assert analysed == [50, 70]
+    assert bot.metrics.value('pipeline_dropped_total', symbol='AAPL', reason='superseded') == 1
+    assert bot.metrics.value('pipeline_dropped_total', symbol='AAPL', reason='stale_signal') == 1
+    assert bot.metrics.value('signals_total', symbol='AAPL', direction='bullish') == 1
+
+@pytest.mark.asyncio
+async def test_pipeline_drops_expired_bars(sample_price_data):
+    bot = TradingBot(symbols=['AAPL'])
+    pipeline = TradingPipeline(bot, 100000.0, max_bar_age=60)
+    await pipeline.start()
+    try:
+        await pipeline.ingest('AAPL', bot.merge_bars('AAPL', sample_price_data))
+        await pipeline.join()
+    finally:
+        await pipeline.stop()
+    assert bot.metrics.value('pipeline_dropped_total', symbol='AAPL', reason='expired') == 1
+    assert bot.metrics.value('stage_seconds', symbol='AAPL', stage='detection') is None
+
+@pytest.mark.asyncio
+async def test_scheduler_feeds_pipeline(sample_price_data):
+    clock = FakeClock(1000.0)
+    bot = TradingBot(symbols=['AAPL', 'MSFT'], data_source=TimedSource(sample_price_data, clock))
+    pipeline = TradingPipeline(bot, 100000.0)
+    scheduler = BarScheduler(bot, clock=clock, sleep=clock.sleep, seed=0, pipeline=pipeline)
+    await pipeline.start()
+    try:
+        await scheduler.run(100000.0, max_cycles=1)
+        await pipeline.join()
+    finally:
+        await pipeline.stop()
+    for symbol in ('AAPL', 'MSFT'):
+        assert bot.metrics.value('stage_seconds', symbol=symbol, stage='detection').count == 1
+
+@pytest.mark.asyncio
+async def test_scheduler_writes_snapshots_off_the_event_loop(sample_price_data, tmp_path):
+    clock = FakeClock(1000.0)
+    journal = StateJournal(tmp_path, flush_interval=60, fsync=False, snapshot_every=1)
+    bot = TradingBot(symbols=['AAPL', 'MSFT'], min_gap_size=0.05, volume_threshold=1.0,
+                     data_source=TimedSource(sample_price_data, clock), journal=journal)
+    writers = []
+    write_snapshot = journal.write_snapshot
+    def recording_write_snapshot(*args):
+        writers.append(threading.get_ident())
+        write_snapshot(*args)
+    journal.write_snapshot = recording_write_snapshot
+
+    await BarScheduler(bot, clock=clock, sleep=clock.sleep, seed=0).run(100000.0, max_cycles=1)
+    assert len(writers) == 1 and writers[0] != threading.get_ident()
+
+    restored = TradingBot(symbols=['AAPL', 'MSFT'], journal=StateJournal(tmp_path, fsync=False))
+    restored.restore()
+    for symbol in ('AAPL', 'MSFT'):
+        assert restored.symbol_detectors[symbol].state() == bot.symbol_detectors[symbol].state()
+    assert restored.active_trades == bot.active_trades
+
+@pytest.mark.asyncio
+async def test_checkpoint_writes_lone_event_after_flush_interval(tmp_path):
+    journal = StateJournal(tmp_path, batch_size=64, flush_interval=0.2, fsync=False)
+    bot = TradingBot(symbols=['AAPL'], journal=journal)
+    journal.append('mitigation', defer=True, symbol='AAPL', price=1.0, gaps=1)
+    assert not await bot.checkpoint_async()
+    assert journal.journal_path.read_text() == ''
+
+    await asyncio.sleep(0.25)
+    assert not await bot.checkpoint_async()
+    assert len(journal.journal_path.read_text().splitlines()) == 1
+
+def test_restore_rebuilds_state_from_snapshot_and_journal(tmp_path):
+    df = SyntheticMarketGenerator(1200, seed=3, n_gaps=40, n_swings=40).generate_symbol('AAPL')[0]
+
+    def new_bot():
+        return TradingBot(symbols=['AAPL'], min_gap_size=0.05, volume_threshold=1.0,
+                          journal=StateJournal(tmp_path, batch_size=16, fsync=False))
+
+    def feed(bot, start, end):
+        for stop in range(start + 25, end + 1, 25):
+            bars = bot.merge_bars('AAPL', df.iloc[stop - 25:stop])
+            bot.process_symbol('AAPL', bars, 100000.0)
+
+    def state(bot):
+        detector = bot.symbol_detectors['AAPL']
+        return (bot.active_trades, bot.pending_fvgs['AAPL'], detector.state(),
+                bot.last_bar_time['AAPL'], bot.bar_buffers['AAPL'].window().to_frame())
+
+    bot = new_bot()
+    feed(bot, 0, 500)
+    assert bot.checkpoint(force=True)
+    feed(bot, 500, 800)
+    bot.journal.flush()  # Crash without a final snapshot
+    assert 'AAPL' in bot.active_trades
+
+    restored = new_bot()
+    assert restored.restore() > 0
+    before, after = state(bot), state(restored)
+    assert before[:4] == after[:4]
+    # Bar history comes from the snapshot; the next fetch only asks for newer bars
+    assert restored._request_kwargs(['AAPL']) == {'start': df.index[499], 'interval': '5m'}
+    restored.merge_bars('AAPL', df.iloc[499:800])
+    pd.testing.assert_frame_equal(state(restored)[4], before[4])
+    assert bot.metrics.value('signals_total', symbol='AAPL', direction='bullish') > 0
+
+    # Both carry on identically
+    feed(bot, 800, 1200)
+    feed(restored, 800, 1200)
+    assert state(bot)[:4] == state(restored)[:4]
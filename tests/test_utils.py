@@ -0,0 +1,241 @@
+from ..utils.ring_buffer import BarRingBuffer
+from ..utils.metrics import EventLoopLagMonitor, Histogram, MetricsRegistry
+from ..utils.synthetic import SyntheticMarketGenerator, generate_market
+from ..utils.journal import StateJournal
+from ..utils.timeframes import MultiTimeframeBars, TimeframeAggregator
+from ..analyzers.fvg_detector import FVGDetector
+from ..analyzers.structure_analyzer import StructureAnalyzer
+import asyncio
+import json
+import numpy as np
+import pandas as pd
+import pytest
+import threading
+import time
+
+def test_ring_buffer_window_is_contiguous_view(sample_price_data):
+    buffer = BarRingBuffer(capacity=16)
+    buffer.extend(sample_price_data.iloc[:10])
+    for row in sample_price_data.iloc[10:40].itertuples():
+        buffer.append(row.Index.value, row.Open, row.High, row.Low, row.Close, row.Volume)
+
+    window = buffer.window()
+    assert len(window) == 16
+    assert np.shares_memory(window.close, buffer._prices)
+    pd.testing.assert_frame_equal(window.to_frame(), sample_price_data.iloc[24:40], check_freq=False, check_index_type=False)
+    np.testing.assert_array_equal(buffer.window(5).high, sample_price_data['High'].to_numpy()[35:40])
+
+def test_ring_buffer_truncate_replaces_forming_bar(sample_price_data):
+    buffer = BarRingBuffer(capacity=8)
+    buffer.extend(sample_price_data.iloc[:20])
+
+    update = sample_price_data.iloc[19:22].copy()
+    update['Close'] += 1.0
+    buffer.truncate_from(update.index[0].value)
+    buffer.extend(update)
+
+    expected = pd.concat([sample_price_data.iloc[14:19], update])
+    pd.testing.assert_frame_equal(buffer.window().to_frame(), expected, check_freq=False, check_index_type=False)
+
+def test_synthetic_market_plants_exactly_the_known_gaps():
+    market = generate_market(['AAPL', 'MSFT'], 5000, seed=7, n_gaps=20, n_swings=20)
+    for symbol, df in market.bars.items():
+        assert (df['High'] >= df[['Open', 'Close']].max(axis=1)).all()
+        assert (df['Low'] <= df[['Open', 'Close']].min(axis=1)).all()
+
+        fvg_detector = FVGDetector(min_gap_size=0.01, volume_threshold=1.5)
+        found = []
+        for i, row in enumerate(df.itertuples()):
+            for fvg in fvg_detector.on_bar(row.Index, row.Open, row.High, row.Low, row.Close, row.Volume):
+                found.append((i, fvg.direction, fvg.lower_price, fvg.upper_price))
+
+        truth = market.gaps[market.gaps['symbol'] == symbol]
+        assert found == list(zip(truth['bar'], truth['direction'], truth['lower_price'], truth['upper_price']))
+
+        structure_analyzer = StructureAnalyzer()
+        swings = market.swings[market.swings['symbol'] == symbol]
+        swing_highs = set(np.flatnonzero(structure_analyzer.swing_highs(df['High'].to_numpy())))
+        swing_lows = set(np.flatnonzero(structure_analyzer.swing_lows(df['Low'].to_numpy())))
+        assert set(swings.loc[swings['kind'] == 'high', 'bar']) <= swing_highs
+        assert set(swings.loc[swings['kind'] == 'low', 'bar']) <= swing_lows
+
+def test_synthetic_market_is_deterministic_per_symbol():
+    generator = SyntheticMarketGenerator(2000, seed=1, volume_profile='flat', n_gaps=5, n_swings=5)
+    first = generator.generate(['AAPL', 'MSFT'])
+    second = generator.generate(['MSFT'])
+    assert first.bars['MSFT'].equals(second.bars['MSFT'])
+    assert not first.bars['AAPL'].equals(first.bars['MSFT'])
+    assert first.to_panel()['AAPL'].equals(first.bars['AAPL'])
+
+def test_timeframe_bars_match_resample_across_dst():
+    df = SyntheticMarketGenerator(4000, start='2024-03-05', n_gaps=5, n_swings=5).generate_symbol('AAPL')[0]
+    df.index = df.index.tz_localize('UTC').tz_convert('America/New_York')
+    bars = MultiTimeframeBars(('15m', '1h', '1d'), capacity=4000)
+    bars.extend(df)
+
+    for timeframe, rule in (('15m', '15min'), ('1h', '1h'), ('1d', '1D')):
+        expected = df.resample(rule).agg({'Open': 'first', 'High': 'max', 'Low': 'min',
+                                          'Close': 'last', 'Volume': 'sum'}).dropna()
+        pd.testing.assert_frame_equal(bars.frame(timeframe), expected,
+                                      check_freq=False, check_index_type=False)
+
+def test_timeframe_aggregator_revises_forming_bar(sample_price_data):
+    aggregator = TimeframeAggregator('15m', capacity=10)
+    aggregator.extend(sample_price_data.iloc[:4])
+    assert len(aggregator) == 2
+    assert len(aggregator.window(include_forming=False)) == 1
+
+    revised = sample_price_data.iloc[[3]].copy()
+    revised['High'] += 10.0
+    revised['Volume'] = 1.0
+    aggregator.extend(revised)
+    aggregator.extend(sample_price_data.iloc[[2]])  # Older than the latest bar: ignored
+
+    forming = aggregator.window(1).to_frame().iloc[0]
+    assert forming['High'] == revised['High'].iloc[0]
+    assert forming['Volume'] == 1.0
+    assert aggregator.update(sample_price_data.index[6].value, *sample_price_data.iloc[6]) is True
+    assert len(aggregator) == 3
+
+def test_analyzers_run_on_aggregated_bars():
+    df = SyntheticMarketGenerator(2000, n_gaps=5, n_swings=5).generate_symbol('AAPL')[0]
+    bars = MultiTimeframeBars(('1h',), capacity=500)
+    bars.extend(df)
+    hourly = bars.frame('1h', include_forming=False)
+
+    assert len(hourly) == len(df) // 12
+    FVGDetector(min_gap_size=0.01, volume_threshold=1.5).find_fvg(hourly)
+    assert len(StructureAnalyzer().find_support_resistance(hourly)) == 2
+
+def test_journal_batches_writes_and_skips_snapshotted_events(tmp_path):
+    journal = StateJournal(tmp_path, batch_size=3, flush_interval=60, fsync=False, snapshot_every=4)
+    journal.append('bar', symbol='AAPL', price=1.0)
+    journal.append('bar', symbol='AAPL', price=2.0)
+    assert journal.journal_path.read_text() == ''
+    journal.append('bar', symbol='AAPL', price=3.0)
+    assert len(journal.journal_path.read_text().splitlines()) == 3
+    journal.append('trade_open', durable=True, symbol='AAPL', price=4.0)
+    assert len(journal.journal_path.read_text().splitlines()) == 4
+    assert journal.should_snapshot()
+
+    journal.write_snapshot({'prices': [1.0, 2.0, 3.0, 4.0]})
+    journal.append('bar', symbol='AAPL', price=5.0)
+    journal.close()
+    # A crash mid-write leaves a torn last line
+    with open(journal.journal_path, 'a') as f:
+        f.write('{"seq":6,"kind":"ba')
+
+    reopened = StateJournal(tmp_path, fsync=False)
+    state, events = reopened.load()
+    assert state == {'prices': [1.0, 2.0, 3.0, 4.0]}
+    assert [(event['seq'], event['price']) for event in events] == [(5, 5.0)]
+    assert reopened.append('bar', symbol='AAPL', price=6.0) == 6
+    assert [event['price'] for event in reopened.load()[1]] == [5.0, 6.0]
+
+def test_journal_deferred_appends_wait_for_flush_due(tmp_path):
+    journal = StateJournal(tmp_path, batch_size=2, flush_interval=60, fsync=False)
+    for price in (1.0, 2.0, 3.0):
+        journal.append('bar', defer=True, symbol='AAPL', price=price)
+    assert journal.journal_path.read_text() == ''
+    assert journal.due()
+    assert journal.flush_due()
+    assert len(journal.journal_path.read_text().splitlines()) == 3
+    assert not journal.flush_due()
+
+    journal.append('trade_open', durable=True, defer=True, symbol='AAPL', price=4.0)
+    assert journal.journal_path.read_text().count('\n') == 3
+    assert journal.flush_due()
+    assert [event['kind'] for event in journal.load()[1]][-1] == 'trade_open'
+
+def test_journal_snapshot_of_earlier_copy_keeps_later_events(tmp_path):
+    journal = StateJournal(tmp_path, batch_size=1, fsync=False)
+    journal.append('bar', symbol='AAPL', price=1.0)
+    state, seq = {'prices': [1.0]}, journal.seq
+    journal.append('bar', symbol='AAPL', price=2.0)  # Appended after the copy was taken
+    journal.append('bar', defer=True, symbol='AAPL', price=3.0)
+    journal.write_snapshot(state, seq)
+    journal.close()
+
+    reopened = StateJournal(tmp_path, fsync=False)
+    loaded, events = reopened.load()
+    assert loaded == state
+    assert [event['price'] for event in events] == [2.0, 3.0]
+    assert reopened.events_since_snapshot == 2
+
+def test_histogram_buckets_and_quantiles():
+    histogram = Histogram(bounds=(0.1, 1.0, 10.0))
+    for value in (0.05, 0.1, 0.5, 0.5, 5.0, 50.0):
+        histogram.observe(value)
+    assert histogram.cumulative() == [(0.1, 2), (1.0, 4), (10.0, 5), (float('inf'), 6)]
+    assert histogram.count == 6 and histogram.sum == pytest.approx(56.15)
+    assert 0.1 <= histogram.quantile(0.5) <= 1.0
+
+def test_metrics_registry_exports():
+    metrics = MetricsRegistry()
+    metrics.describe('stage_seconds', 'histogram', 'Stage latency', buckets=(0.01, 0.1))
+    metrics.observe('stage_seconds', 0.05, symbol='AAPL', stage='fetch')
+    metrics.inc('signals_total', symbol='AAPL', direction='bullish')
+    metrics.inc('signals_total', symbol='AAPL', direction='bullish')
+    metrics.set('bar_lag_seconds', 3.5, symbol='say "hi"')
+    with metrics.time('stage_seconds', symbol='AAPL', stage='structure'):
+        pass
+
+    text = metrics.to_prometheus()
+    assert '# TYPE stage_seconds histogram' in text
+    assert 'stage_seconds_bucket{stage="fetch",symbol="AAPL",le="0.1"} 1' in text
+    assert 'stage_seconds_count{stage="structure",symbol="AAPL"} 1' in text
+    assert 'signals_total{direction="bullish",symbol="AAPL"} 2.0' in text
+    assert 'bar_lag_seconds{symbol="say \\"hi\\""} 3.5' in text
+
+    snapshot = json.loads(metrics.to_json())
+    assert snapshot['stage_seconds']['samples'][0]['count'] == 1
+    assert snapshot['signals_total']['samples'][0]['value'] == 2.0
+
+    with pytest.raises(ValueError):
+        metrics.inc('stage_seconds')
+
+    disabled = MetricsRegistry(enabled=False)
+    with disabled.time('stage_seconds', stage='fetch'):
+        disabled.inc('signals_total')
+    assert disabled.to_dict() == {}
+
+@pytest.mark.asyncio
+async def test_event_loop_lag_monitor_sees_blocking():
+    metrics = MetricsRegistry()
+    monitor = EventLoopLagMonitor(metrics, interval=0.01)
+    monitor.start()
+    await asyncio.sleep(0)
+    time.sleep(0.1)  # Block the loop past the monitor's wake-up
+    await asyncio.sleep(0.005)
+    monitor.stop()
+    assert metrics.value('event_loop_lag_seconds') >= 0.05
+
+def test_metrics_registry_records_from_threads_while_exporting():
+    registry = MetricsRegistry()
+    stop = threading.Event()
+
+    def record(worker):
+        for i in range(2000):
+            registry.inc('entries_total', symbol=f'S{worker}')
+            registry.set('bar_lag_seconds', i, symbol=f'S{worker}-{i % 50}')
+            with registry.time('stage_seconds', stage='detection', symbol=f'S{i % 20}'):
+                pass
+
+    def export():
+        while not stop.is_set():
+            registry.to_prometheus()
+            registry.to_dict()
+
+    exporter = threading.Thread(target=export)
+    exporter.start()
+    workers = [threading.Thread(target=record, args=(worker,)) for worker in range(4)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    stop.set()
+    exporter.join()
+
+    assert [registry.value('entries_total', symbol=f'S{worker}') for worker in range(4)] == [2000.0] * 4
+    assert sum(registry.value('stage_seconds', stage='detection', symbol=f'S{k}').count
+               for k in range(20)) == 8000
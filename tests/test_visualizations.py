@@ -1,5 +1,6 @@
-from ..visualization.performance_viz import PerformanceVisualizer
+from ..visualization.performance_viz import PerformanceVisualizer, minmax_downsample
 import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
 
 def test_visualizer_initialization(sample_price_data, tmp_path):
@@ -23,5 +24,34 @@ def test_visualizer_initialization(sample_price_data, tmp_path):
     # Test save functionality
     output_dir = tmp_path / "test_output"
     output_dir.mkdir()
-    visualizer.save_all_plots(str(output_dir))
+    paths = visualizer.save_all_plots(str(output_dir))
     assert (output_dir / "equity_curve.png").exists()
+    assert all((output_dir / f"{name}.png").exists() for name in paths)
+
+def test_minmax_downsample_keeps_extremes():
+    values = np.sin(np.linspace(0, 20, 100000)) + np.random.default_rng(0).normal(0, 0.01, 100000)
+    keep = minmax_downsample(values, 1000)
+    assert len(keep) <= 1002
+    assert np.all(np.diff(keep) > 0)
+    assert {0, len(values) - 1, values.argmin(), values.argmax()} <= set(keep)
+    assert len(minmax_downsample(values[:500], 1000)) == 500
+
+def test_price_chart_batches_trades(sample_price_data):
+    times = sample_price_data.index
+    trades_df = pd.DataFrame({
+        'entry_time': times[[10, 30, 50]],
+        'exit_time': times[[20, 40, 60]],
+        'entry_price': [100.0, 101.0, 102.0],
+        'exit_price': [101.0, 100.0, 103.0],
+        'direction': ['bullish', 'bearish', 'bullish'],
+        'size': [100] * 3,
+        'pnl': [100.0, 100.0, 100.0]
+    })
+
+    fig = PerformanceVisualizer(trades_df, sample_price_data, max_points=20).plot_price_with_trades()
+    ax = fig.axes[0]
+    assert len(ax.lines) == 1
+    assert len(ax.lines[0].get_xdata()) <= 22
+    assert len(ax.collections) == 4  # Bullish and bearish entries, exits, connectors
+    assert len(ax.collections[3].get_segments()) == 3
+    plt.close(fig)
@@ -0,0 +1,172 @@
+# fvg_trading_bot/trading/pipeline.py
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from itertools import count
+from typing import Callable, Dict, List, Optional, Set
+import asyncio
+import time
+from models.fair_value_gap import FairValueGap
+from utils.logger import get_logger
+from utils.ring_buffer import BarWindow
+
+logger = get_logger(__name__)
+
+EXIT_CHECK = 0  # Order events are served in priority order: exits first
+ENTRY = 1
+
+@dataclass(order=True)
+class OrderEvent:
+    """Work for the order stage, ordered by priority then arrival"""
+    priority: int
+    seq: int
+    symbol: str = field(compare=False)
+    price: float = field(compare=False)
+    bar_time: int = field(compare=False)  # Newest bar the event was computed from (ns)
+    entry_fvgs: List[FairValueGap] = field(default_factory=list, compare=False)
+
+class TradingPipeline:
+    """
+    Three-stage live pipeline: ingestion, analysis and order management.
+
+    ingest() hands each fetched bar window to a bounded analysis queue and,
+    for symbols holding a trade, sends an exit check straight to the order
+    stage so it never waits behind gap detection. Analysis workers run
+    TradingBot.find_entries on a thread pool, one window per symbol at a
+    time. A window that arrives while an older one for the same symbol is
+    still queued replaces it, and windows older than max_bar_age are
+    dropped. The single order task owns active_trades, serving exit checks
+    before entries and discarding entries computed from superseded bars.
+    A full queue makes ingest() wait, which pushes back on the fetcher.
+    """
+
+    def __init__(self, trading_bot, account_size: float, analysis_workers: int = 2,
+                 queue_size: int = 256, max_bar_age: Optional[float] = None,
+                 clock: Callable[[], float] = time.time):
+        self.trading_bot = trading_bot
+        self.account_size = account_size
+        self.analysis_workers = analysis_workers
+        self.queue_size = queue_size
+        self.max_bar_age = max_bar_age  # Seconds after which a window is too old to analyse
+        self.clock = clock
+        self._seq = count()
+        self._pending: Dict[str, BarWindow] = {}  # Newest unanalysed window per symbol
+        self._scheduled: Set[str] = set()  # Symbols queued for or under analysis
+        self._latest: Dict[str, int] = {}  # Newest ingested bar per symbol (ns)
+        self._tasks: List[asyncio.Task] = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._analysis_queue: Optional[asyncio.Queue] = None
+        self._order_queue: Optional[asyncio.PriorityQueue] = None
+
+        trading_bot.metrics.describe('pipeline_dropped_total', 'counter',
+                                     'Bar windows and signals dropped as stale, by reason')
+        trading_bot.metrics.describe('pipeline_queue_depth', 'gauge', 'Items waiting in each pipeline queue')
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self) -> None:
+        """Start the analysis workers and the order task on the running loop"""
+        if self.running:
+            return
+        self._analysis_queue = asyncio.Queue(maxsize=self.queue_size)
+        self._order_queue = asyncio.PriorityQueue(maxsize=self.queue_size)
+        self._executor = ThreadPoolExecutor(max_workers=self.analysis_workers,
+                                            thread_name_prefix='analysis')
+        self._tasks = [asyncio.ensure_future(self._analysis_worker())
+                       for _ in range(self.analysis_workers)]
+        self._tasks.append(asyncio.ensure_future(self._order_worker()))
+
+    async def stop(self) -> None:
+        """Cancel the stage tasks; queued work is discarded"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self._pending.clear()
+        self._scheduled.clear()
+
+    async def join(self) -> None:
+        """Wait until every ingested window has been analysed and every order event handled"""
+        await self._analysis_queue.join()
+        await self._order_queue.join()
+
+    async def ingest(self, symbol: str, bars: BarWindow) -> None:
+        """Queue a symbol's latest bars; exits are checked ahead of any analysis"""
+        if len(bars) == 0:
+            return
+        # Copy so later fetches into the ring buffer cannot change bars under a worker thread
+        bars = bars.copy()
+        bar_time = int(bars.timestamps[-1])
+        self._latest[symbol] = bar_time
+
+        if symbol in self.trading_bot.active_trades:
+            await self._order_queue.put(OrderEvent(EXIT_CHECK, next(self._seq), symbol,
+                                                   float(bars.close[-1]), bar_time))
+
+        if symbol in self._pending:
+            self._drop(symbol, 'superseded')
+        self._pending[symbol] = bars
+        if symbol not in self._scheduled:
+            self._scheduled.add(symbol)
+            await self._analysis_queue.put(symbol)
+        self._report_depth()
+
+    async def _analysis_worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        bot = self.trading_bot
+        while True:
+            symbol = await self._analysis_queue.get()
+            try:
+                # Keep analysing while newer windows for this symbol arrive
+                while symbol in self._pending:
+                    bars = self._pending.pop(symbol)
+                    bar_time = int(bars.timestamps[-1])
+                    if self.max_bar_age is not None and self.clock() - bar_time / 1e9 > self.max_bar_age:
+                        self._drop(symbol, 'expired')
+                        continue
+                    try:
+                        entry_fvgs = await loop.run_in_executor(self._executor, bot.find_entries,
+                                                                symbol, bars)
+                    except Exception as e:
+                        logger.error(f"Error analysing {symbol}: {str(e)}")
+                        bot.metrics.inc('errors_total', symbol=symbol, stage='analysis')
+                        continue
+                    await self._order_queue.put(OrderEvent(ENTRY, next(self._seq), symbol,
+                                                           float(bars.close[-1]), bar_time, entry_fvgs))
+            finally:
+                self._scheduled.discard(symbol)
+                self._analysis_queue.task_done()
+                self._report_depth()
+
+    async def _order_worker(self) -> None:
+        bot = self.trading_bot
+        while True:
+            event = await self._order_queue.get()
+            try:
+                if event.priority == EXIT_CHECK:
+                    bot.check_exit(event.symbol, event.price)
+                elif event.bar_time < self._latest.get(event.symbol, event.bar_time):
+                    self._drop(event.symbol, 'stale_signal')
+                else:
+                    with bot.metrics.time('stage_seconds', symbol=event.symbol, stage='decision'):
+                        bot.open_trades(event.symbol, event.entry_fvgs, event.price, self.account_size)
+                        bot.check_exit(event.symbol, event.price)
+                # Trade events reach the disk before the next order event is served
+                await bot.sync_journal()
+            except Exception as e:
+                logger.error(f"Error managing orders for {event.symbol}: {str(e)}")
+                bot.metrics.inc('errors_total', symbol=event.symbol, stage='orders')
+            finally:
+                self._order_queue.task_done()
+
+    def _drop(self, symbol: str, reason: str) -> None:
+        self.trading_bot.metrics.inc('pipeline_dropped_total', symbol=symbol, reason=reason)
+
+    def _report_depth(self) -> None:
+        metrics = self.trading_bot.metrics
+        metrics.set('pipeline_queue_depth', self._analysis_queue.qsize(), queue='analysis')
+        metrics.set('pipeline_queue_depth', self._order_queue.qsize(), queue='orders')
@@ -0,0 +1,123 @@
+# fvg_trading_bot/trading/scheduler.py
+from typing import Callable, Dict, List, Optional
+import asyncio
+import math
+import random
+import time
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+class BarScheduler:
+    """
+    Single clock that drives the trading bot on bar closes.
+
+    The scheduler sleeps until the next bar boundary plus settle_delay (so
+    the provider has published the closed bar) and a random jitter, then
+    runs one pass over every symbol whose bar interval divides that
+    boundary. Symbols holding open trades are fetched and processed first,
+    in their own batched request. With a pipeline, fetched windows are
+    handed to it instead of being processed inline. A pass still running when the next
+    boundary arrives does not queue: the missed boundaries are skipped,
+    logged and counted.
+    """
+
+    def __init__(self, trading_bot, bar_interval: float = 300, settle_delay: float = 2.0,
+                 jitter: float = 1.0, symbol_intervals: Optional[Dict[str, float]] = None,
+                 clock: Callable[[], float] = time.time, sleep: Callable = asyncio.sleep,
+                 seed: Optional[int] = None, pipeline=None):
+        self.trading_bot = trading_bot
+        self.pipeline = pipeline  # Optional TradingPipeline that takes over analysis and orders
+        self.bar_interval = bar_interval  # Seconds per bar
+        self.settle_delay = settle_delay  # Seconds to wait after a close before fetching
+        self.jitter = jitter  # Upper bound of the random extra delay in seconds
+        self.symbol_intervals = dict(symbol_intervals or {})  # Symbols on slower bars than bar_interval
+        self.clock = clock
+        self.sleep = sleep
+        self._random = random.Random(seed)
+        self.cycles = 0
+        self.skipped_cycles = 0
+
+        metrics = trading_bot.metrics
+        metrics.describe('scheduler_skipped_cycles_total', 'counter',
+                         'Bar boundaries skipped because the previous pass overran')
+        metrics.describe('decision_latency_seconds', 'histogram',
+                         'Seconds from bar close until a symbol group has been processed or queued')
+
+    def next_boundary(self, now: float) -> float:
+        """First bar close strictly after now"""
+        return (math.floor(now / self.bar_interval) + 1) * self.bar_interval
+
+    def due_symbols(self, boundary: float) -> List[str]:
+        """Symbols whose bar closes at boundary, those holding open trades first"""
+        due = [symbol for symbol in self.trading_bot.symbols
+               if self._closes_at(symbol, boundary)]
+        active_trades = self.trading_bot.active_trades
+        return ([symbol for symbol in due if symbol in active_trades] +
+                [symbol for symbol in due if symbol not in active_trades])
+
+    async def run(self, account_size: float, max_cycles: Optional[int] = None) -> None:
+        """Run a pass at every bar close, forever or for max_cycles passes"""
+        boundary = self.next_boundary(self.clock())
+        while max_cycles is None or self.cycles < max_cycles:
+            delay = boundary + self.settle_delay + self._random.uniform(0, self.jitter) - self.clock()
+            if delay > 0:
+                await self.sleep(delay)
+
+            await self.run_cycle(account_size, boundary)
+            self.cycles += 1
+
+            # Resume at the first boundary still ahead rather than replaying missed ones
+            next_boundary = self.next_boundary(max(self.clock() - self.settle_delay, boundary))
+            missed = int(round((next_boundary - boundary) / self.bar_interval)) - 1
+            if missed > 0:
+                self.skipped_cycles += missed
+                self.trading_bot.metrics.inc('cycle_overruns_total')
+                self.trading_bot.metrics.inc('scheduler_skipped_cycles_total', missed)
+                logger.warning(f"Pass for the {self._format(boundary)} close overran; "
+                               f"skipping {missed} bar close(s)")
+            boundary = next_boundary
+
+    async def run_cycle(self, account_size: float, boundary: float) -> None:
+        """Fetch and process every symbol due at boundary, open positions first"""
+        bot = self.trading_bot
+        due = self.due_symbols(boundary)
+        priority = [symbol for symbol in due if symbol in bot.active_trades]
+        rest = due[len(priority):]
+
+        with bot.metrics.time('cycle_seconds'):
+            for group, symbols in (('open_trades', priority), ('scan', rest)):
+                if not symbols:
+                    continue
+                try:
+                    frames = await bot.fetch_batch(symbols)
+                except Exception as e:
+                    logger.error(f"Error fetching market data: {str(e)}")
+                    bot.metrics.inc('errors_total', stage='fetch')
+                    continue
+
+                for symbol in symbols:
+                    if symbol not in frames:
+                        continue
+                    if self.pipeline is not None:
+                        await self.pipeline.ingest(symbol, frames[symbol])
+                        continue
+                    try:
+                        bot.process_symbol(symbol, frames[symbol], account_size)
+                    except Exception as e:
+                        logger.error(f"Error monitoring {symbol}: {str(e)}")
+                        bot.metrics.inc('errors_total', symbol=symbol, stage='process')
+                await bot.sync_journal()
+                bot.metrics.observe('decision_latency_seconds', self.clock() - boundary, group=group)
+
+        # Snapshot between passes once the journal has grown, else write out due events; both off the loop
+        await bot.checkpoint_async()
+
+    def _closes_at(self, symbol: str, boundary: float) -> bool:
+        interval = self.symbol_intervals.get(symbol, self.bar_interval)
+        bars = boundary / interval
+        return abs(bars - round(bars)) < 1e-9
+
+    @staticmethod
+    def _format(timestamp: float) -> str:
+        return time.strftime('%H:%M:%S', time.gmtime(timestamp))
@@ -1,32 +1,217 @@
 # fvg_trading_bot/trading/trading_bot.py
-from typing import List, Dict
+from contextlib import ExitStack
+from copy import copy
+from functools import partial
+from typing import Callable, List, Dict, Optional, Sequence, Tuple
 import asyncio
-import yfinance as yf
+import threading
+import time
+import numpy as np
 import pandas as pd
 from datetime import datetime
 from models.trade import Trade
 from models.fair_value_gap import FairValueGap
 from analyzers.structure_analyzer import StructureAnalyzer
 from analyzers.fvg_detector import FVGDetector
+from data.sources import DataSource, YFinanceSource
+from utils.journal import StateJournal
 from utils.logger import get_logger
+from utils.metrics import EventLoopLagMonitor, MetricsRegistry
+from trading.scheduler import BarScheduler
+from trading.pipeline import TradingPipeline
+from utils.ring_buffer import BarRingBuffer, BarWindow
+from utils.timeframes import MultiTimeframeBars
 
 logger = get_logger(__name__)
 
+def _encode_time(timestamp) -> List:
+    """[UTC nanoseconds, time zone name or None] for a journal event"""
+    timestamp = pd.Timestamp(timestamp)
+    return [timestamp.value, None if timestamp.tz is None else str(timestamp.tz)]
+
+def _decode_time(value: List) -> pd.Timestamp:
+    nanoseconds, tz = value
+    if tz is None:
+        return pd.Timestamp(nanoseconds)
+    return pd.Timestamp(nanoseconds, tz='UTC').tz_convert(tz)
+
 class TradingBot:
     def __init__(self, symbols: List[str], min_gap_size: float = 0.01, 
-                 volume_threshold: float = 1.5, risk_per_trade: float = 0.02):
+                 volume_threshold: float = 1.5, risk_per_trade: float = 0.02,
+                 data_source: Optional[DataSource] = None, poll_interval: float = 60,
+                 batch_size: int = 50, max_concurrent_requests: int = 4,
+                 max_retries: int = 3, retry_backoff: float = 1.0, history_bars: int = 200,
+                 metrics: Optional[MetricsRegistry] = None, timeframes: Sequence[str] = (),
+                 journal: Optional[StateJournal] = None):
         self.symbols = symbols
+        self.data_source = data_source if data_source is not None else YFinanceSource()
+        self.poll_interval = poll_interval  # Seconds between polling cycles
+        self.batch_size = batch_size  # Symbols per bulk data request
+        self.max_concurrent_requests = max_concurrent_requests
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff  # First retry delay in seconds, doubled each attempt
+        self.history_bars = history_bars  # Bars kept per symbol and handed to the analyzers
+        self.bar_buffers: Dict[str, BarRingBuffer] = {}
+        self.timeframes = tuple(timeframes)  # Higher timeframes aggregated from the 5-minute bars
+        self.timeframe_bars: Dict[str, MultiTimeframeBars] = {}
         self.fvg_detector = FVGDetector(min_gap_size, volume_threshold)
+        # Live monitoring streams each symbol's bars through its own detector
+        self.symbol_detectors: Dict[str, FVGDetector] = {
+            symbol: FVGDetector(min_gap_size, volume_threshold) for symbol in symbols
+        }
+        self.last_bar_time: Dict[str, int] = {}  # Newest closed bar fed to each detector (ns)
         self.structure_analyzer = StructureAnalyzer()
         self.risk_per_trade = risk_per_trade
         self.active_trades: Dict[str, Trade] = {}
         self.pending_fvgs: Dict[str, List[FairValueGap]] = {symbol: [] for symbol in symbols}
+        self.metrics = metrics if metrics is not None else MetricsRegistry()
+        self._describe_metrics()
+        self.loop_lag_monitor = EventLoopLagMonitor(self.metrics)
+        self.journal = journal  # Records gaps, mitigations and trades so restore() survives restarts
+        # Keep snapshots consistent with analysis threads; only taken when journaling
+        self._symbol_locks = {symbol: threading.Lock() for symbol in symbols}
+        self._restored = False
+
+    def __getstate__(self) -> Dict:
+        # Copies sent to backtest workers leave the live journal and the locks behind
+        state = self.__dict__.copy()
+        state['journal'] = None
+        del state['_symbol_locks']
+        return state
+
+    def __setstate__(self, state: Dict) -> None:
+        self.__dict__.update(state)
+        self._symbol_locks = {symbol: threading.Lock() for symbol in self.symbol_detectors}
+
+    def strategy_copy(self) -> 'TradingBot':
+        """Copy with the bot's detector, analyzer and risk settings but no symbols or live state
+
+        Its size does not grow with the number of symbols, so it is cheap to
+        send to backtest worker processes.
+        """
+        bot = copy(self)
+        bot.symbols = []
+        bot.bar_buffers = {}
+        bot.timeframe_bars = {}
+        bot.symbol_detectors = {}
+        bot.last_bar_time = {}
+        bot.active_trades = {}
+        bot.pending_fvgs = {}
+        bot._symbol_locks = {}
+        bot.metrics = MetricsRegistry(enabled=self.metrics.enabled)
+        bot._describe_metrics()
+        bot.loop_lag_monitor = EventLoopLagMonitor(bot.metrics)
+        return bot
+
+    def _describe_metrics(self) -> None:
+        describe = self.metrics.describe
+        describe('stage_seconds', 'histogram',
+                 'Seconds spent per symbol in each stage: fetch, structure, detection, signal, decision')
+        describe('cycle_seconds', 'histogram', 'Seconds per polling cycle')
+        describe('cycle_overruns_total', 'counter', 'Passes that ran past the next scheduled cycle')
+        describe('bar_lag_seconds', 'gauge',
+                 "Seconds between the newest bar's timestamp and its processing (time-zone-aware bars only)")
+        describe('signals_total', 'counter', 'Trades entered')
+        describe('trades_closed_total', 'counter', 'Trades closed at stop loss or take profit')
+        describe('fetch_retries_total', 'counter', 'Fetch attempts that failed and were retried')
+        describe('errors_total', 'counter', 'Errors by stage')
+
+    async def fetch_data(self, symbol: str) -> BarWindow:
+        """Fetch new 5-minute bars without blocking the event loop and return the symbol's window"""
+        with self.metrics.time('stage_seconds', symbol=symbol, stage='fetch'):
+            df = await self._fetch_with_retry(
+                partial(self.data_source.history, symbol, **self._request_kwargs([symbol])), symbol)
+        return self.merge_bars(symbol, df)
+
+    async def fetch_batch(self, symbols: List[str]) -> Dict[str, BarWindow]:
+        """Fetch new bars for many symbols in bulk requests of batch_size symbols
+
+        Requests run in the default thread pool, at most max_concurrent_requests
+        at a time. A batch that still fails after its retries is logged and skipped.
+        Returns each symbol's merged bar window.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+
+        async def fetch_chunk(chunk: List[str]) -> Dict[str, pd.DataFrame]:
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    return await self._fetch_with_retry(
+                        partial(self.data_source.history_many, chunk, **self._request_kwargs(chunk)),
+                        ', '.join(chunk))
+                except Exception as e:
+                    logger.error(f"Error fetching {', '.join(chunk)}: {str(e)}")
+                    for symbol in chunk:
+                        self.metrics.inc('errors_total', symbol=symbol, stage='fetch')
+                    return {}
+                finally:
+                    # Every symbol in a bulk request waits for the whole request
+                    elapsed = time.perf_counter() - start
+                    for symbol in chunk:
+                        self.metrics.observe('stage_seconds', elapsed, symbol=symbol, stage='fetch')
+
+        # Symbols with history only need a delta; batch them apart from first-time fetches
+        known = [symbol for symbol in symbols if self._last_timestamp(symbol) is not None]
+        fresh = [symbol for symbol in symbols if self._last_timestamp(symbol) is None]
+        chunks = [group[i:i + self.batch_size]
+                  for group in (known, fresh) for i in range(0, len(group), self.batch_size)]
+
+        frames = {}
+        for result in await asyncio.gather(*(fetch_chunk(chunk) for chunk in chunks)):
+            for symbol, df in result.items():
+                frames[symbol] = self.merge_bars(symbol, df)
+        return frames
+
+    def _last_timestamp(self, symbol: str) -> Optional[pd.Timestamp]:
+        buffer = self.bar_buffers.get(symbol)
+        if buffer is None or len(buffer) == 0:
+            return None
+        return buffer.window(1).timestamp(0)
 
-    async def fetch_data(self, symbol: str) -> pd.DataFrame:
-        """Fetch historical data from yfinance"""
-        ticker = yf.Ticker(symbol)
-        df = ticker.history(period='1d', interval='5m')
-        return df
+    def _request_kwargs(self, symbols: List[str]) -> Dict:
+        """Request bars from the oldest last-held bar of these symbols, or today's bars on first fetch"""
+        starts = [self._last_timestamp(symbol) for symbol in symbols]
+        if any(start is None for start in starts):
+            return {'period': '1d', 'interval': '5m'}
+        return {'start': min(starts), 'interval': '5m'}
+
+    def merge_bars(self, symbol: str, new_bars: pd.DataFrame) -> BarWindow:
+        """Merge fetched bars into the symbol's ring buffer and return a view of its window"""
+        buffer = self.bar_buffers.get(symbol)
+        if buffer is None:
+            buffer = self.bar_buffers[symbol] = BarRingBuffer(self.history_bars)
+
+        if len(new_bars) > 0:
+            # Refetched bars, including the one still forming, replace the copies we hold
+            buffer.truncate_from(pd.DatetimeIndex(new_bars.index[:1]).as_unit('ns').asi8[0])
+            buffer.extend(new_bars)
+            if self.timeframes:
+                self._aggregate(symbol, new_bars)
+        return buffer.window()
+
+    def _aggregate(self, symbol: str, new_bars: pd.DataFrame) -> None:
+        bars = self.timeframe_bars.get(symbol)
+        if bars is None:
+            bars = self.timeframe_bars[symbol] = MultiTimeframeBars(self.timeframes, self.history_bars)
+        bars.extend(new_bars)
+
+    def timeframe_frame(self, symbol: str, timeframe: str, include_forming: bool = True) -> pd.DataFrame:
+        """A symbol's bars on a higher timeframe, built from the fetched 5-minute bars"""
+        return self.timeframe_bars[symbol].frame(timeframe, include_forming)
+
+    async def _fetch_with_retry(self, fetch: Callable, description: str):
+        """Run a blocking fetch in a worker thread, retrying with exponential backoff"""
+        loop = asyncio.get_running_loop()
+        for attempt in range(self.max_retries + 1):
+            try:
+                return await loop.run_in_executor(None, fetch)
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+                self.metrics.inc('fetch_retries_total')
+                delay = self.retry_backoff * 2 ** attempt
+                logger.warning(f"Fetch failed for {description} ({str(e)}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
 
     def calculate_position_size(self, entry_price: float, stop_loss: float, 
                               account_size: float) -> float:
@@ -35,85 +220,290 @@ class TradingBot:
         risk_per_share = abs(entry_price - stop_loss)
         return risk_amount / risk_per_share
 
+    def update_fvgs(self, symbol: str, bars: BarWindow, current_price: float) -> List[FairValueGap]:
+        """Stream newly closed bars into the symbol's detector and return its unmitigated FVGs"""
+        detector = self.symbol_detectors[symbol]
+        journal = self.journal
+        closed = len(bars) - 1  # The last bar is still forming
+        first = 0
+        last_time = self.last_bar_time.get(symbol)
+        if last_time is not None:
+            first = int(np.searchsorted(bars.timestamps[:closed], last_time, side='right'))
+
+        if journal is None:
+            for i in range(first, closed):
+                detector.on_bar(bars.timestamp(i), bars.open[i], bars.high[i], bars.low[i],
+                                bars.close[i], bars.volume[i])
+            if closed > first:
+                self.last_bar_time[symbol] = int(bars.timestamps[closed - 1])
+            detector.update_fvg_status(current_price)
+            return detector.active_fvgs
+
+        # Events are only buffered under the lock; the disk write happens after it is released
+        with self._symbol_locks[symbol]:
+            for i in range(first, closed):
+                # Journal in the order replay applies: mitigation, bar, new gaps
+                self._journal_mitigation(symbol, detector.update_fvg_status(bars.close[i]), bars.close[i])
+                timestamp = bars.timestamp(i)
+                new_fvgs = detector.on_bar(timestamp, bars.open[i], bars.high[i], bars.low[i],
+                                           bars.close[i], bars.volume[i])
+                journal.append('bar', defer=True, symbol=symbol, time=_encode_time(timestamp),
+                               high=float(bars.high[i]), low=float(bars.low[i]), volume=float(bars.volume[i]))
+                for fvg in new_fvgs:
+                    journal.append('gap', defer=True, symbol=symbol, start_time=_encode_time(fvg.start_time),
+                                   end_time=_encode_time(fvg.end_time), upper_price=fvg.upper_price,
+                                   lower_price=fvg.lower_price, volume_weight=fvg.volume_weight,
+                                   direction=fvg.direction)
+            if closed > first:
+                self.last_bar_time[symbol] = int(bars.timestamps[closed - 1])
+
+            self._journal_mitigation(symbol, detector.update_fvg_status(current_price), current_price)
+            active_fvgs = detector.active_fvgs
+        journal.flush_due()
+        return active_fvgs
+
+    def _journal_mitigation(self, symbol: str, mitigated: List[FairValueGap], price: float) -> None:
+        if mitigated:
+            self.journal.append('mitigation', defer=True, symbol=symbol, price=float(price), gaps=len(mitigated))
+
+    def process_symbol(self, symbol: str, bars: BarWindow, account_size: float) -> None:
+        """Run analysis, entries and exit checks for one symbol on its latest bar window"""
+        if len(bars) == 0:
+            return
+        entry_fvgs = self.find_entries(symbol, bars)
+        current_price = bars.close[-1]
+        with self.metrics.time('stage_seconds', symbol=symbol, stage='decision'):
+            self.open_trades(symbol, entry_fvgs, current_price, account_size)
+            self.check_exit(symbol, current_price)
+
+    def find_entries(self, symbol: str, bars: BarWindow) -> List[FairValueGap]:
+        """Update the symbol's levels and FVGs and return the FVGs that confirm an entry
+
+        Only touches this symbol's detector, so different symbols can be
+        analysed concurrently; active_trades is left alone.
+        """
+        metrics = self.metrics
+        if bars.tz is not None:
+            # Naive timestamps are wall-clock times in an unknown zone, so their lag is unknown
+            metrics.set('bar_lag_seconds', time.time() - bars.timestamps[-1] / 1e9, symbol=symbol)
+
+        # Update structure levels
+        with metrics.time('stage_seconds', symbol=symbol, stage='structure'):
+            levels = self.structure_analyzer.index_levels(bars.high, bars.low)
+        
+        # Find new unmitigated FVGs
+        current_price = bars.close[-1]
+        with metrics.time('stage_seconds', symbol=symbol, stage='detection'):
+            unmitigated_fvgs = self.update_fvgs(symbol, bars, current_price)
+        self.pending_fvgs[symbol] = unmitigated_fvgs
+
+        # FVG zones containing the current price, confirmed by a break of structure
+        with metrics.time('stage_seconds', symbol=symbol, stage='signal'):
+            return [fvg for fvg in self.symbol_detectors[symbol].book.containing(current_price)
+                    if self.structure_analyzer.is_break_of_structure(current_price, levels, fvg.direction)]
+
+    def open_trades(self, symbol: str, entry_fvgs: List[FairValueGap], current_price: float,
+                    account_size: float) -> None:
+        """Enter a trade for each confirmed FVG; the last one becomes the symbol's active trade"""
+        for fvg in entry_fvgs:
+            # Calculate trade parameters
+            if fvg.direction == 'bullish':
+                entry_price = current_price
+                stop_loss = fvg.lower_price
+                take_profit = entry_price + (entry_price - stop_loss) * 2
+            else:
+                entry_price = current_price
+                stop_loss = fvg.upper_price
+                take_profit = entry_price - (stop_loss - entry_price) * 2
+            
+            # Calculate position size
+            size = self.calculate_position_size(
+                entry_price, stop_loss, account_size)
+            
+            # Create and execute trade
+            trade = Trade(
+                entry_price=entry_price,
+                stop_loss=stop_loss,
+                take_profit=take_profit,
+                direction=fvg.direction,
+                size=size,
+                symbol=symbol,
+                entry_time=datetime.now()
+            )
+            
+            self.active_trades[symbol] = trade
+            if self.journal is not None:
+                self.journal.append('trade_open', durable=True, defer=True, symbol=symbol, entry_price=entry_price,
+                                    stop_loss=stop_loss, take_profit=take_profit, direction=fvg.direction,
+                                    size=size, entry_time=trade.entry_time.isoformat())
+            self.metrics.inc('signals_total', symbol=symbol, direction=fvg.direction)
+            logger.info(f"Executed trade for {symbol}: {trade}")
+
+    def check_exit(self, symbol: str, current_price: float) -> bool:
+        """Close the symbol's active trade if price reached its stop loss or take profit"""
+        trade = self.active_trades.get(symbol)
+        if trade is None:
+            return False
+
+        # Check for stop loss or take profit
+        if trade.direction == 'bullish':
+            hit = current_price <= trade.stop_loss or current_price >= trade.take_profit
+        else:
+            hit = current_price >= trade.stop_loss or current_price <= trade.take_profit
+        if hit:
+            logger.info(f"Closing trade for {symbol}")
+            del self.active_trades[symbol]
+            if self.journal is not None:
+                self.journal.append('trade_close', durable=True, defer=True, symbol=symbol,
+                                    price=float(current_price))
+            self.metrics.inc('trades_closed_total', symbol=symbol)
+        return hit
+
+    def checkpoint(self, force: bool = False) -> bool:
+        """Snapshot the bot's state once the journal has grown enough (or when forced)
+
+        Without a snapshot, buffered events are still written once due, so
+        an event never waits much longer than the journal's flush_interval.
+        """
+        snapshot = self._copy_state(force)
+        if snapshot is None:
+            if self.journal is not None:
+                self.journal.flush_due()
+            return False
+        self.journal.write_snapshot(*snapshot)
+        return True
+
+    async def checkpoint_async(self, force: bool = False) -> bool:
+        """checkpoint() for the event loop: the state is copied here and written on a worker thread"""
+        snapshot = self._copy_state(force)
+        if snapshot is None:
+            await self.sync_journal()
+            return False
+        await asyncio.get_running_loop().run_in_executor(None, self.journal.write_snapshot, *snapshot)
+        return True
+
+    async def sync_journal(self) -> None:
+        """Write due journal events, such as trade entries and closes, on a worker thread"""
+        if self.journal is not None and self.journal.due():
+            await asyncio.get_running_loop().run_in_executor(None, self.journal.flush_due)
+
+    def _copy_state(self, force: bool) -> Optional[Tuple[Dict, int]]:
+        """A snapshot of the state and the last event it covers, or None when none is due"""
+        if self.journal is None or not (force or self.journal.should_snapshot()):
+            return None
+        # Analysis threads only hold these while updating memory, so the wait is short
+        with ExitStack() as stack:
+            for lock in self._symbol_locks.values():
+                stack.enter_context(lock)
+            return self._snapshot_state(), self.journal.seq
+
+    def restore(self) -> int:
+        """Rebuild trades, gaps and bar history from the journal; returns the events replayed
+
+        Loads the latest snapshot and replays the events after it, so the
+        next fetch only needs the bars that closed while the bot was down.
+        """
+        state, events = self.journal.load()
+        if state is not None:
+            for symbol, symbol_state in state['symbols'].items():
+                if symbol not in self.symbol_detectors:
+                    logger.warning(f"Ignoring saved state for unknown symbol {symbol}")
+                    continue
+                self.symbol_detectors[symbol].load_state(symbol_state['detector'])
+                if symbol_state['last_bar_time'] is not None:
+                    self.last_bar_time[symbol] = symbol_state['last_bar_time']
+                if symbol_state['active_trade'] is not None:
+                    self.active_trades[symbol] = symbol_state['active_trade']
+                if symbol_state['bars'] is not None:
+                    buffer = self.bar_buffers[symbol] = BarRingBuffer(self.history_bars)
+                    buffer.extend_window(symbol_state['bars'])
+
+        for event in events:
+            if event['symbol'] in self.symbol_detectors:
+                self._replay(event)
+        for symbol, detector in self.symbol_detectors.items():
+            self.pending_fvgs[symbol] = detector.active_fvgs
+        self._restored = True
+        logger.info(f"Restored {len(self.active_trades)} open trade(s), replaying {len(events)} journal event(s)")
+        return len(events)
+
+    def _snapshot_state(self) -> Dict:
+        symbols = {}
+        for symbol, detector in self.symbol_detectors.items():
+            buffer = self.bar_buffers.get(symbol)
+            symbols[symbol] = {
+                'detector': detector.state(),
+                'last_bar_time': self.last_bar_time.get(symbol),
+                'active_trade': self.active_trades.get(symbol),
+                'bars': buffer.window().copy() if buffer is not None else None
+            }
+        return {'symbols': symbols}
+
+    def _replay(self, event: Dict) -> None:
+        symbol = event['symbol']
+        kind = event['kind']
+        detector = self.symbol_detectors[symbol]
+        if kind == 'bar':
+            timestamp = _decode_time(event['time'])
+            detector.replay_bar(timestamp, event['high'], event['low'], event['volume'])
+            self.last_bar_time[symbol] = timestamp.value
+        elif kind == 'gap':
+            detector.book.add(FairValueGap(
+                start_time=_decode_time(event['start_time']),
+                end_time=_decode_time(event['end_time']),
+                upper_price=event['upper_price'],
+                lower_price=event['lower_price'],
+                volume_weight=event['volume_weight'],
+                direction=event['direction'],
+                mitigated=False
+            ))
+        elif kind == 'mitigation':
+            detector.update_fvg_status(event['price'])
+        elif kind == 'trade_open':
+            self.active_trades[symbol] = Trade(
+                entry_price=event['entry_price'],
+                stop_loss=event['stop_loss'],
+                take_profit=event['take_profit'],
+                direction=event['direction'],
+                size=event['size'],
+                symbol=symbol,
+                entry_time=datetime.fromisoformat(event['entry_time'])
+            )
+        elif kind == 'trade_close':
+            self.active_trades.pop(symbol, None)
+
     async def monitor_symbol(self, symbol: str, account_size: float):
-        """Monitor a single symbol for trading opportunities"""
+        """Poll a single symbol every poll_interval seconds; run() schedules all symbols together"""
+        self.loop_lag_monitor.start()
         while True:
             try:
-                df = await self.fetch_data(symbol)
-                
-                # Update structure levels
-                levels = self.structure_analyzer.find_support_resistance(df)
-                
-                # Find new unmitigated FVGs
-                unmitigated_fvgs = self.fvg_detector.find_fvg(df)  # This now returns only unmitigated FVGs
-                self.pending_fvgs[symbol] = unmitigated_fvgs
-                
-                # Check for trade entries
-                current_price = df['Close'].iloc[-1]
-                
-                for fvg in current_fvgs:
-                    # Check if price is in FVG zone
-                    if fvg.lower_price <= current_price <= fvg.upper_price:
-                        # Verify break of structure
-                        if self.structure_analyzer.is_break_of_structure(
-                            current_price, levels, fvg.direction):
-                            
-                            # Calculate trade parameters
-                            if fvg.direction == 'bullish':
-                                entry_price = current_price
-                                stop_loss = fvg.lower_price
-                                take_profit = entry_price + (entry_price - stop_loss) * 2
-                            else:
-                                entry_price = current_price
-                                stop_loss = fvg.upper_price
-                                take_profit = entry_price - (stop_loss - entry_price) * 2
-                            
-                            # Calculate position size
-                            size = self.calculate_position_size(
-                                entry_price, stop_loss, account_size)
-                            
-                            # Create and execute trade
-                            trade = Trade(
-                                entry_price=entry_price,
-                                stop_loss=stop_loss,
-                                take_profit=take_profit,
-                                direction=fvg.direction,
-                                size=size,
-                                symbol=symbol,
-                                entry_time=datetime.now()
-                            )
-                            
-                            self.active_trades[symbol] = trade
-                            logger.info(f"Executed trade for {symbol}: {trade}")
-                
-                # Monitor active trades
-                if symbol in self.active_trades:
-                    trade = self.active_trades[symbol]
-                    
-                    # Check for stop loss or take profit
-                    if (trade.direction == 'bullish' and 
-                        (current_price <= trade.stop_loss or 
-                         current_price >= trade.take_profit)):
-                        logger.info(f"Closing trade for {symbol}")
-                        del self.active_trades[symbol]
-                    
-                    elif (trade.direction == 'bearish' and 
-                          (current_price >= trade.stop_loss or 
-                           current_price <= trade.take_profit)):
-                        logger.info(f"Closing trade for {symbol}")
-                        del self.active_trades[symbol]
-                
-                await asyncio.sleep(60)  # Check every minute
+                with self.metrics.time('cycle_seconds', symbol=symbol):
+                    bars = await self.fetch_data(symbol)
+                    self.process_symbol(symbol, bars, account_size)
+                    await self.sync_journal()
+                await asyncio.sleep(self.poll_interval)
                 
             except Exception as e:
                 logger.error(f"Error monitoring {symbol}: {str(e)}")
-                await asyncio.sleep(60)
-
-    async def run(self, account_size: float):
-        """Run the trading bot across multiple symbols"""
-        tasks = []
-        for symbol in self.symbols:
-            task = asyncio.create_task(self.monitor_symbol(symbol, account_size))
-            tasks.append(task)
-        
-        await asyncio.gather(*tasks)
+                self.metrics.inc('errors_total', symbol=symbol, stage='monitor')
+                await asyncio.sleep(self.poll_interval)
+
+    async def run(self, account_size: float, scheduler: Optional[BarScheduler] = None):
+        """Run the trading bot across all symbols, one batched pass after every bar close
+
+        By default the scheduler feeds a TradingPipeline, so analysis runs on
+        worker threads and exit checks never wait behind it.
+        """
+        self.loop_lag_monitor.start()
+        if self.journal is not None and not self._restored:
+            self.restore()
+        if scheduler is None:
+            scheduler = BarScheduler(self, pipeline=TradingPipeline(self, account_size))
+        if scheduler.pipeline is not None:
+            await scheduler.pipeline.start()
+        try:
+            await scheduler.run(account_size)
+        finally:
+            if scheduler.pipeline is not None:
+                await scheduler.pipeline.stop()
+            self.checkpoint(force=True)
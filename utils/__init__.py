@@ -1,3 +1,8 @@
 from .logger import get_logger
+from .ring_buffer import BarRingBuffer, BarWindow
+from .timeframes import MultiTimeframeBars, TimeframeAggregator, timeframe_ns
+from .synthetic import SyntheticMarket, SyntheticMarketGenerator, generate_market
 
-__all__ = ['get_logger']
+__all__ = ['get_logger', 'BarRingBuffer', 'BarWindow', 'SyntheticMarket',
+           'SyntheticMarketGenerator', 'generate_market',
+           'MultiTimeframeBars', 'TimeframeAggregator', 'timeframe_ns']
@@ -0,0 +1,211 @@
+# fvg_trading_bot/utils/journal.py
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+import json
+import os
+import pickle
+import threading
+import time
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+JOURNAL_FILE = 'journal.jsonl'
+SNAPSHOT_FILE = 'snapshot.pkl'
+
+class StateJournal:
+    """
+    Append-only event journal with periodic snapshots, kept in one directory.
+
+    append() numbers each event and buffers it; the buffer is written as
+    JSON lines once it holds batch_size events, flush_interval seconds
+    after the last write, or when append() is called with durable=True.
+    With fsync=True every write is fsynced before it returns. Numbering
+    and buffering never wait for the disk, so append(defer=True) is safe
+    to call while holding other locks; flush_due() writes the buffer later.
+    Nothing is written without a call, so a lone event waits for the next
+    append() or flush_due(); TradingBot.checkpoint() makes one every pass.
+
+    write_snapshot() stores a full state (pickled) tagged with the last
+    event number it covers, atomically replacing the previous snapshot,
+    and then drops the covered events from the journal. load() returns the snapshot and the
+    events recorded after it. Events already covered by the snapshot are
+    skipped, so a crash between the two steps loses nothing, and a torn
+    last line left by a crash mid-write is dropped.
+
+    Snapshots are pickles: only load directories this process wrote.
+    """
+
+    def __init__(self, directory: Union[str, Path], batch_size: int = 64,
+                 flush_interval: float = 1.0, fsync: bool = True,
+                 snapshot_every: int = 10000):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval  # Seconds a buffered event may wait before it is written
+        self.fsync = fsync
+        self.snapshot_every = snapshot_every  # Events after which should_snapshot() turns true
+        self.journal_path = self.directory / JOURNAL_FILE
+        self.snapshot_path = self.directory / SNAPSHOT_FILE
+
+        self._lock = threading.Lock()  # Guards numbering and the buffer, never held during I/O
+        self._write_lock = threading.Lock()  # Serializes writes to the journal and snapshot files
+        self._buffer: List[str] = []
+        self._durable = False  # A buffered event was appended with durable=True
+        self._last_flush = time.monotonic()
+        self._snapshot_seq, _ = self._read_snapshot_header()
+        self._drop_torn_tail()
+        self._seq = max([self._snapshot_seq] + [event['seq'] for event in self._read_events(0)])
+        self.events_since_snapshot = self._seq - self._snapshot_seq
+        self._file = open(self.journal_path, 'a', encoding='utf-8')
+
+    @property
+    def seq(self) -> int:
+        """Number of the latest appended event"""
+        return self._seq
+
+    def append(self, kind: str, durable: bool = False, defer: bool = False, **fields) -> int:
+        """Record one event and return its number
+
+        The event is written once due(); durable=True makes it due at once.
+        defer=True only buffers it and leaves the write to flush_due().
+        """
+        with self._lock:
+            self._seq += 1
+            self.events_since_snapshot += 1
+            self._buffer.append(json.dumps({'seq': self._seq, 'kind': kind, **fields},
+                                           separators=(',', ':')))
+            self._durable = self._durable or durable
+            seq = self._seq
+        if not defer:
+            self.flush_due()
+        return seq
+
+    def due(self) -> bool:
+        """Whether buffered events should be written: one is durable, the batch is full or flush_interval passed"""
+        with self._lock:
+            return bool(self._buffer) and (
+                self._durable or len(self._buffer) >= self.batch_size or
+                time.monotonic() - self._last_flush >= self.flush_interval)
+
+    def flush_due(self) -> bool:
+        """Write out buffered events if they are due; returns whether it wrote"""
+        if not self.due():
+            return False
+        self.flush()
+        return True
+
+    def flush(self) -> None:
+        """Write out buffered events"""
+        with self._write_lock:
+            self._flush()
+
+    def should_snapshot(self) -> bool:
+        return self.events_since_snapshot >= self.snapshot_every
+
+    def write_snapshot(self, state: Dict, seq: Optional[int] = None) -> None:
+        """Atomically store state as covering events up to seq, then drop them from the journal
+
+        seq defaults to every event appended so far. Passing the seq read
+        when state was copied lets the copy be written later, on another
+        thread; events appended in between stay in the journal. The caller
+        must not mutate state concurrently with this call.
+        """
+        with self._write_lock:
+            written = self._flush()
+            if seq is None:
+                seq = written
+            temporary = self.snapshot_path.with_suffix('.tmp')
+            with open(temporary, 'wb') as f:
+                # The event number goes first so it can be read without the state
+                pickle.dump(seq, f, protocol=pickle.HIGHEST_PROTOCOL)
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporary, self.snapshot_path)
+            self._sync_directory()
+
+            self._file.close()
+            later = self._read_events(seq)
+            if later:
+                # Replace rather than truncate, so a crash cannot lose the kept events
+                temporary = self.journal_path.with_suffix('.tmp')
+                with open(temporary, 'w', encoding='utf-8') as f:
+                    f.writelines(json.dumps(event, separators=(',', ':')) + '\n' for event in later)
+                    f.flush()
+                    if self.fsync:
+                        os.fsync(f.fileno())
+                os.replace(temporary, self.journal_path)
+                self._sync_directory()
+                self._file = open(self.journal_path, 'a', encoding='utf-8')
+            else:
+                self._file = open(self.journal_path, 'w', encoding='utf-8')
+            with self._lock:
+                self._snapshot_seq = seq
+                self.events_since_snapshot = self._seq - seq
+
+    def load(self) -> Tuple[Optional[Dict], List[Dict]]:
+        """Latest snapshot state (None without one) and the events recorded after it, in order"""
+        self.flush()
+        snapshot_seq, state = self._read_snapshot_header(load_state=True)
+        return state, self._read_events(snapshot_seq)
+
+    def close(self) -> None:
+        with self._write_lock:
+            self._flush()
+            self._file.close()
+
+    def _flush(self) -> int:
+        """Write the buffer (the caller holds _write_lock) and return the last event number written"""
+        with self._lock:
+            lines, self._buffer = self._buffer, []
+            self._durable = False
+            self._last_flush = time.monotonic()
+            seq = self._seq
+        if not lines:
+            return seq
+        self._file.write('\n'.join(lines) + '\n')
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        return seq
+
+    def _read_snapshot_header(self, load_state: bool = False) -> Tuple[int, Optional[Dict]]:
+        if not self.snapshot_path.exists():
+            return 0, None
+        with open(self.snapshot_path, 'rb') as f:
+            seq = pickle.load(f)
+            return seq, pickle.load(f) if load_state else None
+
+    def _drop_torn_tail(self) -> None:
+        """Cut a partial last line left by a crash so new events start on a fresh line"""
+        if not self.journal_path.exists():
+            return
+        with open(self.journal_path, 'rb+') as f:
+            data = f.read()
+            if data and not data.endswith(b'\n'):
+                logger.warning(f"Dropping incomplete last journal entry in {self.journal_path}")
+                f.truncate(data.rfind(b'\n') + 1)
+
+    def _read_events(self, after: int) -> List[Dict]:
+        if not self.journal_path.exists():
+            return []
+        events = []
+        with open(self.journal_path, encoding='utf-8') as f:
+            for line in f:
+                if not line.endswith('\n'):
+                    break  # Torn write; only complete lines were ever acknowledged
+                event = json.loads(line)
+                if event['seq'] > after:
+                    events.append(event)
+        return events
+
+    def _sync_directory(self) -> None:
+        """Persist the snapshot rename itself (not supported on Windows)"""
+        if os.name == 'nt':
+            return
+        fd = os.open(self.directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
@@ -0,0 +1,301 @@
+# fvg_trading_bot/utils/metrics.py
+from bisect import bisect_left
+from typing import Dict, List, Optional, Sequence, Tuple
+import asyncio
+import json
+import math
+import threading
+import time
+
+# Upper bounds in seconds, from sub-millisecond analysis steps to slow fetches
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+class Histogram:
+    """Fixed-bucket histogram; observe() is one binary search and two additions"""
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds: Sequence[float] = LATENCY_BUCKETS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[float, int]]:
+        """(upper bound, observations at or below it) pairs, ending with +Inf"""
+        total = 0
+        buckets = []
+        for bound, count in zip(self.bounds + (math.inf,), self.counts):
+            total += count
+            buckets.append((bound, total))
+        return buckets
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by interpolating inside its bucket"""
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        lower = 0.0
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            if seen + count >= rank and count > 0:
+                return lower + (bound - lower) * (rank - seen) / count
+            seen += count
+            lower = bound
+        return self.bounds[-1] if self.bounds else 0.0
+
+class _Timer:
+    __slots__ = ('histogram', 'lock', 'start')
+
+    def __init__(self, histogram: Histogram, lock: threading.Lock):
+        self.histogram = histogram
+        self.lock = lock
+
+    def __enter__(self) -> '_Timer':
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        elapsed = time.perf_counter() - self.start
+        with self.lock:
+            self.histogram.observe(elapsed)
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self) -> '_NullTimer':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+_NULL_TIMER = _NullTimer()
+
+class _Family:
+    __slots__ = ('name', 'kind', 'help', 'buckets', 'children')
+
+    def __init__(self, name: str, kind: str, help_text: str, buckets: Sequence[float]):
+        self.name = name
+        self.kind = kind  # 'counter', 'gauge' or 'histogram'
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        self.children: Dict[Labels, object] = {}
+
+class MetricsRegistry:
+    """
+    In-process counters, gauges and latency histograms keyed by label values.
+
+    Metrics are created on first use. Recording costs a dict lookup plus a
+    bisect, so the hooks can stay on in production; a registry built with
+    enabled=False turns every call into a no-op. Export with to_prometheus()
+    (text exposition format) or to_json().
+
+    Recording and export are thread-safe: analysis threads and the event
+    loop share one registry, so every update and export holds a lock.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._families: Dict[str, _Family] = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> Dict:
+        # Registries travel with bots sent to worker processes; the lock does not
+        with self._lock:
+            state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state: Dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def describe(self, name: str, kind: str, help_text: str,
+                 buckets: Sequence[float] = LATENCY_BUCKETS) -> None:
+        """Declare a metric's type, help text and histogram buckets ahead of use"""
+        with self._lock:
+            family = self._families.get(name)
+            if family is None:
+                self._families[name] = _Family(name, kind, help_text, buckets)
+            elif family.kind != kind:
+                raise ValueError(f"Metric {name} is a {family.kind}, not a {kind}")
+            else:
+                family.help = help_text
+
+    def inc(self, name: str, amount: float = 1.0, **labels) -> None:
+        """Add to a counter"""
+        if not self.enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            children = self._family(name, 'counter').children
+            children[key] = children.get(key, 0.0) + amount
+
+    def set(self, name: str, value: float, **labels) -> None:
+        """Set a gauge"""
+        if not self.enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._family(name, 'gauge').children[key] = value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        """Record one histogram observation"""
+        if not self.enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._histogram(name, key).observe(value)
+
+    def time(self, name: str, **labels):
+        """Context manager that observes its elapsed seconds into a histogram"""
+        if not self.enabled:
+            return _NULL_TIMER
+        key = self._key(labels)
+        with self._lock:
+            return _Timer(self._histogram(name, key), self._lock)
+
+    def histogram(self, name: str, **labels) -> Histogram:
+        """The histogram for one label set, created if needed; read it, record through observe()"""
+        key = self._key(labels)
+        with self._lock:
+            return self._histogram(name, key)
+
+    def _histogram(self, name: str, key: Labels) -> Histogram:
+        family = self._family(name, 'histogram')
+        histogram = family.children.get(key)
+        if histogram is None:
+            histogram = family.children[key] = Histogram(family.buckets)
+        return histogram
+
+    def value(self, name: str, **labels) -> Optional[object]:
+        """Current counter or gauge value, or Histogram, for one label set"""
+        with self._lock:
+            family = self._families.get(name)
+            if family is None:
+                return None
+            return family.children.get(self._key(labels))
+
+    def clear(self) -> None:
+        """Drop every recorded value, keeping declared metrics"""
+        with self._lock:
+            for family in self._families.values():
+                family.children.clear()
+
+    def to_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        with self._lock:
+            return self._prometheus()
+
+    def _prometheus(self) -> str:
+        lines = []
+        for family in self._families.values():
+            if family.help:
+                lines.append(f"# HELP {family.name} {family.help}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            for key, child in sorted(family.children.items()):
+                if family.kind != 'histogram':
+                    lines.append(f"{family.name}{self._format_labels(key)} {self._format_value(child)}")
+                    continue
+                for bound, count in child.cumulative():
+                    le = '+Inf' if bound == math.inf else repr(float(bound))
+                    lines.append(f"{family.name}_bucket{self._format_labels(key + (('le', le),))} {count}")
+                lines.append(f"{family.name}_sum{self._format_labels(key)} {self._format_value(child.sum)}")
+                lines.append(f"{family.name}_count{self._format_labels(key)} {child.count}")
+        return '\n'.join(lines) + '\n'
+
+    def to_dict(self) -> Dict:
+        """Plain-data snapshot; histograms include count, sum, mean and p50/p95/p99 estimates"""
+        with self._lock:
+            return self._snapshot()
+
+    def _snapshot(self) -> Dict:
+        snapshot = {}
+        for family in self._families.values():
+            samples = []
+            for key, child in sorted(family.children.items()):
+                sample = {'labels': dict(key)}
+                if family.kind == 'histogram':
+                    sample.update({
+                        'count': child.count,
+                        'sum': child.sum,
+                        'mean': child.sum / child.count if child.count else 0.0,
+                        'p50': child.quantile(0.5),
+                        'p95': child.quantile(0.95),
+                        'p99': child.quantile(0.99)
+                    })
+                else:
+                    sample['value'] = child
+                samples.append(sample)
+            snapshot[family.name] = {'type': family.kind, 'help': family.help, 'samples': samples}
+        return snapshot
+
+    def to_json(self, **kwargs) -> str:
+        return json.dumps(self.to_dict(), **kwargs)
+
+    def _family(self, name: str, kind: str) -> _Family:
+        family = self._families.get(name)
+        if family is None:
+            family = self._families[name] = _Family(name, kind, '', LATENCY_BUCKETS)
+        elif family.kind != kind:
+            raise ValueError(f"Metric {name} is a {family.kind}, not a {kind}")
+        return family
+
+    @staticmethod
+    def _key(labels: Dict[str, object]) -> Labels:
+        return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+    @staticmethod
+    def _format_labels(key: Labels) -> str:
+        if not key:
+            return ''
+        escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+                   for _, value in key)
+        return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(key, escaped)) + '}'
+
+    @staticmethod
+    def _format_value(value: float) -> str:
+        if value == math.inf:
+            return '+Inf'
+        if value == -math.inf:
+            return '-Inf'
+        return repr(float(value))
+
+class EventLoopLagMonitor:
+    """Measure how late the event loop wakes a sleeping task
+
+    Every interval seconds the lag (actual minus requested sleep) is written
+    to the event_loop_lag_seconds gauge. Sustained lag means something is
+    blocking the loop.
+    """
+
+    def __init__(self, metrics: MetricsRegistry, interval: float = 1.0):
+        self.metrics = metrics
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+        metrics.describe('event_loop_lag_seconds', 'gauge',
+                         'Delay of the latest event loop wake-up beyond its scheduled time')
+
+    def start(self) -> None:
+        """Start sampling on the running loop; does nothing if already running"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._sample())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _sample(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            scheduled = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.metrics.set('event_loop_lag_seconds', max(0.0, loop.time() - scheduled))
@@ -0,0 +1,125 @@
+from typing import Optional
+import numpy as np
+import pandas as pd
+
+PRICE_FIELDS = ('open', 'high', 'low', 'close', 'volume')
+FRAME_COLUMNS = ('Open', 'High', 'Low', 'Close', 'Volume')
+
+class BarWindow:
+    """Read-only view of the most recent bars held by a BarRingBuffer"""
+    __slots__ = ('timestamps', 'open', 'high', 'low', 'close', 'volume', 'tz')
+
+    def __init__(self, timestamps: np.ndarray, open_: np.ndarray, high: np.ndarray,
+                 low: np.ndarray, close: np.ndarray, volume: np.ndarray, tz=None):
+        self.timestamps = timestamps  # int64 nanoseconds (UTC when tz is set)
+        self.open = open_
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+        self.tz = tz
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def timestamp(self, i: int) -> pd.Timestamp:
+        """Return bar i's timestamp as a pandas Timestamp"""
+        if self.tz is None:
+            return pd.Timestamp(int(self.timestamps[i]))
+        return pd.Timestamp(int(self.timestamps[i]), tz='UTC').tz_convert(self.tz)
+
+    def copy(self) -> 'BarWindow':
+        """Detach the window from its buffer so later appends cannot change it"""
+        return BarWindow(self.timestamps.copy(), self.open.copy(), self.high.copy(), self.low.copy(),
+                         self.close.copy(), self.volume.copy(), tz=self.tz)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Copy the window into a DataFrame indexed by timestamp"""
+        index = pd.DatetimeIndex(self.timestamps.astype('datetime64[ns]'))
+        if self.tz is not None:
+            index = index.tz_localize('UTC').tz_convert(self.tz)
+        return pd.DataFrame({column: getattr(self, field).copy()
+                             for column, field in zip(FRAME_COLUMNS, PRICE_FIELDS)}, index=index)
+
+class BarRingBuffer:
+    """
+    Fixed-capacity OHLCV history backed by preallocated contiguous arrays.
+
+    Every bar is written twice, at slot k and k + capacity, so the latest
+    n bars always form one contiguous slice and window() can hand out
+    zero-copy views. Appends are O(1) and memory never grows past the
+    2 * capacity rows allocated up front.
+    """
+
+    def __init__(self, capacity: int, tz=None):
+        self.capacity = capacity
+        self.tz = tz
+        self._timestamps = np.zeros(2 * capacity, dtype=np.int64)
+        self._prices = np.zeros((len(PRICE_FIELDS), 2 * capacity), dtype=np.float64)
+        self._next = 0  # Slot the next bar is written to
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def last_timestamp(self) -> Optional[int]:
+        """Timestamp of the newest bar in int64 nanoseconds"""
+        if self._size == 0:
+            return None
+        return int(self._timestamps[self._next - 1 + self.capacity])
+
+    def append(self, timestamp: int, open_: float, high: float, low: float,
+               close: float, volume: float) -> None:
+        """Add one bar, overwriting the oldest once the buffer is full"""
+        slot = self._next
+        for row in (slot, slot + self.capacity):
+            self._timestamps[row] = timestamp
+            self._prices[:, row] = (open_, high, low, close, volume)
+        self._next = (slot + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def extend(self, df: pd.DataFrame) -> None:
+        """Append every bar of an OHLCV DataFrame in one vectorized write"""
+        if len(df) == 0:
+            return
+        index = pd.DatetimeIndex(df.index)
+        if self.tz is None and self._size == 0:
+            self.tz = index.tz
+
+        df = df.iloc[-self.capacity:]
+        self._write(pd.DatetimeIndex(df.index).as_unit('ns').asi8,
+                    np.vstack([df[column].to_numpy(dtype=np.float64) for column in FRAME_COLUMNS]))
+
+    def extend_window(self, window: BarWindow) -> None:
+        """Append the bars of a BarWindow, such as one restored from a snapshot"""
+        if len(window) == 0:
+            return
+        if self.tz is None and self._size == 0:
+            self.tz = window.tz
+        start = max(len(window) - self.capacity, 0)
+        self._write(window.timestamps[start:],
+                    np.vstack([getattr(window, field)[start:] for field in PRICE_FIELDS]))
+
+    def _write(self, timestamps: np.ndarray, prices: np.ndarray) -> None:
+        count = len(timestamps)
+        slots = (self._next + np.arange(count)) % self.capacity
+        for offset in (0, self.capacity):
+            self._timestamps[slots + offset] = timestamps
+            self._prices[:, slots + offset] = prices
+        self._next = (self._next + count) % self.capacity
+        self._size = min(self._size + count, self.capacity)
+
+    def truncate_from(self, timestamp: int) -> None:
+        """Drop held bars at or after timestamp so refetched copies can replace them"""
+        while self._size > 0 and self.last_timestamp >= timestamp:
+            self._next = (self._next - 1) % self.capacity
+            self._size -= 1
+
+    def window(self, n: Optional[int] = None) -> BarWindow:
+        """Zero-copy view of the latest n bars (all held bars by default)"""
+        n = self._size if n is None else min(n, self._size)
+        end = self._next + self.capacity
+        start = end - n
+        prices = self._prices[:, start:end]
+        return BarWindow(self._timestamps[start:end], *prices, tz=self.tz)
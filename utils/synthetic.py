@@ -0,0 +1,198 @@
+# fvg_trading_bot/utils/synthetic.py
+from dataclasses import dataclass
+from typing import Dict, List, Sequence
+import zlib
+import numpy as np
+import pandas as pd
+
+@dataclass
+class SyntheticMarket:
+    """Generated bars plus the planted gaps and swings they contain"""
+    bars: Dict[str, pd.DataFrame]
+    gaps: pd.DataFrame  # symbol, bar, time, direction, lower_price, upper_price
+    swings: pd.DataFrame  # symbol, bar, time, kind, price
+
+    def to_panel(self) -> pd.DataFrame:
+        """All symbols side by side with (symbol, field) columns, as a bulk download returns them"""
+        return pd.concat(self.bars, axis=1)
+
+class SyntheticMarketGenerator:
+    """
+    Seeded OHLCV generator with known fair value gaps and swing points.
+
+    Closes follow a log random walk whose volatility switches between
+    regimes. Every background bar's range covers the close two bars back,
+    so no gap can form by chance: the planted gaps are the only ones, and
+    each completes on a known bar with a volume spike on its middle bar.
+    Planted swings are spikes above (below) the neighbouring swing_width
+    bars on each side. Everything is computed with array operations; ten
+    million bars take a few seconds.
+    """
+
+    def __init__(self, n_bars: int, seed: int = 0, start: str = '2024-01-01', freq: str = '5min',
+                 start_price: float = 100.0, volatility_regimes: Sequence[float] = (0.001, 0.003),
+                 regime_length: int = 500, wick: float = 0.0005, base_volume: float = 100000.0,
+                 volume_profile: str = 'u_shape', bars_per_session: int = 78, volume_noise: float = 0.3,
+                 n_gaps: int = 10, gap_size: Sequence[float] = (0.002, 0.006), volume_spike: float = 5.0,
+                 n_swings: int = 10, swing_size: float = 0.005, swing_width: int = 2):
+        if volume_profile not in ('flat', 'u_shape'):
+            raise ValueError(f"Unknown volume profile: {volume_profile}")
+        self.n_bars = n_bars
+        self.seed = seed
+        self.start = start
+        self.freq = freq
+        self.start_price = start_price
+        self.volatility_regimes = tuple(volatility_regimes)  # Per-bar log return std of each regime
+        self.regime_length = regime_length  # Mean bars per regime
+        self.wick = wick  # Mean wick beyond the bar's body, as a fraction of price
+        self.base_volume = base_volume
+        self.volume_profile = volume_profile
+        self.bars_per_session = bars_per_session
+        self.volume_noise = volume_noise
+        self.n_gaps = n_gaps
+        self.gap_size = tuple(gap_size)  # Range of planted gap sizes, as a fraction of price
+        self.volume_spike = volume_spike  # Middle-bar volume over its trailing mean for planted gaps
+        self.n_swings = n_swings
+        self.swing_size = swing_size  # Spike beyond the neighbouring bars, as a fraction of price
+        self.swing_width = swing_width
+
+    def generate(self, symbols: List[str]) -> SyntheticMarket:
+        """Generate every symbol; each symbol's series only depends on the seed and its name"""
+        bars = {}
+        gaps = []
+        swings = []
+        for symbol in symbols:
+            df, symbol_gaps, symbol_swings = self.generate_symbol(symbol)
+            bars[symbol] = df
+            gaps.append(symbol_gaps)
+            swings.append(symbol_swings)
+        return SyntheticMarket(
+            bars=bars,
+            gaps=pd.concat(gaps, ignore_index=True) if gaps else self._gap_frame(),
+            swings=pd.concat(swings, ignore_index=True) if swings else self._swing_frame()
+        )
+
+    def generate_symbol(self, symbol: str = ''):
+        """Return (bars, gaps, swings) for one symbol"""
+        n = self.n_bars
+        rng = np.random.default_rng([self.seed, zlib.crc32(symbol.encode())])
+
+        # Volatility regimes drawn in blocks of geometric length
+        n_blocks = max(1, 2 * n // max(self.regime_length, 1) + 1)
+        block_lengths = rng.geometric(1 / max(self.regime_length, 1), n_blocks)
+        regime = rng.integers(0, len(self.volatility_regimes), n_blocks)
+        sigma = np.repeat(np.asarray(self.volatility_regimes)[regime], block_lengths)
+        while len(sigma) < n:
+            sigma = np.concatenate([sigma, sigma])
+        log_close = np.log(self.start_price) + np.cumsum(rng.standard_normal(n) * sigma[:n])
+
+        upper_wick = np.log1p(rng.exponential(self.wick, n))
+        lower_wick = -np.log1p(-np.minimum(rng.exponential(self.wick, n), 0.5))
+
+        # Planted events sit on disjoint slots far enough apart not to interact
+        spacing = max(8, 2 * self.swing_width + 4)
+        first = max(6, self.swing_width + 1)
+        slots = np.arange(first, n - spacing, spacing)
+        if len(slots) < self.n_gaps + self.n_swings:
+            raise ValueError(f"{n} bars cannot hold {self.n_gaps} gaps and {self.n_swings} swings")
+        events = np.sort(rng.choice(slots, self.n_gaps + self.n_swings, replace=False))
+        is_gap = np.zeros(len(events), dtype=bool)
+        is_gap[rng.choice(len(events), self.n_gaps, replace=False)] = True
+        gap_bars = events[is_gap]
+        swing_bars = events[~is_gap]
+        gap_bearish = rng.random(len(gap_bars)) < 0.5
+        swing_is_high = rng.random(len(swing_bars)) < 0.5
+
+        # Background ranges cover closes t-2..t, so bar t overlaps bar t-2
+        high, low = self._ranges(log_close, upper_wick, lower_wick)
+
+        # A bullish gap at t needs low[t] - high[t-2] = log(1 + size); shift closes from t-1 on
+        t = gap_bars
+        size = np.log1p(rng.uniform(self.gap_size[0], self.gap_size[1], len(t)))
+        body_low = np.minimum(log_close[t - 1], log_close[t]) - lower_wick[t]
+        body_high = np.maximum(log_close[t - 1], log_close[t]) + upper_wick[t]
+        jump = np.where(gap_bearish, (low[t - 2] - size) - body_high, (high[t - 2] + size) - body_low)
+        steps = np.zeros(n)
+        steps[t - 1] = jump
+        log_close += np.cumsum(steps)
+
+        high, low = self._ranges(log_close, upper_wick, lower_wick)
+        # The completing bar's range leaves out the close two bars back
+        high[t] = np.maximum(log_close[t - 1], log_close[t]) + upper_wick[t]
+        low[t] = np.minimum(log_close[t - 1], log_close[t]) - lower_wick[t]
+
+        # Swing spikes rise above (fall below) the swing_width bars on each side
+        w = self.swing_width
+        s = swing_bars
+        offsets = np.arange(-w, w + 1)
+        neighbourhood_high = high[s[:, None] + offsets].max(axis=1)
+        neighbourhood_low = low[s[:, None] + offsets].min(axis=1)
+        spike = np.log1p(self.swing_size)
+        high[s[swing_is_high]] = neighbourhood_high[swing_is_high] + spike
+        low[s[~swing_is_high]] = neighbourhood_low[~swing_is_high] - spike
+
+        close = np.exp(log_close)
+        open_ = np.concatenate([close[:1], close[:-1]])
+        volume = self._volume(rng)
+        # Middle bar trades volume_spike times the mean of the 20 bars before it
+        cumulative = np.concatenate([[0.0], np.cumsum(volume)])
+        window_start = np.maximum(t - 21, 0)
+        trailing_mean = (cumulative[t - 1] - cumulative[window_start]) / (t - 1 - window_start)
+        volume[t - 1] = self.volume_spike * trailing_mean
+
+        index = pd.date_range(self.start, periods=n, freq=self.freq)
+        df = pd.DataFrame({
+            'Open': open_,
+            'High': np.exp(high),
+            'Low': np.exp(low),
+            'Close': close,
+            'Volume': volume
+        }, index=index)
+
+        gaps = self._gap_frame(
+            symbol=symbol,
+            bar=t,
+            time=index[t],
+            direction=np.where(gap_bearish, 'bearish', 'bullish'),
+            lower_price=np.where(gap_bearish, df['High'].to_numpy()[t], df['High'].to_numpy()[t - 2]),
+            upper_price=np.where(gap_bearish, df['Low'].to_numpy()[t - 2], df['Low'].to_numpy()[t])
+        )
+        swings = self._swing_frame(
+            symbol=symbol,
+            bar=s,
+            time=index[s],
+            kind=np.where(swing_is_high, 'high', 'low'),
+            price=np.where(swing_is_high, df['High'].to_numpy()[s], df['Low'].to_numpy()[s])
+        )
+        return df, gaps, swings
+
+    @staticmethod
+    def _ranges(log_close: np.ndarray, upper_wick: np.ndarray, lower_wick: np.ndarray):
+        """Log high and low of bars spanning the closes t-2, t-1 and t"""
+        back1 = np.concatenate([log_close[:1], log_close[:-1]])
+        back2 = np.concatenate([log_close[:2], log_close[:-2]])
+        high = np.maximum(np.maximum(back2, back1), log_close) + upper_wick
+        low = np.minimum(np.minimum(back2, back1), log_close) - lower_wick
+        return high, low
+
+    def _volume(self, rng: np.random.Generator) -> np.ndarray:
+        noise = rng.lognormal(0.0, self.volume_noise, self.n_bars)
+        if self.volume_profile == 'flat':
+            return self.base_volume * noise
+        # Heavier trading at the open and close of each session
+        position = (np.arange(self.n_bars) % self.bars_per_session) / max(self.bars_per_session - 1, 1)
+        return self.base_volume * (0.6 + 1.6 * (2 * position - 1) ** 2) * noise
+
+    @staticmethod
+    def _gap_frame(**columns) -> pd.DataFrame:
+        return pd.DataFrame(columns or {name: [] for name in
+                            ('symbol', 'bar', 'time', 'direction', 'lower_price', 'upper_price')})
+
+    @staticmethod
+    def _swing_frame(**columns) -> pd.DataFrame:
+        return pd.DataFrame(columns or {name: [] for name in ('symbol', 'bar', 'time', 'kind', 'price')})
+
+def generate_market(symbols: List[str], n_bars: int, seed: int = 0,
+                    **options) -> SyntheticMarket:
+    """Shorthand for SyntheticMarketGenerator(n_bars, seed, **options).generate(symbols)"""
+    return SyntheticMarketGenerator(n_bars, seed=seed, **options).generate(symbols)
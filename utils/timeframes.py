@@ -0,0 +1,160 @@
+# fvg_trading_bot/utils/timeframes.py
+from typing import Dict, List, Optional, Sequence, Tuple
+import pandas as pd
+from utils.ring_buffer import BarRingBuffer, BarWindow
+
+HOUR_NS = 3600 * 10 ** 9
+
+Bar = Tuple[float, float, float, float, float]  # open, high, low, close, volume
+
+TIMEFRAME_UNITS = {'m': 'min', 'h': 'h', 'd': 'D'}
+
+def timeframe_ns(timeframe: str) -> int:
+    """Length of a timeframe such as '15m', '1h', '4h' or '1d' in nanoseconds"""
+    count, unit = timeframe[:-1], timeframe[-1]
+    if unit not in TIMEFRAME_UNITS or not count.isdigit():
+        raise ValueError(f"Unknown timeframe: {timeframe}")
+    return pd.Timedelta(int(count), unit=TIMEFRAME_UNITS[unit]).value
+
+def _combine(first: Bar, second: Bar) -> Bar:
+    return (first[0], max(first[1], second[1]), min(first[2], second[2]), second[3], first[4] + second[4])
+
+class TimeframeAggregator:
+    """
+    Builds one higher timeframe from a stream of base bars.
+
+    Closed bars are kept in a BarRingBuffer; only the forming bar is
+    rewritten as base bars arrive. The newest base bar may be revised
+    (live fetches return the still-forming bar again), so the forming bar
+    is held as the aggregate of its earlier base bars plus the latest one.
+    Base bars older than the latest are ignored. Buckets are aligned to
+    wall-clock time in tz, so daily bars start at local midnight.
+    """
+
+    def __init__(self, timeframe: str, capacity: int = 500, tz=None):
+        self.timeframe = timeframe
+        self.period = timeframe_ns(timeframe)
+        self.tz = tz
+        self.buffer = BarRingBuffer(capacity, tz=tz)
+        self._bucket: Optional[int] = None  # Forming bar's start (UTC ns)
+        self._committed: Optional[Bar] = None  # Forming bar's base bars before the latest
+        self._latest: Optional[Bar] = None
+        self._latest_time: Optional[int] = None
+        self._offsets: Dict[int, int] = {}  # UTC offset by hour since the epoch
+
+    def __len__(self) -> int:
+        return len(self.buffer)
+
+    def update(self, timestamp: int, open_: float, high: float, low: float,
+               close: float, volume: float) -> bool:
+        """Add or revise one base bar (timestamp in UTC ns); True when it closed the previous bar"""
+        if self._latest_time is not None and timestamp < self._latest_time:
+            return False
+        bar = (open_, high, low, close, volume)
+
+        if timestamp == self._latest_time:
+            self._latest = bar
+            self._write(new_bucket=False)
+            return False
+
+        bucket = self._bucket_start(timestamp)
+        new_bucket = bucket != self._bucket
+        if new_bucket:
+            self._committed = None
+        elif self._committed is None:
+            self._committed = self._latest
+        else:
+            self._committed = _combine(self._committed, self._latest)
+        closed = new_bucket and self._bucket is not None
+
+        self._bucket = bucket
+        self._latest = bar
+        self._latest_time = timestamp
+        self._write(new_bucket)
+        return closed
+
+    def extend(self, df: pd.DataFrame) -> int:
+        """Feed every row of an OHLCV DataFrame; returns how many bars closed"""
+        if len(df) == 0:
+            return 0
+        index = pd.DatetimeIndex(df.index)
+        if self.tz is None and len(self.buffer) == 0:
+            self.tz = self.buffer.tz = index.tz
+        timestamps = index.as_unit('ns').asi8.tolist()
+        columns = [df[column].to_numpy(dtype=float).tolist()
+                   for column in ('Open', 'High', 'Low', 'Close', 'Volume')]
+        return sum(self.update(timestamp, *bar) for timestamp, *bar in zip(timestamps, *columns))
+
+    def window(self, n: Optional[int] = None, include_forming: bool = True) -> BarWindow:
+        """Latest n aggregated bars, optionally leaving out the one still forming"""
+        if include_forming:
+            return self.buffer.window(n)
+        window = self.buffer.window(None if n is None else n + 1)
+        end = max(len(window) - 1, 0)
+        return BarWindow(window.timestamps[:end], window.open[:end], window.high[:end],
+                         window.low[:end], window.close[:end], window.volume[:end], tz=window.tz)
+
+    def _write(self, new_bucket: bool) -> None:
+        """Rewrite the forming bar, or start a new one"""
+        bar = self._latest if self._committed is None else _combine(self._committed, self._latest)
+        if not new_bucket:
+            self.buffer.truncate_from(self._bucket)
+        self.buffer.append(self._bucket, *bar)
+
+    def _bucket_start(self, timestamp: int) -> int:
+        if self.tz is None:
+            return timestamp - timestamp % self.period
+        local = timestamp + self._utc_offset(timestamp)
+        local_start = local - local % self.period
+        # The bucket may start before a daylight saving change, under another offset
+        return local_start - self._utc_offset(local_start - self._utc_offset(timestamp))
+
+    def _utc_offset(self, timestamp: int) -> int:
+        """UTC offset of tz at timestamp in ns, looked up once per hour"""
+        hour = timestamp // HOUR_NS
+        offset = self._offsets.get(hour)
+        if offset is None:
+            if len(self._offsets) > 1024:
+                self._offsets.clear()
+            utc_offset = pd.Timestamp(hour * HOUR_NS, tz='UTC').tz_convert(self.tz).utcoffset()
+            offset = self._offsets[hour] = pd.Timedelta(utc_offset).value
+        return offset
+
+class MultiTimeframeBars:
+    """
+    Higher-timeframe views of one symbol's base bar stream.
+
+    Every base bar updates each timeframe's TimeframeAggregator in O(1), so
+    FVGDetector and StructureAnalyzer can run on 15m, 1h, 4h or daily bars
+    without downloading them separately.
+    """
+
+    def __init__(self, timeframes: Sequence[str] = ('15m', '1h', '4h', '1d'),
+                 capacity: int = 500, tz=None):
+        self.aggregators: Dict[str, TimeframeAggregator] = {
+            timeframe: TimeframeAggregator(timeframe, capacity, tz) for timeframe in timeframes
+        }
+
+    @property
+    def timeframes(self) -> List[str]:
+        return list(self.aggregators)
+
+    def update(self, timestamp: int, open_: float, high: float, low: float,
+               close: float, volume: float) -> List[str]:
+        """Add or revise one base bar; returns the timeframes whose bar just closed"""
+        return [timeframe for timeframe, aggregator in self.aggregators.items()
+                if aggregator.update(timestamp, open_, high, low, close, volume)]
+
+    def extend(self, df: pd.DataFrame) -> None:
+        """Feed every row of a base-bar DataFrame"""
+        for aggregator in self.aggregators.values():
+            aggregator.extend(df)
+
+    def window(self, timeframe: str, n: Optional[int] = None,
+               include_forming: bool = True) -> BarWindow:
+        """Zero-copy view of the latest n bars of one timeframe"""
+        return self.aggregators[timeframe].window(n, include_forming)
+
+    def frame(self, timeframe: str, include_forming: bool = True) -> pd.DataFrame:
+        """One timeframe's bars as an OHLCV DataFrame, ready for find_fvg or find_levels"""
+        return self.window(timeframe, include_forming=include_forming).to_frame()
@@ -1,41 +1,119 @@
 # fvg_trading_bot/visualization/performance_viz.py
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Tuple
+import os
+import numpy as np
 import pandas as pd
 import seaborn as sns
+import matplotlib.dates as mdates
 import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
+from backtesting.metrics import PerformanceAccumulator
+
+TRADE_COLUMNS = ('entry_time', 'exit_time', 'entry_price', 'exit_price', 'direction', 'size', 'pnl')
+
+PLOTS = ('equity_curve', 'trade_distribution', 'drawdown_analysis', 'time_analysis',
+         'price_with_trades', 'performance_summary')
+
+# Per-process visualizer, set once by _init_worker so the data is pickled once per worker
+_worker_visualizer: Optional['PerformanceVisualizer'] = None
+
+def _init_worker(visualizer: 'PerformanceVisualizer') -> None:
+    global _worker_visualizer
+    plt.switch_backend('Agg')
+    _apply_style()
+    _worker_visualizer = visualizer
+
+def _render(name: str, path: str, dpi: Optional[float]) -> str:
+    """Draw and save one plot (process pool worker)"""
+    fig = getattr(_worker_visualizer, f'plot_{name}')()
+    fig.savefig(path, dpi=dpi)
+    plt.close(fig)
+    return path
+
+def _apply_style() -> None:
+    sns.set_style("whitegrid")
+    plt.rcParams['figure.figsize'] = [12, 7]
+
+def minmax_downsample(values: np.ndarray, max_points: int) -> np.ndarray:
+    """Indices of about max_points points that keep each bucket's minimum and maximum
+
+    Peaks and troughs survive, so the downsampled line has the same shape
+    as the full series at chart resolution. Returns every index when the
+    series is already short enough.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    if n <= max_points:
+        return np.arange(n)
+    size = -(-n // max(max_points // 2, 1))  # Points per bucket, rounded up
+    buckets = -(-n // size)
+    padded = np.full(buckets * size, values[-1])
+    padded[:n] = values
+    blocks = padded.reshape(buckets, size)
+    starts = np.arange(buckets) * size
+    keep = np.concatenate([starts + blocks.argmin(axis=1), starts + blocks.argmax(axis=1), [0, n - 1]])
+    return np.unique(np.minimum(keep, n - 1))
+
+def _wall_clock(times) -> np.ndarray:
+    """datetime64 values in their own time zone's wall clock, as matplotlib plots them"""
+    times = pd.DatetimeIndex(times)
+    if times.tz is not None:
+        times = times.tz_localize(None)
+    return times.to_numpy()
 
 class PerformanceVisualizer:
-    def __init__(self, trades_df: pd.DataFrame, price_history: pd.DataFrame):
+    def __init__(self, trades_df: pd.DataFrame, price_history: pd.DataFrame,
+                 performance: Optional[PerformanceAccumulator] = None, max_points: int = 5000):
         """
         Initialize visualizer with trade data and price history
         
         trades_df columns: entry_time, exit_time, entry_price, exit_price, 
                          direction, size, pnl
-        price_history columns: timestamp, Open, High, Low, Close, Volume
+        price_history: Open, High, Low, Close, Volume indexed by time
+                       (or with a timestamp column)
+        performance: the backtest's accumulator; without one, metrics are
+                     computed from trades_df
+        max_points: line charts are downsampled to about this many points
         """
+        if len(trades_df) == 0:
+            # A backtest without trades still gets (empty) charts
+            trades_df = pd.DataFrame({column: pd.Series(dtype='datetime64[ns]' if column.endswith('_time')
+                                                        else object if column == 'direction' else float)
+                                      for column in TRADE_COLUMNS})
         self.trades_df = trades_df
         self.price_history = price_history
+        if performance is None:
+            performance = PerformanceAccumulator()
+            if len(trades_df) > 0:
+                performance.record_trades(trades_df['pnl'].to_numpy())
+        self.performance = performance
+        self.max_points = max_points
+        self._pnl_curve: Optional[Tuple[pd.Series, pd.Series]] = None
         
         # Set style
-        sns.set_style("whitegrid")
-        plt.rcParams['figure.figsize'] = [12, 7]
+        _apply_style()
     
+    def cumulative_pnl(self) -> Tuple[pd.Series, pd.Series]:
+        """Cumulative P&L and its drawdown per trade, computed once and shared by the plots"""
+        if self._pnl_curve is None:
+            cumulative_pnl = self.trades_df['pnl'].cumsum()
+            self._pnl_curve = (cumulative_pnl, cumulative_pnl - cumulative_pnl.cummax())
+        return self._pnl_curve
+
     def plot_equity_curve(self):
         """Plot cumulative P&L over time"""
         fig, ax = plt.subplots(figsize=(12, 7))
-        
-        # Calculate cumulative P&L
-        cumulative_pnl = self.trades_df['pnl'].cumsum()
-        
-        # Calculate drawdown
-        running_max = cumulative_pnl.cummax()
-        drawdown = cumulative_pnl - running_max
+        cumulative_pnl, drawdown = self.cumulative_pnl()
         
         # Plot equity curve
-        sns.lineplot(data=cumulative_pnl, ax=ax, color='blue', label='Equity Curve')
+        keep = minmax_downsample(cumulative_pnl.to_numpy(), self.max_points)
+        ax.plot(keep, cumulative_pnl.to_numpy()[keep], color='blue', label='Equity Curve')
         
         # Plot drawdown
         ax2 = ax.twinx()
-        sns.lineplot(data=drawdown, ax=ax2, color='red', alpha=0.3, label='Drawdown')
+        keep = minmax_downsample(drawdown.to_numpy(), self.max_points)
+        ax2.plot(keep, drawdown.to_numpy()[keep], color='red', alpha=0.3, label='Drawdown')
         
         # Formatting
         ax.set_title('Equity Curve and Drawdown')
@@ -66,15 +144,14 @@ class PerformanceVisualizer:
     
     def plot_drawdown_analysis(self):
         """Detailed drawdown analysis"""
-        cumulative_pnl = self.trades_df['pnl'].cumsum()
-        running_max = cumulative_pnl.cummax()
-        drawdown = (cumulative_pnl - running_max)
-        drawdown_pct = drawdown / running_max * 100
+        cumulative_pnl, drawdown = self.cumulative_pnl()
+        drawdown_pct = drawdown / cumulative_pnl.cummax() * 100
         
         fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 10))
         
         # Drawdown over time
-        sns.lineplot(data=drawdown, ax=ax1, color='red')
+        keep = minmax_downsample(drawdown.to_numpy(), self.max_points)
+        ax1.plot(keep, drawdown.to_numpy()[keep], color='red')
         ax1.set_title('Drawdown Over Time')
         ax1.set_ylabel('Drawdown ($)')
         
@@ -114,25 +191,37 @@ class PerformanceVisualizer:
         """Plot price chart with trade entries and exits"""
         fig, ax = plt.subplots(figsize=(15, 8))
         
-        # Plot price
-        sns.lineplot(data=self.price_history, x='timestamp', y='Close', ax=ax, label='Price')
+        # Plot price, downsampled to the chart's resolution
+        prices = self.price_history
+        times = prices['timestamp'] if 'timestamp' in prices.columns else prices.index
+        close = prices['Close'].to_numpy()
+        keep = minmax_downsample(close, self.max_points)
+        ax.plot(_wall_clock(times)[keep], close[keep], label='Price')
         
-        # Plot trade entries and exits
-        for _, trade in self.trades_df.iterrows():
-            # Entry point
-            ax.scatter(trade['entry_time'], trade['entry_price'], 
-                      color='green' if trade['direction'] == 'bullish' else 'red',
-                      marker='^' if trade['direction'] == 'bullish' else 'v',
-                      s=100)
+        # Plot all trade entries and exits in a few batched calls
+        trades = self.trades_df
+        if len(trades) > 0:
+            entry_time = _wall_clock(trades['entry_time'])
+            exit_time = _wall_clock(trades['exit_time'])
+            entry_price = trades['entry_price'].to_numpy()
+            exit_price = trades['exit_price'].to_numpy()
+            bullish = (trades['direction'] == 'bullish').to_numpy()
             
-            # Exit point
-            ax.scatter(trade['exit_time'], trade['exit_price'],
-                      color='blue', marker='s', s=100)
+            # Entry points
+            ax.scatter(entry_time[bullish], entry_price[bullish], color='green', marker='^', s=100)
+            ax.scatter(entry_time[~bullish], entry_price[~bullish], color='red', marker='v', s=100)
             
-            # Connect entry and exit with a line
-            ax.plot([trade['entry_time'], trade['exit_time']],
-                   [trade['entry_price'], trade['exit_price']],
-                   color='gray', linestyle='--', alpha=0.5)
+            # Exit points
+            ax.scatter(exit_time, exit_price, color='blue', marker='s', s=100)
+            
+            # Connect entries and exits with one collection of segments
+            segments = np.stack([
+                np.column_stack([mdates.date2num(entry_time), entry_price]),
+                np.column_stack([mdates.date2num(exit_time), exit_price])
+            ], axis=1)
+            ax.add_collection(LineCollection(segments, colors='gray', linestyles='--', alpha=0.5))
+        # loc='best' would test every marker for overlap
+        ax.legend(loc='upper left')
         
         ax.set_title('Price Chart with Trades')
         ax.set_xlabel('Time')
@@ -144,18 +233,7 @@ class PerformanceVisualizer:
     
     def plot_performance_summary(self):
         """Create a comprehensive performance summary"""
-        # Calculate metrics
-        total_trades = len(self.trades_df)
-        winning_trades = len(self.trades_df[self.trades_df['pnl'] > 0])
-        losing_trades = len(self.trades_df[self.trades_df['pnl'] <= 0])
-        win_rate = winning_trades / total_trades * 100
-        
-        avg_win = self.trades_df[self.trades_df['pnl'] > 0]['pnl'].mean()
-        avg_loss = self.trades_df[self.trades_df['pnl'] <= 0]['pnl'].mean()
-        profit_factor = abs(avg_win / avg_loss) if avg_loss != 0 else float('inf')
-        
-        max_drawdown = (self.trades_df['pnl'].cumsum() - 
-                       self.trades_df['pnl'].cumsum().cummax()).min()
+        metrics = self.performance.summary()
         
         # Create figure
         fig, ax = plt.subplots(figsize=(10, 6))
@@ -163,30 +241,40 @@ class PerformanceVisualizer:
         
         # Add text
         plt.text(0.1, 0.9, 'Performance Summary', fontsize=16, fontweight='bold')
-        plt.text(0.1, 0.8, f'Total Trades: {total_trades}')
-        plt.text(0.1, 0.7, f'Win Rate: {win_rate:.2f}%')
-        plt.text(0.1, 0.6, f'Profit Factor: {profit_factor:.2f}')
-        plt.text(0.1, 0.5, f'Average Win: ${avg_win:.2f}')
-        plt.text(0.1, 0.4, f'Average Loss: ${avg_loss:.2f}')
-        plt.text(0.1, 0.3, f'Max Drawdown: ${abs(max_drawdown):.2f}')
+        plt.text(0.1, 0.8, f"Total Trades: {metrics['total_trades']}")
+        plt.text(0.1, 0.7, f"Win Rate: {metrics['win_rate'] * 100:.2f}%")
+        plt.text(0.1, 0.6, f"Profit Factor: {metrics['profit_factor']:.2f}")
+        plt.text(0.1, 0.5, f"Average Win: ${metrics['average_win']:.2f}")
+        plt.text(0.1, 0.4, f"Average Loss: ${metrics['average_loss']:.2f}")
+        plt.text(0.1, 0.3, f"Max Drawdown: ${metrics.get('max_equity_drawdown', metrics['max_drawdown']):.2f}")
+        if 'sharpe_ratio' in metrics:
+            plt.text(0.1, 0.2, f"Sharpe / Sortino: {metrics['sharpe_ratio']:.2f} / {metrics['sortino_ratio']:.2f}"
+                               f"  Exposure: {metrics['exposure'] * 100:.1f}%")
         
         plt.tight_layout()
         return fig
     
-    def save_all_plots(self, output_dir: str):
-        """Save all visualization plots to specified directory"""
-        plots = {
-            'equity_curve': self.plot_equity_curve(),
-            'trade_distribution': self.plot_trade_distribution(),
-            'drawdown_analysis': self.plot_drawdown_analysis(),
-            'time_analysis': self.plot_time_analysis(),
-            'price_with_trades': self.plot_price_with_trades(),
-            'performance_summary': self.plot_performance_summary()
-        }
-        
-        for name, fig in plots.items():
-            fig.savefig(f'{output_dir}/{name}.png')
-            plt.close(fig)
+    def save_all_plots(self, output_dir: str, max_workers: Optional[int] = None,
+                       dpi: Optional[float] = None) -> Dict[str, str]:
+        """Save all visualization plots to specified directory
+
+        Each plot is drawn in its own worker process on the headless Agg
+        backend; max_workers=1 draws them one after another in this process.
+        Returns the path written for each plot.
+        """
+        paths = {name: os.path.join(output_dir, f'{name}.png') for name in PLOTS}
+        if max_workers == 1:
+            for name, path in paths.items():
+                fig = getattr(self, f'plot_{name}')()
+                fig.savefig(path, dpi=dpi)
+                plt.close(fig)
+            return paths
+
+        workers = min(len(PLOTS), max_workers or os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(self,)) as executor:
+            list(executor.map(_render, paths, paths.values(), [dpi] * len(paths)))
+        return paths
 
 # Example usage:
 """